@@ -1,9 +1,11 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.db.models.signals import pre_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
+from authentication.tokens import cached_users
 from workspaces.models import Workspace
+from eddy_backend.cache import invalidate_on_change
 
 
 class User(AbstractUser):
@@ -30,3 +32,12 @@ def post_delete_user(signal, sender, instance: User, using, **kwargs):
     user = instance
     workspace = user.workspace
     workspace.delete()
+
+
+@receiver([post_save, post_delete], sender=User)
+def post_change_user(signal, sender, instance: User, using, **kwargs):
+    # changes reach requests of this worker immediately, the others once their cached user expires
+    cached_users.discard(instance.get_username())
+
+
+invalidate_on_change(User)
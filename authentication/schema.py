@@ -3,6 +3,8 @@ from graphene_django import DjangoObjectType
 
 from authentication.models import User
 from utils.exceptions import UnauthorizedException, NotFoundException, ForbiddenException
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField
 from utils.utils import IntID
 
 
@@ -16,6 +18,11 @@ class UserType(DjangoObjectType):
     id = IntID(required=True)
 
 
+class UserConnection(CountableConnection):
+    class Meta:
+        node = UserType
+
+
 class UserQuery(graphene.ObjectType):
     """
     A normal user can only query itself.
@@ -55,7 +62,23 @@ class UserQuery(graphene.ObjectType):
         else:
             all_users = User.objects.all()
 
-        return all_users
+        return optimize_queryset(all_users, info)
+
+    """
+    A normal user can only query itself.
+    A super user can query any user.
+    """
+    all_users_connection = KeysetConnectionField(UserConnection)
+
+    @classmethod
+    def resolve_all_users_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            raise UnauthorizedException()
+
+        if not info.context.user.is_superuser:
+            return User.objects.filter(pk=info.context.user.id)
+
+        return User.objects.all()
 
 
 class CreateUser(graphene.Mutation):
@@ -0,0 +1,98 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.shortcuts import get_token
+
+from authentication import tokens
+from authentication.tokens import ExpiringCache, cached_users, get_user_by_token, verified_tokens
+from eddy_backend.views import count_queries
+from utils.exceptions import UnauthorizedException
+from utils.testing import GraphQLTestMixin, create_user
+
+
+class ExpiringCacheTest(TestCase):
+    def test_expires_entries(self):
+        cache = ExpiringCache(max_size=2)
+        cache.set('expired', 1, time.time() - 1)
+        cache.set('valid', 2, time.time() + 60)
+        cache.set('forever', 3, None)
+
+        self.assertIsNone(cache.get('expired'))
+        self.assertEqual((cache.get('valid'), cache.get('forever')), (2, 3))
+
+    def test_evicts_the_least_recently_used_entry(self):
+        cache = ExpiringCache(max_size=2)
+        cache.set('a', 1, None)
+        cache.set('b', 2, None)
+        cache.get('a')
+        cache.set('c', 3, None)
+
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_discards_entries(self):
+        cache = ExpiringCache(max_size=2)
+        cache.set('a', 1, None)
+        cache.discard('a')
+        cache.discard('missing')
+
+        self.assertIsNone(cache.get('a'))
+
+
+class TokenAuthenticationTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        verified_tokens.clear()
+        cached_users.clear()
+        self.user = create_user('tokens')
+
+    def test_verifies_every_token_once(self):
+        token = get_token(self.user)
+
+        with mock.patch.object(tokens, 'get_payload', wraps=tokens.get_payload) as get_payload:
+            get_user_by_token(token)
+            with count_queries() as queries:
+                user = get_user_by_token(token)
+
+        self.assertEqual(get_payload.call_count, 1)
+        self.assertEqual(queries.count, 0)
+        self.assertEqual(user, self.user)
+
+    def test_verifies_tampered_tokens_with_a_known_signature(self):
+        token = get_token(self.user)
+        get_user_by_token(token)
+        header, payload, signature = token.split('.')
+        other = get_token(create_user('other')).split('.')[1]
+
+        with self.assertRaises(JSONWebTokenError):
+            get_user_by_token('.'.join([header, other, signature]))
+
+    def test_returns_copies_of_cached_users(self):
+        token = get_token(self.user)
+
+        self.assertIsNot(get_user_by_token(token), get_user_by_token(token))
+
+    def test_reloads_users_once_they_change(self):
+        token = get_token(self.user)
+        get_user_by_token(token)
+
+        self.user.first_name = 'changed'
+        self.user.save()
+
+        self.assertEqual(get_user_by_token(token).first_name, 'changed')
+
+    def test_authenticates_requests(self):
+        content = self.execute('{ allProjects { id } }', user=self.user)
+
+        self.assertEqual(content['data'], {'allProjects': []})
+
+    def test_reports_invalid_tokens(self):
+        content = self.execute('{ allProjects { id } }', HTTP_AUTHORIZATION='Bearer invalid')
+
+        self.assertIsNone(content['data'])
+        self.assertEqual(content['errors'], [{'message': 'Error decoding signature'}])
+
+    def test_refuses_anonymous_requests(self):
+        content = self.execute('{ allProjects { id } }')
+
+        self.assertEqual(content['errors'][0]['message'], UnauthorizedException().args[0])
@@ -0,0 +1,111 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_credentials, get_payload, get_user_by_payload
+
+
+class ExpiringCache(object):
+    """
+    A thread safe LRU cache whose entries expire at a given time.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires is not None and expires <= time.time():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# payloads of verified tokens keyed by a hash of the whole token, valid until the token expires
+verified_tokens = ExpiringCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+# users keyed by username, kept shortly so deactivated users are refused soon after
+cached_users = ExpiringCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+
+def get_verified_payload(token):
+    # a token with the signature of a verified one but another header or payload is verified on its own
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    payload = verified_tokens.get(key)
+    if payload is not None:
+        return payload
+
+    # raises for invalid and expired tokens, those are never cached
+    payload = get_payload(token)
+
+    expires = payload.get('exp') if jwt_settings.JWT_VERIFY_EXPIRATION else None
+    verified_tokens.set(key, payload, expires)
+    return payload
+
+
+def get_user_by_token(token):
+    payload = get_verified_payload(token)
+
+    username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+    user = cached_users.get(username)
+    if user is None:
+        user = get_user_by_payload(payload)
+        if user is None:
+            return None
+        cached_users.set(username, user, time.time() + settings.JWT_USER_CACHE_TTL)
+
+    # requests may modify their user, they must not share the cached instance
+    return copy.deepcopy(user)
+
+
+def authenticate_request(request):
+    """
+    Authenticates the request once for all of its operations and fields.
+    Returns the JSONWebTokenError of an invalid token, which the operations of the request report.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return None
+
+    token = get_credentials(request)
+    if token is None:
+        return None
+
+    try:
+        user = get_user_by_token(token)
+    except JSONWebTokenError as e:
+        return e
+
+    if user is not None:
+        request.user = user
+
+    return None
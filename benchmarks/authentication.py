@@ -0,0 +1,98 @@
+"""
+Compares the cost of authenticating every resolved field with the JWT middleware against authenticating once
+per request.
+
+Run from the repository root against a migrated database, every row it creates is rolled back:
+
+    python -m benchmarks.authentication [--rows 1666] [--repeat 5]
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eddy_backend.settings')
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from graphql_jwt.middleware import JSONWebTokenMiddleware  # noqa: E402
+from graphql_jwt.shortcuts import get_token, get_user_by_token as get_user_by_token_uncached  # noqa: E402
+
+from authentication import tokens  # noqa: E402
+from authentication.models import User  # noqa: E402
+from dashboards.models import WidgetType  # noqa: E402
+from schema import schema  # noqa: E402
+
+QUERY = '{ allWidgetTypes { id label config } }'
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def count_fields(data):
+    if isinstance(data, dict):
+        return len(data) + sum(count_fields(value) for value in data.values())
+    if isinstance(data, list):
+        return sum(count_fields(value) for value in data)
+    return 0
+
+
+def make_request(token):
+    request = RequestFactory().post('/graphql', HTTP_AUTHORIZATION='Bearer ' + token)
+    request.user = AnonymousUser()
+    return request
+
+
+def run(rows, repeat):
+    user = User.objects.create(username='benchmark-authentication')
+    WidgetType.objects.bulk_create(WidgetType(label='widget type %d' % i, config={}) for i in range(rows))
+    token = get_token(user)
+
+    def per_field():
+        result = schema.execute(QUERY, context=make_request(token), middleware=[JSONWebTokenMiddleware()])
+        assert not result.errors, result.errors
+        return result
+
+    def per_request():
+        request = make_request(token)
+        tokens.authenticate_request(request)
+        result = schema.execute(QUERY, context=request)
+        assert not result.errors, result.errors
+        return result
+
+    fields = count_fields(per_field().data)
+    per_request()
+
+    print('resolved fields per operation: %d' % fields)
+    for name, fn in (('middleware per field', per_field), ('once per request', per_request)):
+        seconds = best_of(repeat, fn)
+        print('%-24s %9.2f ms  %7.2f us/field' % (name, seconds * 1000, seconds * 1e6 / fields))
+
+    tokens.verified_tokens.clear()
+    tokens.cached_users.clear()
+    print('%-24s %9.2f us' % ('token, uncached', best_of(repeat * 20, lambda: get_user_by_token_uncached(token)) * 1e6))
+    print('%-24s %9.2f us' % ('token, cached', best_of(repeat * 20, lambda: tokens.get_user_by_token(token)) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1666, help='widget types resolved by the operation')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement, the fastest is reported')
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        run(args.rows, args.repeat)
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
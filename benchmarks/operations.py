@@ -0,0 +1,53 @@
+import os
+
+from django.conf import settings
+
+
+def registered(file_name):
+    # the registered documents are sent byte for byte, so they run their compiled executors
+    with open(os.path.join(settings.GRAPHQL_COMPILED_OPERATIONS_DIR, file_name)) as file:
+        return file.read()
+
+
+def get_operations():
+    """
+    The operations issued by the frontend, as (name, query, variables) with variables computed from the tenant.
+    """
+    return [
+        ('dashboardBootstrap', '''
+            query dashboardBootstrap {
+              allDashboards { id label project { id } }
+              allWidgets { id label config dashboard { id } widgetType { id } }
+              allWidgetTypes { id label }
+              allDataConnectors { id label dataConnectorType { id label } }
+            }
+        ''', lambda tenant: {}),
+        ('allProjects', '''
+            query allProjects {
+              allProjects {
+                id
+                label
+                pipelines { id label }
+                dashboards { id label }
+                dataConnectors { id label }
+              }
+            }
+        ''', lambda tenant: {}),
+        ('project', registered('project.graphql'), lambda tenant: {'id': tenant['project_id']}),
+        ('allBlocks', registered('allBlocks.graphql'), lambda tenant: {}),
+        ('allWidgets', registered('allWidgets.graphql'), lambda tenant: {}),
+        ('allPipelinesConnection', '''
+            query allPipelinesConnection($first: Int) {
+              allPipelinesConnection(first: $first) {
+                totalCount
+                pageInfo { hasNextPage endCursor }
+                edges { node { id label config blocks { id label } } }
+              }
+            }
+        ''', lambda tenant: {'first': 20}),
+        ('updateProject', '''
+            mutation updateProject($id: IntID!, $label: String) {
+              updateProject(id: $id, label: $label) { project { id label } }
+            }
+        ''', lambda tenant: {'id': tenant['project_id'], 'label': 'renamed project'}),
+    ]
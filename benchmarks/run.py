@@ -0,0 +1,173 @@
+"""
+Drives the /graphql view with the operations of the frontend against a synthetic tenant and reports throughput,
+latency percentiles, SQL queries and peak RSS per operation as JSON.
+
+Runs against an in memory SQLite database by default, set BENCHMARK_DATABASE=mysql to use a test database created
+on the MySQL server configured by the MYSQL_* variables. Kafka Connect and celery are stubbed out.
+
+    python -m benchmarks.run [--scale small|medium|large] [--iterations 50] [--output results.json]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from unittest import mock
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+import requests  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from graphql_jwt.shortcuts import get_token  # noqa: E402
+
+import eddy_backend.celery  # noqa: E402
+from benchmarks.operations import get_operations  # noqa: E402
+from benchmarks.seed import SCALES, seed  # noqa: E402
+from projects.models import Project  # noqa: E402
+
+
+def percentile(values, fraction):
+    # nearest rank on the sorted values
+    index = min(int(math.ceil(fraction * len(values))) - 1, len(values) - 1)
+    return values[max(index, 0)]
+
+
+def peak_rss():
+    # kilobytes on linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def stub_response(request, **kwargs):
+    response = requests.Response()
+    response.status_code = 201
+    response.request = request
+    response.url = request.url
+    response._content = b'{}'
+    return response
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def post(client, token, query, variables):
+    return client.post('/graphql', json.dumps({'query': query, 'variables': variables}),
+                       content_type='application/json', HTTP_AUTHORIZATION='Bearer ' + token)
+
+
+def measure(client, token, name, query, variables, iterations, warmup):
+    for _ in range(warmup):
+        post(client, token, query, variables)
+
+    # queries are counted on a separate request, capturing them slows the timed ones down
+    with CaptureQueriesContext(connection) as queries:
+        response = post(client, token, query, variables)
+    # the log of the connection is reset by every request, it must be read before the next one
+    sql_queries = len(queries.captured_queries)
+    errors = json.loads(response.content.decode()).get('errors')
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        request_start = time.perf_counter()
+        post(client, token, query, variables)
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'name': name,
+        'iterations': iterations,
+        'throughput': round(iterations / elapsed, 2),
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3),
+        },
+        'sql_queries': sql_queries,
+        'status_code': response.status_code,
+        'errors': errors,
+        # the peak of the process so far, operations run in the order they are reported
+        'peak_rss_bytes': peak_rss(),
+    }
+
+
+def run(scale, iterations, warmup, operation_names):
+    users = seed(**scale)
+    user = users[0]
+    token = get_token(user)
+    tenant = {'project_id': Project.objects.filter(user=user).order_by('pk').values_list('pk', flat=True)[0]}
+
+    client = Client()
+    results = []
+    for name, query, variables in get_operations():
+        if operation_names and name not in operation_names:
+            continue
+        results.append(measure(client, token, name, query, variables(tenant), iterations, warmup))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='size of the seeded tenant')
+    for level in SCALES['small']:
+        parser.add_argument('--' + level.replace('_', '-'), type=int, dest=level,
+                            help='overrides the {} per parent of the scale'.format(level.replace('_', ' ')))
+    parser.add_argument('--iterations', type=int, default=50, help='timed requests per operation')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per operation')
+    parser.add_argument('--operation', action='append', dest='operations', help='only runs the named operations')
+    parser.add_argument('--output', help='file the JSON results are written to, standard output by default')
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    scale.update({level: getattr(args, level) for level in scale if getattr(args, level) is not None})
+
+    old_config = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        # every outbound call is answered locally, neither Kafka Connect nor a celery broker are needed
+        with mock.patch.object(requests.Session, 'send', stub_response), \
+                mock.patch.object(eddy_backend.celery.app, 'send_task'):
+            results = run(scale, args.iterations, args.warmup, args.operations)
+    finally:
+        connection.creation.destroy_test_db(old_config, verbosity=0)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'revision': git_revision(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scale': scale,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+        },
+        'operations': results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+from authentication.models import User
+from dashboards.models import Dashboard, Widget, WidgetType
+from pipelines.models import Block, BlockType, Pipeline
+from projects.models import DataConnector, DataConnectorType, Project
+from workspaces.models import Workspace
+
+SCALES = {
+    'small': {
+        'users': 2, 'projects': 3, 'pipelines': 3, 'blocks': 5, 'dashboards': 2, 'widgets': 5, 'data_connectors': 2,
+    },
+    'medium': {
+        'users': 5, 'projects': 10, 'pipelines': 10, 'blocks': 10, 'dashboards': 5, 'widgets': 10, 'data_connectors': 5,
+    },
+    'large': {
+        'users': 10, 'projects': 20, 'pipelines': 20, 'blocks': 20, 'dashboards': 10, 'widgets': 20,
+        'data_connectors': 10,
+    },
+}
+
+BATCH_SIZE = 500
+
+
+def bulk_create(model, objects):
+    # bulk creation skips the signals, so no connector is registered at Kafka Connect and no task is published
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def seed(users, projects, pipelines, blocks, dashboards, widgets, data_connectors):
+    """
+    Seeds a synthetic tenant, the counts of every level are per parent: projects per user, blocks per pipeline...
+    Returns the seeded users.
+    """
+    block_type = BlockType.objects.create(label='benchmark', config={})
+    widget_type = WidgetType.objects.create(label='benchmark', config={})
+    # a data connector type without integration is neither registered at Kafka Connect nor published to celery
+    data_connector_type = DataConnectorType.objects.create(label='benchmark', config={})
+
+    seeded_users = []
+    for i in range(users):
+        workspace = Workspace.objects.create()
+        user = User(username='benchmark-%d' % i, workspace=workspace)
+        user.set_unusable_password()
+        user.save()
+        seeded_users.append(user)
+
+    bulk_create(Project, [
+        Project(user=user, workspace_id=user.workspace_id, label='project %d' % i)
+        for user in seeded_users for i in range(projects)
+    ])
+    # primary keys of bulk created rows are only returned by some databases, read them back
+    seeded_projects = list(Project.objects.filter(user__in=seeded_users).order_by('pk'))
+
+    bulk_create(Pipeline, [
+        Pipeline(user_id=project.user_id, project=project, label='pipeline %d' % i, config={'index': i})
+        for project in seeded_projects for i in range(pipelines)
+    ])
+    seeded_pipelines = list(Pipeline.objects.filter(user__in=seeded_users).order_by('pk'))
+
+    bulk_create(Block, [
+        Block(user_id=pipeline.user_id, pipeline=pipeline, label='block %d' % i, block_type=block_type,
+              config={'index': i})
+        for pipeline in seeded_pipelines for i in range(blocks)
+    ])
+
+    bulk_create(Dashboard, [
+        Dashboard(user_id=project.user_id, project=project, label='dashboard %d' % i)
+        for project in seeded_projects for i in range(dashboards)
+    ])
+    seeded_dashboards = list(Dashboard.objects.filter(user__in=seeded_users).order_by('pk'))
+
+    bulk_create(Widget, [
+        Widget(user_id=dashboard.user_id, dashboard=dashboard, label='widget %d' % i, widget_type=widget_type,
+               config={'index': i})
+        for dashboard in seeded_dashboards for i in range(widgets)
+    ])
+
+    bulk_create(DataConnector, [
+        DataConnector(user_id=project.user_id, project=project, label='data connector %d' % i,
+                      data_connector_type=data_connector_type, config={'type': 'benchmark'})
+        for project in seeded_projects for i in range(data_connectors)
+    ])
+
+    return seeded_users
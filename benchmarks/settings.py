@@ -0,0 +1,23 @@
+from eddy_backend.settings import *  # noqa: F401,F403
+from eddy_backend.settings import GRAPHQL_RESPONSE_CACHE, os
+
+# BENCHMARK_DATABASE=mysql runs against the MySQL database configured by the MYSQL_* variables, a test database is
+# created next to it and dropped afterwards
+if os.environ.get('BENCHMARK_DATABASE', default='sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+    # the JSON fields of django_mysql only check for MySQL, they are stored as text in SQLite
+    SILENCED_SYSTEM_CHECKS = ['django_mysql.E016']
+
+# responses are computed on every iteration unless the cache itself is measured
+GRAPHQL_RESPONSE_CACHE = dict(
+    GRAPHQL_RESPONSE_CACHE,
+    ENABLED=True if os.environ.get('BENCHMARK_RESPONSE_CACHE', default='False') == 'True' else False,
+    REDIS_HOST=None,
+)
+
+DEBUG = False
@@ -0,0 +1,53 @@
+from unittest import mock
+
+import requests
+from django.test import TestCase
+
+import eddy_backend.celery
+from benchmarks.operations import get_operations
+from benchmarks.run import percentile, run, stub_response
+from benchmarks.seed import SCALES, seed
+from dashboards.models import Widget
+from pipelines.models import Block
+from projects.models import Project
+from utils.testing import response_cache_enabled
+
+
+class PercentileTest(TestCase):
+    def test_returns_the_nearest_rank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(values, 1), 100)
+        self.assertEqual(percentile([1], 0.95), 1)
+
+
+class SeedTest(TestCase):
+    def test_seeds_every_level_per_parent(self):
+        scale = dict(SCALES['small'], users=2, projects=2, pipelines=2, blocks=3, dashboards=1, widgets=2)
+
+        users = seed(**scale)
+
+        self.assertEqual(len(users), 2)
+        self.assertEqual(Project.objects.filter(user=users[0]).count(), 2)
+        self.assertEqual(Block.objects.filter(user=users[0]).count(), 2 * 2 * 3)
+        self.assertEqual(Widget.objects.filter(user=users[1]).count(), 2 * 1 * 2)
+
+
+@response_cache_enabled(False)
+class RunTest(TestCase):
+    def test_measures_every_operation_without_errors(self):
+        with mock.patch.object(requests.Session, 'send', stub_response), \
+                mock.patch.object(eddy_backend.celery.app, 'send_task'):
+            results = run(SCALES['small'], iterations=2, warmup=1, operation_names=None)
+
+        self.assertEqual([result['name'] for result in results], [name for name, _, _ in get_operations()])
+        for result in results:
+            self.assertEqual((result['status_code'], result['errors']), (200, None), result['name'])
+            self.assertGreater(result['sql_queries'], 0, result['name'])
+
+    def test_runs_the_named_operations_only(self):
+        results = run(SCALES['small'], iterations=1, warmup=0, operation_names=['allProjects'])
+
+        self.assertEqual([result['name'] for result in results], ['allProjects'])
@@ -1,5 +1,7 @@
 from django.db import models
 from django_mysql.models import JSONField
+from eddy_backend.cache import invalidate_on_change
+from utils.managers import OwnedQuerySet
 
 
 class Dashboard(models.Model):
@@ -8,6 +10,8 @@ class Dashboard(models.Model):
     project = models.ForeignKey('projects.Project', related_name='dashboards', on_delete=models.CASCADE)
     label = models.CharField(max_length=200)
 
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
@@ -20,6 +24,8 @@ class Widget(models.Model):
     widget_type = models.ForeignKey('dashboards.WidgetType', related_name='widgets', on_delete=models.CASCADE)
     config = JSONField()
 
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
@@ -31,3 +37,6 @@ class WidgetType(models.Model):
 
     def __str__(self):
         return self.label
+
+
+invalidate_on_change(Dashboard, Widget, WidgetType)
@@ -7,6 +7,9 @@ from dashboards import models
 from dashboards.models import Dashboard, Widget
 from projects.models import Project
 from utils.exceptions import NotFoundException, UnauthorizedException, ForbiddenException
+from utils.loaders import load_related
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField
 from utils.utils import IntID
 
 
@@ -19,6 +22,19 @@ class DashboardType(DjangoObjectType):
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_project(cls, root, info, **kwargs):
+        return load_related(info, root, 'project')
+
+
+class DashboardConnection(CountableConnection):
+    class Meta:
+        node = DashboardType
+
 
 class DashboardQuery(graphene.ObjectType):
     dashboard = graphene.Field(DashboardType, id=IntID(required=True))
@@ -29,15 +45,8 @@ class DashboardQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            dashboard = Dashboard.objects.get(pk=kwargs.get('id'))
-        except Dashboard.DoesNotExist:
-            # any user can only request dashboards that exist
-            raise NotFoundException()
-
         # any user can only request dashboards associated to itself
-        if dashboard.user != info.context.user:
-            raise ForbiddenException()
+        dashboard = Dashboard.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return dashboard
 
@@ -50,10 +59,21 @@ class DashboardQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request dashboards associated to itself
-        all_dashboards = Dashboard.objects.filter(user=info.context.user)
+        all_dashboards = optimize_queryset(Dashboard.objects.owned_by(info.context.user), info)
 
         return all_dashboards
 
+    all_dashboards_connection = KeysetConnectionField(DashboardConnection)
+
+    @classmethod
+    def resolve_all_dashboards_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request dashboards associated to itself
+        return Dashboard.objects.owned_by(info.context.user)
+
 
 class CreateDashboard(graphene.Mutation):
     class Arguments:
@@ -72,14 +92,8 @@ class CreateDashboard(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('project_id'))
-        except Project.DoesNotExist:
-            # any user can only create a dashboard if it associates it to a project
-            raise NotFoundException()
-
-        if project.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a dashboard if it associates it to a project
+        project = Project.objects.get_owned(info.context.user, kwargs.get('project_id'))
 
         del create_kwargs['project_id']
         create_kwargs['project'] = project
@@ -109,11 +123,8 @@ class UpdateDashboard(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            dashboard = Dashboard.objects.get(pk=kwargs.get('id'))
-        except Dashboard.DoesNotExist:
-            # any user can only update dashboards that exist
-            raise NotFoundException()
+        # any user can only update dashboards associated to itself
+        dashboard = Dashboard.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(dashboard, key, value)
@@ -135,15 +146,8 @@ class DeleteDashboard(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            dashboard = Dashboard.objects.get(pk=kwargs.get('id'))
-        except Dashboard.DoesNotExist:
-            # any user can only update dashboards that exist
-            raise NotFoundException()
-
-        if dashboard.user != info.context.user:
-            # any user can only delete dashboards associated to itself
-            raise ForbiddenException()
+        # any user can only delete dashboards associated to itself
+        dashboard = Dashboard.objects.get_owned(info.context.user, kwargs.get('id'))
 
         dashboard.delete()
 
@@ -165,6 +169,23 @@ class WidgetType(DjangoObjectType):
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_dashboard(cls, root, info, **kwargs):
+        return load_related(info, root, 'dashboard')
+
+    @classmethod
+    def resolve_widget_type(cls, root, info, **kwargs):
+        return load_related(info, root, 'widget_type')
+
+
+class WidgetConnection(CountableConnection):
+    class Meta:
+        node = WidgetType
+
 
 class WidgetQuery(graphene.ObjectType):
     widget = graphene.Field(WidgetType, id=IntID(required=True))
@@ -175,15 +196,8 @@ class WidgetQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            widget = Widget.objects.get(pk=kwargs.get('id'))
-        except Widget.DoesNotExist:
-            # any user can only request widgets that exist
-            raise NotFoundException()
-
         # any user can only request widgets associated to itself
-        if widget.user != info.context.user:
-            raise ForbiddenException()
+        widget = Widget.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return widget
 
@@ -196,10 +210,21 @@ class WidgetQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request widgets associated to itself
-        all_widgets = Widget.objects.filter(user=info.context.user)
+        all_widgets = optimize_queryset(Widget.objects.owned_by(info.context.user), info)
 
         return all_widgets
 
+    all_widgets_connection = KeysetConnectionField(WidgetConnection)
+
+    @classmethod
+    def resolve_all_widgets_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request widgets associated to itself
+        return Widget.objects.owned_by(info.context.user)
+
 
 class CreateWidget(graphene.Mutation):
     class Arguments:
@@ -220,14 +245,8 @@ class CreateWidget(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            dashboard = Dashboard.objects.get(pk=kwargs.get('dashboard_id'))
-        except Dashboard.DoesNotExist:
-            # any user can only create a widget if it associates it to a dashboard
-            raise NotFoundException()
-
-        if dashboard.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a widget if it associates it to a dashboard
+        dashboard = Dashboard.objects.get_owned(info.context.user, kwargs.get('dashboard_id'))
 
         del create_kwargs['dashboard_id']
         create_kwargs['dashboard'] = dashboard
@@ -267,15 +286,8 @@ class UpdateWidget(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            widget = Widget.objects.get(pk=kwargs.get('id'))
-        except Widget.DoesNotExist:
-            # any user can only update widgets that exist
-            raise NotFoundException()
-
-        if widget.user != info.context.user:
-            # any user can only update widgets associated to itself
-            raise ForbiddenException()
+        # any user can only update widgets associated to itself
+        widget = Widget.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(widget, key, value)
@@ -302,15 +314,8 @@ class DeleteWidget(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            widget = Widget.objects.get(pk=kwargs.get('id'))
-        except Widget.DoesNotExist:
-            # any user can only delete widgets that exist
-            raise NotFoundException()
-
-        if widget.user != info.context.user:
-            # any user can only delete widgets associated to itself
-            raise ForbiddenException()
+        # any user can only delete widgets associated to itself
+        widget = Widget.objects.get_owned(info.context.user, kwargs.get('id'))
 
         widget.delete()
 
@@ -332,6 +337,11 @@ class WidgetTypeType(DjangoObjectType):
     id = IntID(required=True)
 
 
+class WidgetTypeConnection(CountableConnection):
+    class Meta:
+        node = WidgetTypeType
+
+
 class WidgetTypeQuery(graphene.ObjectType):
     widget_type = graphene.Field(WidgetTypeType, id=IntID(required=True))
 
@@ -357,10 +367,20 @@ class WidgetTypeQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        all_widget_types = models.WidgetType.objects.filter()
+        all_widget_types = optimize_queryset(models.WidgetType.objects.filter(), info)
 
         return all_widget_types
 
+    all_widget_types_connection = KeysetConnectionField(WidgetTypeConnection)
+
+    @classmethod
+    def resolve_all_widget_types_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        return models.WidgetType.objects.filter()
+
 
 class CreateWidgetType(graphene.Mutation):
     class Arguments:
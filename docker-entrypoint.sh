@@ -8,11 +8,23 @@ done
 if [ "$1" = 'eddy-backend-dev' ]; then
   python3 manage.py migrate --no-input
   python3 manage.py collectstatic --no-input
+  rm -rf /tmp/prometheus && mkdir -p /tmp/prometheus
   exec uwsgi --ini uwsgi.dev.ini
   exec "$@"
 elif [ "$1" = 'eddy-backend' ]; then
   python3 manage.py migrate --no-input
   python3 manage.py collectstatic --no-input
+  rm -rf /tmp/prometheus && mkdir -p /tmp/prometheus
   exec uwsgi --ini uwsgi.ini
   exec "$@"
+elif [ "$1" = 'eddy-backend-dispatcher' ]; then
+  exec python3 manage.py dispatch_connector_requests
+elif [ "$1" = 'eddy-backend-prober' ]; then
+  exec python3 manage.py probe_integrations
+elif [ "$1" = 'eddy-backend-reconciler' ]; then
+  exec python3 manage.py reconcile_connectors
+elif [ "$1" = 'eddy-backend-status-poller' ]; then
+  exec python3 manage.py poll_connector_statuses
+elif [ "$1" = 'eddy-backend-job-monitor' ]; then
+  exec python3 manage.py monitor_jobs
 fi
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from graphql.backend.base import GraphQLDocument
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.execution import execute, ExecutionResult
+from graphql.language.base import parse, print_ast
+from graphql.language import ast
+from graphql.validation import validate
+
+from eddy_backend.compiler import OperationRegistry, execute_compiled
+
+
+def document_hash(document_string):
+    return hashlib.sha256(document_string.encode('utf-8')).hexdigest()
+
+
+class DocumentCache(object):
+    """
+    A thread safe LRU cache of parsed and validated documents keyed by the sha256 of their query string.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            document = self.documents.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.documents.move_to_end(key)
+            return document
+
+    def peek(self, key):
+        # looks a document up without affecting the counters or the eviction order
+        with self.lock:
+            return self.documents.get(key)
+
+    def set(self, key, document):
+        with self.lock:
+            self.documents[key] = document
+            self.documents.move_to_end(key)
+            while len(self.documents) > self.max_size:
+                self.documents.popitem(last=False)
+
+    def __len__(self):
+        return len(self.documents)
+
+
+def execute_validated(schema, document_ast, validation_errors, *args, **kwargs):
+    # validation already happened when the document was cached
+    if validation_errors:
+        return ExecutionResult(errors=validation_errors, invalid=True)
+
+    kwargs.pop('validate', None)
+    return execute(schema, document_ast, *args, **kwargs)
+
+
+class CachedDocumentBackend(GraphQLCoreBackend):
+    """
+    A graphql core backend which parses and validates every distinct query string only once per worker.
+    """
+
+    def __init__(self, cache, registry=None, executor=None):
+        super(CachedDocumentBackend, self).__init__(executor=executor)
+        self.cache = cache
+        self.registry = registry
+
+    def get_document_string(self, key):
+        document = self.cache.peek(key)
+        if document is None:
+            return None
+
+        return document.document_string
+
+    def document_from_string(self, schema, document_string):
+        if isinstance(document_string, ast.Document):
+            document_string = print_ast(document_string)
+
+        key = document_hash(document_string)
+        document = self.cache.get(key)
+        if document is not None:
+            return document
+
+        # parse errors are raised and never cached
+        document_ast = parse(document_string)
+        validation_errors = validate(schema, document_ast)
+
+        execute_document = partial(execute_validated, schema, document_ast, validation_errors, **self.execute_params)
+
+        # registered operations run their compiled executor and fall back to the generic one
+        operations = self.registry.get(schema, key) if self.registry is not None else None
+        if operations and not validation_errors:
+            execute_document = partial(execute_compiled, operations, execute_document)
+
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=execute_document,
+        )
+        # reported by the view before the cost of the operation is estimated
+        document.validation_errors = validation_errors
+        self.cache.set(key, document)
+
+        return document
+
+
+document_cache = DocumentCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+operation_registry = OperationRegistry(settings.GRAPHQL_COMPILED_OPERATIONS_DIR, document_hash)
+
+backend = CachedDocumentBackend(document_cache, operation_registry)
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from graphene.relay import Connection, PageInfo
+from graphql.language import ast
+from graphql.type import GraphQLList, GraphQLNonNull, GraphQLObjectType
+
+logger = logging.getLogger(__name__)
+
+# models whose changes invalidate cached responses, responses touching any other model are not cached
+tracked_models = set()
+
+
+def model_tag(model, owner_id=None):
+    # rows of models owned by a user are tagged per owner, so changes of one user leave the others' cache intact
+    label = model._meta.label_lower
+    if owner_id is None:
+        return label
+
+    return label + ':user:' + str(owner_id)
+
+
+def is_owned(model):
+    return any(field.name == 'user' and field.concrete for field in model._meta.get_fields())
+
+
+def instance_tag(instance):
+    return model_tag(type(instance), instance.user_id if is_owned(type(instance)) else None)
+
+
+class LocalTagStore(object):
+    """
+    An in process store, used when no redis host is configured (development and tests).
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.versions = dict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (time.time() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_versions(self, tags):
+        with self.lock:
+            return [self.versions.get(tag, 0) for tag in tags]
+
+    def incr_versions(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.versions[tag] = self.versions.get(tag, 0) + 1
+
+
+class RedisTagStore(object):
+    def __init__(self, host, port, db):
+        self.redis = redis.Redis(host=host, port=int(port), db=int(db), socket_timeout=0.1,
+                                 socket_connect_timeout=0.1)
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def set(self, key, value, timeout):
+        self.redis.set(key, value, ex=timeout)
+
+    def get_versions(self, tags):
+        return [int(version or 0) for version in self.redis.mget(['tag:' + tag for tag in tags])]
+
+    def incr_versions(self, tags):
+        pipeline = self.redis.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr('tag:' + tag)
+        pipeline.execute()
+
+
+class ResponseCache(object):
+    """
+    Caches the data of read operations together with the versions of the tags of the rows they touched.
+    Invalidating a tag bumps its version, so every entry stored with an older version becomes a miss.
+    """
+
+    def __init__(self, store, timeout):
+        self.store = store
+        self.timeout = timeout
+
+    def get(self, key):
+        try:
+            value = self.store.get(key)
+            if value is None:
+                return None
+
+            entry = json.loads(value)
+            if self.store.get_versions(entry['tags']) != entry['versions']:
+                return None
+        except redis.RedisError as e:
+            logger.warning('Response cache unavailable: %s', e)
+            return None
+
+        return entry['data']
+
+    def set(self, key, data, tags, versions):
+        tags = list(tags)
+        try:
+            # tags discovered during execution are versioned now, the others were versioned before execution
+            versions = dict(versions)
+            unknown = [tag for tag in tags if tag not in versions]
+            versions.update(zip(unknown, self.store.get_versions(unknown)))
+
+            value = json.dumps({'tags': tags, 'versions': [versions[tag] for tag in tags], 'data': data})
+            self.store.set(key, value, self.timeout)
+        except redis.RedisError as e:
+            logger.warning('Response cache unavailable: %s', e)
+
+    def get_versions(self, tags):
+        tags = list(tags)
+        try:
+            return dict(zip(tags, self.store.get_versions(tags)))
+        except redis.RedisError as e:
+            logger.warning('Response cache unavailable: %s', e)
+            return dict()
+
+    def invalidate(self, tags):
+        try:
+            self.store.incr_versions(list(tags))
+        except redis.RedisError as e:
+            logger.warning('Response cache invalidation failed: %s', e)
+
+
+def get_store():
+    config = settings.GRAPHQL_RESPONSE_CACHE
+    if config['REDIS_HOST']:
+        return RedisTagStore(config['REDIS_HOST'], config['REDIS_PORT'], config['REDIS_DB'])
+
+    return LocalTagStore()
+
+
+response_cache = ResponseCache(get_store(), settings.GRAPHQL_RESPONSE_CACHE['TIMEOUT'])
+
+
+def response_key(user_id, query_hash, operation_name, variables):
+    key = json.dumps([user_id, query_hash, operation_name, variables], sort_keys=True, default=str)
+    return 'graphql:response:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def unwrap(graphql_type):
+    while isinstance(graphql_type, (GraphQLNonNull, GraphQLList)):
+        graphql_type = graphql_type.of_type
+    return graphql_type
+
+
+def is_pagination_type(parent_type, field_name, graphene_type):
+    # connections, their edges and page infos only wrap the objects they paginate
+    if isinstance(graphene_type, type) and issubclass(graphene_type, (Connection, PageInfo)):
+        return True
+
+    parent_graphene_type = getattr(parent_type, 'graphene_type', None)
+    return isinstance(parent_graphene_type, type) and issubclass(parent_graphene_type, Connection) \
+        and field_name == 'edges'
+
+
+def selected_type_models(parent_type, field_name, graphene_type, models):
+    """
+    Adds the models a selected object type reads from, returns False when its responses can not be invalidated.
+    Object types without a model declare the models they read from in cache_models, or are never cached.
+    """
+    model = getattr(getattr(graphene_type, '_meta', None), 'model', None)
+    type_models = [model] if model is not None else getattr(graphene_type, 'cache_models', None)
+    if type_models is None:
+        return is_pagination_type(parent_type, field_name, graphene_type)
+
+    if any(type_model not in tracked_models for type_model in type_models):
+        return False
+    models.update(type_models)
+    return True
+
+
+def selected_models(schema, parent_type, selection_set, fragments, models):
+    """
+    Collects the models of every django object type selected in an operation, including empty lists.
+    Returns False when a selected type can not be invalidated.
+    """
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.FragmentSpread):
+            fragment = fragments.get(selection.name.value)
+            if fragment is None or not selected_models(schema, parent_type, fragment.selection_set, fragments,
+                                                       models):
+                return False
+            continue
+
+        if isinstance(selection, ast.InlineFragment):
+            if not selected_models(schema, parent_type, selection.selection_set, fragments, models):
+                return False
+            continue
+
+        if selection.selection_set is None or selection.name.value.startswith('__'):
+            continue
+
+        field_def = parent_type.fields.get(selection.name.value)
+        if field_def is None:
+            # invalid documents are reported by validation
+            return False
+
+        field_type = unwrap(field_def.type)
+        if not isinstance(field_type, GraphQLObjectType):
+            return False
+
+        graphene_type = getattr(field_type, 'graphene_type', None)
+        if not selected_type_models(parent_type, selection.name.value, graphene_type, models):
+            return False
+
+        if not selected_models(schema, field_type, selection.selection_set, fragments, models):
+            return False
+
+    return True
+
+
+def get_operation_tags(schema, document_ast, operation, user_id):
+    fragments = {definition.name.value: definition for definition in document_ast.definitions
+                 if isinstance(definition, ast.FragmentDefinition)}
+
+    models = set()
+    if not selected_models(schema, schema.get_query_type(), operation.selection_set, fragments, models):
+        return None
+
+    return {model_tag(model, user_id if is_owned(model) else None) for model in models}
+
+
+collector = threading.local()
+
+
+class collect_tags(object):
+    """
+    Collects the tags of every tracked model instance loaded in the current thread.
+    """
+
+    def __enter__(self):
+        self.tags = set()
+        self.untracked = False
+        collector.current = self
+        return self
+
+    def __exit__(self, *args):
+        collector.current = None
+
+
+def current_collector():
+    return getattr(collector, 'current', None)
+
+
+def bind_collector(current):
+    # threads resolving fields for a request report the rows they load to the collector of that request
+    collector.current = current
+
+
+def post_init_collect(sender, instance, **kwargs):
+    current = current_collector()
+    if current is None:
+        return
+
+    if sender not in tracked_models:
+        current.untracked = True
+        return
+
+    current.tags.add(instance_tag(instance))
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    tags = [instance_tag(instance)]
+    # readers running concurrently with the transaction would otherwise cache the previous state again
+    transaction.on_commit(lambda: response_cache.invalidate(tags))
+
+
+def invalidate_on_change(*models):
+    for model in models:
+        tracked_models.add(model)
+        post_save.connect(invalidate_instance, sender=model, dispatch_uid='response_cache_save')
+        post_delete.connect(invalidate_instance, sender=model, dispatch_uid='response_cache_delete')
+
+
+post_init.connect(post_init_collect, dispatch_uid='response_cache_collect')
@@ -0,0 +1,367 @@
+import logging
+import os
+from collections import OrderedDict
+
+from graphql.error import GraphQLError, GraphQLLocatedError
+from graphql.execution import ExecutionResult
+from graphql.execution.base import ResolveInfo
+from graphql.execution.middleware import MiddlewareManager
+from graphql.execution.utils import default_resolve_fn
+from graphql.execution.values import get_argument_values
+from graphql.language import ast
+from graphql.language.base import parse
+from graphql.type import GraphQLEnumType, GraphQLList, GraphQLNonNull, GraphQLObjectType, GraphQLScalarType
+from graphql.validation import validate
+from promise import Promise
+
+from eddy_backend.cost import coerce_variables
+
+logger = logging.getLogger(__name__)
+
+
+class CompilationError(Exception):
+    """
+    Raised for constructs the compiler does not specialize, the operation is then left to the generic executor.
+    """
+    pass
+
+
+class Failed(object):
+    """
+    The value of a field whose resolver raised, the error is reported once.
+    """
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+# a completed object with a null non null field, nulled by its nullable parent
+INVALID = object()
+
+
+class Leaf(object):
+    __slots__ = ('serialize',)
+
+    def __init__(self, serialize):
+        self.serialize = serialize
+
+
+class ListOf(object):
+    __slots__ = ('of', 'non_null')
+
+    def __init__(self, of, non_null):
+        self.of = of
+        self.non_null = non_null
+
+
+class Object(object):
+    __slots__ = ('fields',)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+
+class CompiledField(object):
+    __slots__ = ('response_key', 'name', 'field_def', 'field_asts', 'parent_type', 'non_null', 'shape')
+
+    def __init__(self, response_key, name, field_def, field_asts, parent_type, non_null, shape):
+        self.response_key = response_key
+        self.name = name
+        self.field_def = field_def
+        self.field_asts = field_asts
+        self.parent_type = parent_type
+        self.non_null = non_null
+        self.shape = shape
+
+
+def collect_selections(parent_type, selection_sets, fragments, fields):
+    for selection_set in selection_sets:
+        for selection in selection_set.selections:
+            if selection.directives:
+                # skip and include depend on variables, leave them to the generic executor
+                raise CompilationError('directives are not compiled')
+
+            if isinstance(selection, ast.Field):
+                response_key = selection.alias.value if selection.alias else selection.name.value
+                fields.setdefault(response_key, []).append(selection)
+                continue
+
+            if isinstance(selection, ast.FragmentSpread):
+                fragment = fragments[selection.name.value]
+            else:
+                fragment = selection
+
+            if fragment.type_condition is not None and fragment.type_condition.name.value != parent_type.name:
+                raise CompilationError('fragments on other types are not compiled')
+
+            collect_selections(parent_type, [fragment.selection_set], fragments, fields)
+
+    return fields
+
+
+def compile_type(schema, graphql_type, selection_sets, fragments):
+    if isinstance(graphql_type, GraphQLNonNull):
+        return compile_type(schema, graphql_type.of_type, selection_sets, fragments)
+
+    if isinstance(graphql_type, GraphQLList):
+        return ListOf(compile_type(schema, graphql_type.of_type, selection_sets, fragments),
+                      isinstance(graphql_type.of_type, GraphQLNonNull))
+
+    if isinstance(graphql_type, (GraphQLScalarType, GraphQLEnumType)):
+        return Leaf(graphql_type.serialize)
+
+    if isinstance(graphql_type, GraphQLObjectType):
+        return Object(compile_fields(schema, graphql_type, selection_sets, fragments))
+
+    raise CompilationError('abstract types are not compiled')
+
+
+def compile_fields(schema, parent_type, selection_sets, fragments):
+    compiled_fields = list()
+
+    for response_key, field_asts in collect_selections(parent_type, selection_sets, fragments, OrderedDict()).items():
+        name = field_asts[0].name.value
+
+        if name == '__typename':
+            compiled_fields.append(CompiledField(response_key, name, None, field_asts, parent_type, True, None))
+            continue
+
+        if name.startswith('__'):
+            raise CompilationError('introspection is not compiled')
+
+        field_def = parent_type.fields[name]
+        sub_selection_sets = [field_ast.selection_set for field_ast in field_asts if field_ast.selection_set]
+        shape = compile_type(schema, field_def.type, sub_selection_sets, fragments)
+        non_null = isinstance(field_def.type, GraphQLNonNull)
+
+        compiled_fields.append(CompiledField(response_key, name, field_def, field_asts, parent_type, non_null, shape))
+
+    return compiled_fields
+
+
+class CompiledOperation(object):
+    """
+    A query specialized for its exact selection set.
+
+    Fields are resolved level by level: a field is resolved for every parent object at once and the promises
+    returned by data loaders are awaited together, so each level of the tree costs one batch per relation
+    instead of one promise per field and row. Errors and null propagation follow the generic executor.
+    """
+
+    def __init__(self, schema, document_ast, operation, fragments):
+        self.schema = schema
+        self.document_ast = document_ast
+        self.operation = operation
+        self.fragments = fragments
+        self.fields = compile_fields(schema, schema.get_query_type(), [operation.selection_set], fragments)
+
+    def __call__(self, root=None, context=None, variables=None, middleware=None, executor=None):
+        try:
+            variable_values = coerce_variables(self.schema, self.operation, variables)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+        if not middleware:
+            middleware = None
+        elif not isinstance(middleware, MiddlewareManager):
+            middleware = MiddlewareManager(*middleware, wrap_in_promise=False)
+
+        errors = []
+        execution = (root, context, variable_values, middleware, executor, errors)
+        try:
+            data = self.execute_fields(self.fields, [root], [[]], execution)[0]
+        finally:
+            if executor is not None:
+                executor.clean()
+
+        return ExecutionResult(data=None if data is INVALID else data, errors=errors)
+
+    def execute_fields(self, fields, parents, paths, execution):
+        results = [OrderedDict() for _ in parents]
+
+        executor = execution[4]
+        if executor is not None and paths == [[]]:
+            # the root fields are handed to the executor together, so a parallel executor resolves them concurrently
+            values = [self.resolve(field, parents, paths, execution) for field in fields
+                      if field.field_def is not None]
+            executor.wait_until_finished()
+            values = iter(values)
+            resolved = [None if field.field_def is None else self.await_values(next(values)) for field in fields]
+        else:
+            resolved = [None if field.field_def is None else self.await_values(self.resolve(field, parents, paths,
+                                                                                            execution))
+                        for field in fields]
+
+        for field, values in zip(fields, resolved):
+            if field.field_def is None:
+                values = [field.parent_type.name] * len(parents)
+            else:
+                field_paths = [path + [field.response_key] for path in paths]
+                values = self.complete(field, field.shape, field.non_null, values, field_paths, execution)
+
+            for index, value in enumerate(values):
+                if value is INVALID:
+                    results[index] = INVALID
+                elif results[index] is not INVALID:
+                    results[index][field.response_key] = value
+
+        return results
+
+    def resolve(self, field, parents, paths, execution):
+        root, context, variable_values, middleware, executor, errors = execution
+
+        args = get_argument_values(field.field_def.args, field.field_asts[0].arguments, variable_values)
+
+        resolver = field.field_def.resolver or default_resolve_fn
+        if middleware is not None:
+            resolver = middleware.get_field_resolver(resolver)
+
+        values = []
+        for parent, path in zip(parents, paths):
+            info = ResolveInfo(field.name, field.field_asts, field.field_def.type, field.parent_type, self.schema,
+                               self.fragments, root, self.operation, variable_values, context,
+                               path + [field.response_key])
+            try:
+                if executor is not None and not path:
+                    values.append(executor.execute(resolver, parent, info, **args))
+                else:
+                    values.append(resolver(parent, info, **args))
+            except Exception as e:
+                values.append(Failed(e))
+
+        return values
+
+    def await_values(self, values):
+        if not any(Promise.is_thenable(value) for value in values):
+            return values
+
+        # data loaders dispatch a single batch for all the promises of a level
+        return Promise.all([Promise.resolve(value).then(None, Failed) if Promise.is_thenable(value) else value
+                            for value in values]).get()
+
+    def report(self, field, error, path, execution):
+        errors = execution[5]
+        errors.append(error if isinstance(error, GraphQLLocatedError) else
+                      GraphQLLocatedError(field.field_asts, original_error=error, path=path))
+
+    def complete(self, field, shape, non_null, values, paths, execution):
+        """
+        Completes the values of a field for every parent, a null in a non null position completes to INVALID.
+        """
+        completed = []
+        for value, path in zip(values, paths):
+            if isinstance(value, Failed):
+                self.report(field, value.error, path, execution)
+                value = None
+            elif value is None and non_null:
+                self.report(field, GraphQLError('Cannot return null for non-nullable field {}.{}.'.format(
+                    field.parent_type.name, field.name)), path, execution)
+            completed.append(value)
+
+        if isinstance(shape, Leaf):
+            serialized = []
+            for value, path in zip(completed, paths):
+                try:
+                    serialized.append(None if value is None else shape.serialize(value))
+                except Exception as e:
+                    self.report(field, e, path, execution)
+                    serialized.append(None)
+            completed = serialized
+        elif isinstance(shape, ListOf):
+            # flatten the lists of all parents, complete the items together and split them again
+            lists = [None if value is None else list(value) for value in completed]
+            items = [item for value in lists if value is not None for item in value]
+            item_paths = [path + [index] for value, path in zip(lists, paths) if value is not None
+                          for index in range(len(value))]
+            completed_items = iter(self.complete(field, shape.of, shape.non_null, items, item_paths, execution))
+            completed = []
+            for value in lists:
+                if value is None:
+                    completed.append(None)
+                    continue
+                value = [next(completed_items) for _ in value]
+                completed.append(INVALID if any(item is INVALID for item in value) else value)
+        else:
+            present = [(value, path) for value, path in zip(completed, paths) if value is not None]
+            objects = iter(self.execute_fields(shape.fields, [value for value, _ in present],
+                                               [path for _, path in present], execution))
+            completed = [None if value is None else next(objects) for value in completed]
+
+        if non_null:
+            return [INVALID if value is None or value is INVALID else value for value in completed]
+        # nullable positions absorb the nulls of their non null fields
+        return [None if value is INVALID else value for value in completed]
+
+
+class OperationRegistry(object):
+    """
+    Holds the compiled operations of the documents found in a directory, keyed by the hash of their query string.
+    """
+
+    def __init__(self, directory, document_hash):
+        self.directory = directory
+        self.document_hash = document_hash
+        self.documents = None
+
+    def load(self, schema):
+        documents = dict()
+
+        if not self.directory or not os.path.isdir(self.directory):
+            return documents
+
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith('.graphql'):
+                continue
+
+            with open(os.path.join(self.directory, file_name)) as file:
+                document_string = file.read()
+
+            document_ast = parse(document_string)
+            if validate(schema, document_ast):
+                logger.warning('Registered operation %s is invalid and will not be compiled', file_name)
+                continue
+
+            fragments = {definition.name.value: definition for definition in document_ast.definitions
+                         if isinstance(definition, ast.FragmentDefinition)}
+
+            operations = dict()
+            for definition in document_ast.definitions:
+                if not isinstance(definition, ast.OperationDefinition) or definition.operation != 'query':
+                    continue
+
+                try:
+                    operation = CompiledOperation(schema, document_ast, definition, fragments)
+                except CompilationError as e:
+                    logger.debug('Registered operation %s can not be compiled: %s', file_name, e)
+                    continue
+
+                operations[definition.name.value if definition.name else None] = operation
+
+            if operations:
+                documents[self.document_hash(document_string)] = operations
+
+        return documents
+
+    def get(self, schema, key):
+        # compiled lazily since the schema can only be built once every app is loaded
+        if self.documents is None:
+            self.documents = self.load(schema)
+
+        return self.documents.get(key)
+
+
+def execute_compiled(operations, fallback, root=None, context=None, variables=None, operation_name=None,
+                     middleware=None, executor=None, **kwargs):
+    if operation_name is None and len(operations) == 1:
+        operation = next(iter(operations.values()))
+    else:
+        operation = operations.get(operation_name)
+
+    if operation is None:
+        # operations that could not be compiled were left out of the registry
+        return fallback(root=root, context=context, variables=variables, operation_name=operation_name,
+                        middleware=middleware, executor=executor, **kwargs)
+
+    # resolver errors are reported in the result, the operation is never executed twice
+    return operation(root=root, context=context, variables=variables, middleware=middleware, executor=executor)
@@ -0,0 +1,176 @@
+from django.conf import settings
+from graphql.error import GraphQLError
+from graphene_django.settings import graphene_settings
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.language import ast
+from graphql.type import GraphQLList, GraphQLNonNull, GraphQLObjectType
+
+
+class QueryCost(object):
+    __slots__ = ('cost', 'depth')
+
+    def __init__(self, cost, depth):
+        self.cost = cost
+        self.depth = depth
+
+    def as_extension(self):
+        return {
+            'requestedQueryCost': self.cost,
+            'maximumAvailable': settings.GRAPHQL_COST['MAX_COST'],
+            'depth': self.depth,
+            'maximumDepth': settings.GRAPHQL_COST['MAX_DEPTH'],
+        }
+
+
+def unwrap(graphql_type):
+    is_list = False
+    while isinstance(graphql_type, (GraphQLNonNull, GraphQLList)):
+        if isinstance(graphql_type, GraphQLList):
+            is_list = True
+        graphql_type = graphql_type.of_type
+
+    return graphql_type, is_list
+
+
+def is_connection(graphql_type):
+    return isinstance(graphql_type, GraphQLObjectType) and 'edges' in graphql_type.fields \
+           and 'pageInfo' in graphql_type.fields
+
+
+class CostAnalyser(object):
+    """
+    Statically estimates the cost of an operation before it is executed.
+
+    Every field costs its weight (by default 1 for fields returning objects and 0 for scalars) times the number
+    of parent objects it is resolved for. Lists multiply the cost of their selections by their page size when
+    paginated with first or last (the relay max limit without them), and by the configured list multiplier
+    otherwise. The variables need to be coerced already.
+    """
+
+    def __init__(self, schema, fragments, variables):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or dict()
+        self.weights = settings.GRAPHQL_COST['WEIGHTS']
+        self.list_multiplier = settings.GRAPHQL_COST['LIST_MULTIPLIER']
+        self.max_depth = 0
+
+    def page_size(self, field_def, field_ast):
+        if not {'first', 'last'} & set(field_def.args.keys()):
+            return None
+
+        # connections return at most the relay max limit, which is also their page size without first or last
+        max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        args = get_argument_values(field_def.args, field_ast.arguments, self.variables)
+        sizes = [args[name] for name in ('first', 'last') if args.get(name) is not None]
+        return min(max(min(sizes), 0), max_limit) if sizes else max_limit
+
+    def selection_cost(self, parent_type, selection_set, multiplier, depth, paginated=False):
+        self.max_depth = max(self.max_depth, depth)
+        cost = 0
+
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.FragmentSpread):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is None:
+                    # invalid documents are reported by validation
+                    continue
+                cost += self.selection_cost(parent_type, fragment.selection_set, multiplier, depth, paginated)
+                continue
+
+            if isinstance(selection, ast.InlineFragment):
+                cost += self.selection_cost(parent_type, selection.selection_set, multiplier, depth, paginated)
+                continue
+
+            name = selection.name.value
+            if name.startswith('__') or not isinstance(parent_type, GraphQLObjectType):
+                # introspection is free
+                continue
+
+            field_def = parent_type.fields.get(name)
+            if field_def is None:
+                continue
+
+            field_type, is_list = unwrap(field_def.type)
+            default_weight = 1 if selection.selection_set is not None else 0
+            cost += multiplier * self.weights.get(parent_type.name + '.' + name, default_weight)
+
+            if selection.selection_set is None:
+                continue
+
+            child_multiplier = multiplier
+            page_size = self.page_size(field_def, selection)
+            if page_size is not None:
+                child_multiplier *= page_size
+            elif is_list and not paginated:
+                child_multiplier *= self.list_multiplier
+
+            # the edges of a connection are already accounted for by its page size
+            cost += self.selection_cost(field_type, selection.selection_set, child_multiplier, depth + 1,
+                                        paginated=page_size is not None and is_connection(field_type))
+
+        return cost
+
+    def analyse(self, operation):
+        if operation.operation == 'mutation':
+            root_type = self.schema.get_mutation_type()
+        else:
+            root_type = self.schema.get_query_type()
+
+        cost = self.selection_cost(root_type, operation.selection_set, 1, 0)
+        return QueryCost(cost, self.max_depth)
+
+
+def get_operation(document_ast, operation_name):
+    operations = [definition for definition in document_ast.definitions
+                  if isinstance(definition, ast.OperationDefinition)]
+
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+
+    for operation in operations:
+        if operation.name is not None and operation.name.value == operation_name:
+            return operation
+
+    return None
+
+
+def coerce_variables(schema, operation, variables):
+    """
+    Coerces the variables to the types declared by the operation, raises a GraphQLError for invalid values.
+    """
+    if variables is not None and not isinstance(variables, dict):
+        raise GraphQLError('Variables are invalid JSON.')
+
+    try:
+        return get_variable_values(schema, operation.variable_definitions or [], variables)
+    except (TypeError, ValueError) as e:
+        # the scalars of graphql core raise instead of reporting some invalid values
+        raise GraphQLError('Variables are invalid: {}'.format(e))
+
+
+def analyse_query_cost(schema, document_ast, operation_name, variables):
+    """
+    Returns the QueryCost of the operation, or None when the operation can not be determined
+    (the executor reports that itself). Invalid variables raise a GraphQLError.
+    """
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return None
+
+    fragments = {definition.name.value: definition for definition in document_ast.definitions
+                 if isinstance(definition, ast.FragmentDefinition)}
+
+    return CostAnalyser(schema, fragments, coerce_variables(schema, operation, variables)).analyse(operation)
+
+
+def check_query_cost(query_cost):
+    if query_cost.depth > settings.GRAPHQL_COST['MAX_DEPTH']:
+        return GraphQLError('Query depth {} exceeds the maximum depth of {}.'.format(
+            query_cost.depth, settings.GRAPHQL_COST['MAX_DEPTH']))
+
+    if query_cost.cost > settings.GRAPHQL_COST['MAX_COST']:
+        return GraphQLError('Query cost {} exceeds the maximum cost of {}.'.format(
+            query_cost.cost, settings.GRAPHQL_COST['MAX_COST']))
+
+    return None
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from sys import exc_info
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import QuerySet
+from promise import Promise
+
+from eddy_backend.cache import bind_collector, current_collector
+from eddy_backend.tracing import current_trace, tracing
+
+
+def resolve_in_worker(current, trace, fn, args, kwargs):
+    # worker threads keep their own database connection, close it when it is obsolete like django does per request
+    close_old_connections()
+    bind_collector(current)
+    try:
+        with tracing(trace):
+            result = fn(*args, **kwargs)
+
+            # querysets are lazy, evaluate them here so the queries of independent root fields overlap
+            if isinstance(result, QuerySet):
+                len(result)
+
+        return result
+    finally:
+        bind_collector(None)
+        close_old_connections()
+
+
+class RootFieldThreadPoolExecutor(object):
+    """
+    A graphql core executor which resolves the root fields of a query concurrently on a bounded thread pool.
+
+    Only the root resolvers run on the pool. Their results are completed on the request thread once they are
+    available, so nested resolvers and the request scoped data loaders keep running on a single thread.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.pending = []
+
+    def execute(self, fn, *args, **kwargs):
+        info = args[1]
+        # mutations are executed serially as required by the specification
+        if len(info.path) != 1 or info.operation.operation != 'query':
+            return fn(*args, **kwargs)
+
+        promise = Promise()
+        future = self.pool.submit(resolve_in_worker, current_collector(), current_trace(), fn, args, kwargs)
+        self.pending.append((promise, future))
+        return promise
+
+    def wait_until_finished(self):
+        while self.pending:
+            pending, self.pending = self.pending, []
+            for promise, future in pending:
+                try:
+                    promise.do_resolve(future.result())
+                except Exception as e:
+                    promise.do_reject(e, traceback=exc_info()[2])
+
+    def clean(self):
+        self.pending = []
+
+
+pool = ThreadPoolExecutor(max_workers=settings.GRAPHQL_PARALLEL_EXECUTOR['MAX_WORKERS'],
+                          thread_name_prefix='graphql')
+
+
+def get_parallel_executor():
+    # executors keep the pending fields of a single execution, the pool is shared by every request of a worker
+    return RootFieldThreadPoolExecutor(pool)
@@ -0,0 +1,155 @@
+import logging
+import os
+import re
+import time
+from functools import wraps
+
+from graphene.utils.str_converters import to_camel_case
+from graphql.type import GraphQLObjectType
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, multiprocess, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+try:
+    import uwsgi
+except ImportError:
+    # not running inside uwsgi, like in the development server or the management commands
+    uwsgi = None
+
+logger = logging.getLogger(__name__)
+
+# metrics of every uwsgi worker are written to files in this directory and summed when scraped
+MULTIPROCESS_DIR = os.environ.get('prometheus_multiproc_dir')
+
+operation_duration = Histogram(
+    'graphql_operation_duration_seconds', 'Duration of graphql operations.', ['operation_name', 'operation_type'])
+
+resolver_duration = Histogram(
+    'graphql_resolver_duration_seconds', 'Duration of graphql resolvers, without awaiting the promises they return.',
+    ['field'], buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, float('inf')))
+
+request_db_queries = Histogram(
+    'graphql_request_db_queries', 'Database queries executed by a graphql request.',
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, float('inf')))
+
+kafka_connect_duration = Histogram(
+    'kafka_connect_request_duration_seconds', 'Duration of Kafka Connect REST calls.', ['method', 'status'])
+
+kafka_connect_errors = Counter(
+    'kafka_connect_request_errors_total', 'Kafka Connect REST calls failing or answered with an error status.',
+    ['method'])
+
+celery_publish_duration = Histogram(
+    'celery_publish_duration_seconds', 'Duration of publishing celery tasks to the broker.', ['task'])
+
+# operation names are chosen by clients, anything unusual is reported together to bound the number of series
+OPERATION_NAME = re.compile(r'^[_A-Za-z][_0-9A-Za-z]{0,63}$')
+
+
+def operation_label(operation_name):
+    if operation_name is None:
+        return 'anonymous'
+
+    return operation_name if OPERATION_NAME.match(operation_name) else 'other'
+
+
+def observe_kafka_connect(method, send, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = send(*args, **kwargs)
+    except Exception:
+        kafka_connect_errors.labels(method).inc()
+        kafka_connect_duration.labels(method, 'error').observe(time.perf_counter() - start)
+        raise
+
+    kafka_connect_duration.labels(method, str(response.status_code)).observe(time.perf_counter() - start)
+    if response.status_code >= 400:
+        kafka_connect_errors.labels(method).inc()
+
+    return response
+
+
+def publish_celery_task(app, name, args, **options):
+    start = time.perf_counter()
+    try:
+        return app.send_task(name, args, **options)
+    finally:
+        celery_publish_duration.labels(name).observe(time.perf_counter() - start)
+
+
+def timed_resolver(resolver, field):
+    observe = resolver_duration.labels(field).observe
+
+    @wraps(resolver)
+    def resolve(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return resolver(*args, **kwargs)
+        finally:
+            observe(time.perf_counter() - start)
+
+    return resolve
+
+
+def instrument_resolvers(schema):
+    """
+    Times the resolvers defined by the object types of the schema.
+    Fields resolved by attribute lookup are left alone, they are neither interesting nor cheap to time.
+    """
+    for graphql_type in schema.get_type_map().values():
+        graphene_type = getattr(graphql_type, 'graphene_type', None)
+        if not isinstance(graphql_type, GraphQLObjectType) or graphene_type is None:
+            continue
+
+        for name, field in graphene_type._meta.fields.items():
+            # the resolvers of graphene itself, like the one of DjangoObjectType ids, are attribute lookups as well
+            resolver = getattr(field, 'resolver', None) or getattr(graphene_type, 'resolve_' + name, None)
+            if resolver is None or getattr(resolver, '__module__', '').startswith('graphene'):
+                continue
+
+            field_name = getattr(field, 'name', None) or (to_camel_case(name) if schema.auto_camelcase else name)
+            field_def = graphql_type.fields.get(field_name)
+            if field_def is not None and field_def.resolver is not None:
+                field_def.resolver = timed_resolver(field_def.resolver, graphql_type.name + '.' + field_name)
+
+
+class UwsgiCollector(object):
+    """
+    Reports the state of every uwsgi worker, as seen by the worker serving the scrape.
+    """
+
+    def collect(self):
+        workers = GaugeMetricFamily('uwsgi_workers', 'uwsgi workers by state.', labels=['state'])
+        if uwsgi is not None:
+            states = dict()
+            for worker in uwsgi.workers():
+                state = worker['status'] if isinstance(worker['status'], str) else worker['status'].decode()
+                states[state] = states.get(state, 0) + 1
+            for state, count in sorted(states.items()):
+                workers.add_metric([state], count)
+        yield workers
+
+
+def get_registry():
+    if MULTIPROCESS_DIR is None:
+        return REGISTRY
+
+    # the metrics of this process are read back from the files like the ones of the other workers
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(UwsgiCollector())
+    return registry
+
+
+if MULTIPROCESS_DIR is None:
+    REGISTRY.register(UwsgiCollector())
+
+
+def start_metrics_server(port):
+    """
+    Exports the metrics of a management command from a background thread, they are recorded in its own process.
+    """
+    try:
+        start_http_server(port, registry=get_registry())
+    except OSError as e:
+        # a second command of the same container, its metrics are not exported
+        logger.warning('Exporting the metrics on port %d failed: %s', port, e)
@@ -0,0 +1,224 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+
+import eddy_backend.celery
+from eddy_backend.metrics import publish_celery_task
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolFullError(Exception):
+    """
+    Raised when the spool holds as many tasks as it may, the broker has been down for too long.
+    """
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running as another user
+        return True
+    return True
+
+
+class Spool(object):
+    """
+    Keeps the tasks published while the broker is unreachable in a directory shared by the processes of a host,
+    one file per task. Files are claimed by renaming them, so a task is replayed by a single process.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def names(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def is_empty(self):
+        return not self.names()
+
+    def put(self, message, force=False):
+        if not force and len(self.names()) >= self.max_size:
+            raise SpoolFullError()
+
+        # names sort by the time the tasks were published
+        name = '%020d-%s.json' % (time.time_ns(), message['task_id'])
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(message, file)
+        os.rename(path + '.tmp', path)
+
+    def reclaim(self):
+        """
+        Returns the files claimed by processes which exited while replaying them to the spool.
+        """
+        for name in os.listdir(self.directory):
+            path, _, pid = name.rpartition('.')
+            if not path.endswith('.json') or not pid.isdigit():
+                continue
+            # the files claimed by a previous process with the same pid are not replayed by this one yet
+            if int(pid) != os.getpid() and is_running(int(pid)):
+                continue
+
+            try:
+                os.rename(os.path.join(self.directory, name), os.path.join(self.directory, path))
+            except FileNotFoundError:
+                # reclaimed by another process
+                continue
+
+    def replay(self, send):
+        """
+        Sends the spooled tasks in order, stops at the first failure and returns how many were sent.
+        """
+        count = 0
+        for name in self.names():
+            path = os.path.join(self.directory, name)
+            claimed = path + '.' + str(os.getpid())
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                # replayed by another process
+                continue
+
+            with open(claimed) as file:
+                message = json.load(file)
+            try:
+                send(message)
+            except Exception:
+                os.rename(claimed, path)
+                raise
+            os.remove(claimed)
+            count += 1
+
+        return count
+
+
+class Publisher(object):
+    """
+    Publishes celery tasks from a background thread, so requests never wait for the broker.
+    Tasks published while the broker is unreachable are spooled and replayed in order once it is back.
+    """
+
+    def __init__(self, app, queue_size, spool, retry_interval):
+        self.app = app
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.spool = spool
+        self.retry_interval = retry_interval
+        # the spool is replayed from then on, a broker that just failed is not tried again for every task
+        self.retry_at = 0
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def ensure_started(self):
+        # uwsgi forks its workers after loading the application, every worker starts its own flusher
+        if self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.pid != os.getpid():
+                self.spool.reclaim()
+                threading.Thread(target=self.run, name='celery-publisher', daemon=True).start()
+                self.pid = os.getpid()
+
+    def publish(self, name, args, task_id=None, **options):
+        """
+        Queues a task and returns its id right away, the options are passed on to send_task.
+        """
+        message = {'name': name, 'args': list(args), 'task_id': task_id or str(uuid4()), 'options': options}
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.overflow(message)
+
+        return message['task_id']
+
+    def overflow(self, message):
+        # the flusher is behind, the task is spooled or published right away
+        try:
+            self.spool.put(message)
+            return
+        except SpoolFullError:
+            pass
+
+        try:
+            self.send(message)
+        except Exception as e:
+            logger.warning('Publishing %s failed: %s', message['name'], e)
+            self.keep(message)
+
+    def keep(self, message):
+        # the job of a published task waits for it, the spool grows past its size instead of dropping the task
+        try:
+            self.spool.put(message)
+        except SpoolFullError:
+            logger.error('The spool is full, spooling %s %s anyway', message['name'], message['task_id'])
+            self.spool.put(message, force=True)
+
+    def send(self, message):
+        # the producer and its connection are taken from the pool of the app and reused by the following tasks
+        with self.app.producer_or_acquire() as producer:
+            publish_celery_task(self.app, message['name'], message['args'], task_id=message['task_id'],
+                                producer=producer, retry=False, **message.get('options', {}))
+
+    def flush(self, message):
+        # spooled tasks go first, the tasks of a process are published in order
+        if self.spool.is_empty():
+            try:
+                self.send(message)
+                return
+            except Exception as e:
+                logger.warning('Publishing %s failed, spooling it: %s', message['name'], e)
+                self.retry_at = time.monotonic() + self.retry_interval
+
+        self.keep(message)
+
+    def run(self):
+        while True:
+            try:
+                message = self.queue.get(timeout=self.retry_interval)
+            except queue.Empty:
+                message = None
+
+            if time.monotonic() >= self.retry_at and not self.spool.is_empty():
+                try:
+                    self.spool.replay(self.send)
+                except Exception as e:
+                    logger.warning('Replaying the spooled tasks failed: %s', e)
+                    self.retry_at = time.monotonic() + self.retry_interval
+
+            if message is not None:
+                self.flush(message)
+
+    def spill(self):
+        # the queued tasks outlive the process in the spool
+        while True:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+            self.keep(message)
+
+
+config = settings.CELERY_PUBLISHER
+publisher = Publisher(eddy_backend.celery.app, config['QUEUE_SIZE'],
+                      Spool(config['SPOOL_DIR'], config['MAX_SPOOLED']), config['RETRY_INTERVAL'])
+
+atexit.register(publisher.spill)
+
+
+def publish(name, args, task_id=None, **options):
+    return publisher.publish(name, args, task_id, **options)
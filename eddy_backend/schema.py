@@ -0,0 +1,34 @@
+import graphene
+
+from authentication.models import User
+from eddy_backend.backend import document_cache
+from utils.exceptions import UnauthorizedException, ForbiddenException
+
+
+# DocumentCache
+class DocumentCacheType(graphene.ObjectType):
+    hits = graphene.Int(required=True)
+    misses = graphene.Int(required=True)
+    size = graphene.Int(required=True)
+    max_size = graphene.Int(required=True)
+
+
+class DocumentCacheQuery(graphene.ObjectType):
+    document_cache = graphene.Field(DocumentCacheType)
+
+    @classmethod
+    def resolve_document_cache(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        if not info.context.user.is_superuser:
+            # only superusers can inspect the document cache
+            raise ForbiddenException()
+
+        return DocumentCacheType(hits=document_cache.hits, misses=document_cache.misses, size=len(document_cache),
+                                 max_size=document_cache.max_size)
+
+
+query_list = [DocumentCacheQuery]
+mutation_list = []
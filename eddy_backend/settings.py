@@ -141,25 +141,166 @@ AUTH_USER_MODEL = 'authentication.User'
 # Graphene
 GRAPHENE = {
     'SCHEMA': 'schema.schema',
-    'MIDDLEWARE': [
-        'graphql_jwt.middleware.JSONWebTokenMiddleware',
-    ],
+}
+
+# Parsed and validated graphql documents kept per worker, also serving automatic persisted queries
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.environ.get('GRAPHQL_DOCUMENT_CACHE_SIZE', default='1000'))
+
+# Queries registered in this directory are compiled ahead of execution into specialized executors
+GRAPHQL_COMPILED_OPERATIONS_DIR = os.environ.get('GRAPHQL_COMPILED_OPERATIONS_DIR',
+                                                 default=os.path.join(BASE_DIR, 'operations'))
+
+# Static cost analysis, operations above the maximum cost or depth are rejected before execution
+# weights are keyed by 'Type.field' and default to 1 for fields returning objects and 0 for scalars
+GRAPHQL_COST = {
+    'MAX_COST': int(os.environ.get('GRAPHQL_MAX_COST', default='10000')),
+    'MAX_DEPTH': int(os.environ.get('GRAPHQL_MAX_DEPTH', default='10')),
+    'LIST_MULTIPLIER': int(os.environ.get('GRAPHQL_LIST_MULTIPLIER', default='10')),
+    'WEIGHTS': {
+        'Mutation.sendCeleryTask': 10,
+        'Query.compilePipeline': 10,
+        'Mutation.deployPipeline': 10,
+    },
+}
+
+# Operations accepted in a single batched request to /graphql
+GRAPHQL_MAX_BATCH_SIZE = int(os.environ.get('GRAPHQL_MAX_BATCH_SIZE', default='50'))
+
+# Responses of read queries cached per user and invalidated by changes of the rows they touched
+# only enabled with a redis host, the invalidations of the background commands have to reach every worker
+# the in process store of a cache enabled without a redis host is meant for tests
+GRAPHQL_RESPONSE_CACHE_REDIS_HOST = os.environ.get('GRAPHQL_RESPONSE_CACHE_REDIS_HOST', default=None)
+GRAPHQL_RESPONSE_CACHE = {
+    'ENABLED': True if os.environ.get('GRAPHQL_RESPONSE_CACHE', default='True') == 'True'
+    and GRAPHQL_RESPONSE_CACHE_REDIS_HOST else False,
+    'REDIS_HOST': GRAPHQL_RESPONSE_CACHE_REDIS_HOST,
+    'REDIS_PORT': os.environ.get('GRAPHQL_RESPONSE_CACHE_REDIS_PORT', default='6379'),
+    'REDIS_DB': os.environ.get('GRAPHQL_RESPONSE_CACHE_REDIS_DB', default='1'),
+    'TIMEOUT': int(os.environ.get('GRAPHQL_RESPONSE_CACHE_TIMEOUT', default='300')),
+}
+
+# Root fields of queries sent with the X-GraphQL-Executor: parallel header are resolved concurrently
+GRAPHQL_PARALLEL_EXECUTOR = {
+    'MAX_WORKERS': int(os.environ.get('GRAPHQL_PARALLEL_EXECUTOR_MAX_WORKERS', default='4')),
+}
+
+# Operations sent with the X-GraphQL-Trace header by superusers (or anyone in debug) return their SQL statements,
+# resolver timings and outbound HTTP calls in the tracing extension, and log them as a single JSON line
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'eddy_backend.tracing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 # Graphql JWT
 GRAPHQL_JWT = {
     'JWT_AUTH_HEADER_PREFIX': 'Bearer',
 }
+# tokens are authenticated once per request by the graphql view, verified tokens and their users are cached
+JWT_TOKEN_CACHE_SIZE = int(os.environ.get('JWT_TOKEN_CACHE_SIZE', default='1000'))
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', default='30'))
 AUTHENTICATION_BACKENDS = [
     'graphql_jwt.backends.JSONWebTokenBackend',
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# the long running management commands export their metrics over http on this port, a port per container, the
+# web workers export theirs on /metrics
+METRICS_PORT = int(os.environ.get('METRICS_PORT', default='9100'))
+
 # Kafka
 KAFKA_HOST = os.environ.get('KAFKA_HOST', default='debezium-kafka')
 KAFKA_PORT = os.environ.get('KAFKA_PORT', default='9092')
 
+# Kafka Connect
+KAFKA_CONNECT = {
+    'CONNECT_TIMEOUT': float(os.environ.get('KAFKA_CONNECT_CONNECT_TIMEOUT', default='3')),
+    'READ_TIMEOUT': float(os.environ.get('KAFKA_CONNECT_READ_TIMEOUT', default='10')),
+    # keep-alive connections per cluster
+    'POOL_SIZE': int(os.environ.get('KAFKA_CONNECT_POOL_SIZE', default='10')),
+    # retries of requests answered with 409 while the cluster rebalances, the delay doubles for every retry
+    'RETRIES': int(os.environ.get('KAFKA_CONNECT_RETRIES', default='3')),
+    'RETRY_DELAY': float(os.environ.get('KAFKA_CONNECT_RETRY_DELAY', default='0.5')),
+    # consecutive failures opening the circuit of a cluster and seconds before it is tried again
+    'FAILURE_THRESHOLD': int(os.environ.get('KAFKA_CONNECT_FAILURE_THRESHOLD', default='5')),
+    'RESET_TIMEOUT': float(os.environ.get('KAFKA_CONNECT_RESET_TIMEOUT', default='30')),
+}
+# connectors drifting from the data connectors are repaired by the reconcile_connectors command
+KAFKA_CONNECT_RECONCILER = {
+    'INTERVAL': float(os.environ.get('KAFKA_CONNECT_RECONCILER_INTERVAL', default='300')),
+    # calls issued concurrently per cluster
+    'MAX_WORKERS': int(os.environ.get('KAFKA_CONNECT_RECONCILER_MAX_WORKERS', default='8')),
+}
+# the statuses of the connectors are polled by the poll_connector_statuses command, queries only read them
+CONNECTOR_STATUS = {
+    'INTERVAL': float(os.environ.get('CONNECTOR_STATUS_INTERVAL', default='10')),
+}
+# the health of integrations is probed by the probe_integrations command
+INTEGRATION_HEALTH = {
+    'INTERVAL': float(os.environ.get('INTEGRATION_HEALTH_INTERVAL', default='30')),
+    # clusters probed concurrently
+    'MAX_WORKERS': int(os.environ.get('INTEGRATION_HEALTH_MAX_WORKERS', default='8')),
+}
+# data connector changes record their calls in an outbox, delivered by the dispatch_connector_requests command
+KAFKA_CONNECT_OUTBOX = {
+    'BATCH_SIZE': int(os.environ.get('KAFKA_CONNECT_OUTBOX_BATCH_SIZE', default='20')),
+    # seconds a batch is leased to a dispatcher, longer than delivering a batch takes
+    'LEASE': float(os.environ.get('KAFKA_CONNECT_OUTBOX_LEASE', default='600')),
+    'POLL_INTERVAL': float(os.environ.get('KAFKA_CONNECT_OUTBOX_POLL_INTERVAL', default='1')),
+    'MAX_ATTEMPTS': int(os.environ.get('KAFKA_CONNECT_OUTBOX_MAX_ATTEMPTS', default='10')),
+    # seconds before the first retry, doubled for every further attempt
+    'RETRY_DELAY': float(os.environ.get('KAFKA_CONNECT_OUTBOX_RETRY_DELAY', default='2')),
+    'MAX_RETRY_DELAY': float(os.environ.get('KAFKA_CONNECT_OUTBOX_MAX_RETRY_DELAY', default='300')),
+}
+
 # Celery
 CELERY_BROKER_TRANSPORT = os.environ.get('CELERY_BROKER_TRANSPORT', default='redis')
 CELERY_BROKER_HOST = os.environ.get('CELERY_BROKER_HOST', default='localhost')
 CELERY_BROKER_PORT = os.environ.get('CELERY_BROKER_PORT', default='6379')
+# tasks are published by a background thread of every process, they are spooled while the broker is unreachable
+CELERY_PUBLISHER = {
+    'QUEUE_SIZE': int(os.environ.get('CELERY_PUBLISHER_QUEUE_SIZE', default='1000')),
+    'SPOOL_DIR': os.environ.get('CELERY_PUBLISHER_SPOOL_DIR', default='/tmp/celery-spool'),
+    'MAX_SPOOLED': int(os.environ.get('CELERY_PUBLISHER_MAX_SPOOLED', default='10000')),
+    # seconds between two attempts to replay the spool
+    'RETRY_INTERVAL': float(os.environ.get('CELERY_PUBLISHER_RETRY_INTERVAL', default='5')),
+}
+# results of the flink and beam tasks, the workers need to use the same backend
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND',
+                                       default='redis://' + CELERY_BROKER_HOST + ':' + CELERY_BROKER_PORT + '/2')
+# the status of submitted jobs is reported by the monitor_jobs command
+JOB_MONITOR = {
+    # seconds between two reads of the result backend
+    'INTERVAL': float(os.environ.get('JOB_MONITOR_INTERVAL', default='5')),
+    'BATCH_SIZE': int(os.environ.get('JOB_MONITOR_BATCH_SIZE', default='500')),
+}
+# jobs of a workspace are published at RATE jobs per second and queue, in bursts of up to BURST jobs, the
+# excess is held and admitted by the monitor_jobs command
+JOB_ADMISSION = {
+    'RATE': float(os.environ.get('JOB_ADMISSION_RATE', default='0.1')),
+    'BURST': float(os.environ.get('JOB_ADMISSION_BURST', default='10')),
+    # seconds between two admissions of the held jobs
+    'INTERVAL': float(os.environ.get('JOB_ADMISSION_INTERVAL', default='1')),
+}
+# seconds a succeeded job is returned for an identical submission instead of submitting it again, unfinished
+# jobs are returned until they finish
+JOB_DEDUPLICATION_WINDOW = int(os.environ.get('JOB_DEDUPLICATION_WINDOW', default='300'))
+# seconds after its submission or start an unfinished job is presumed lost, identical submissions create a new job
+JOB_IN_FLIGHT_TIMEOUT = int(os.environ.get('JOB_IN_FLIGHT_TIMEOUT', default='3600'))
+# celery priorities of the job priorities, 0 is the highest priority on the redis transport
+JOB_PRIORITIES = {
+    'low': int(os.environ.get('JOB_PRIORITY_LOW', default='9')),
+    'normal': int(os.environ.get('JOB_PRIORITY_NORMAL', default='5')),
+    'high': int(os.environ.get('JOB_PRIORITY_HIGH', default='0')),
+}
@@ -0,0 +1,89 @@
+from django.test import TestCase
+
+from eddy_backend.backend import CachedDocumentBackend, DocumentCache, document_hash
+from schema import schema
+from utils.testing import GraphQLTestMixin, create_user
+
+
+class DocumentCacheTest(TestCase):
+    def test_evicts_the_least_recently_used_document(self):
+        cache = DocumentCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.peek('a'), 1)
+        self.assertIsNone(cache.peek('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_counts_hits_and_misses(self):
+        cache = DocumentCache(max_size=2)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+        cache.peek('a')
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+class CachedDocumentBackendTest(TestCase):
+    def test_parses_every_query_once(self):
+        backend = CachedDocumentBackend(DocumentCache(max_size=10))
+
+        document = backend.document_from_string(schema, '{ allProjects { id } }')
+
+        self.assertIs(backend.document_from_string(schema, '{ allProjects { id } }'), document)
+        self.assertEqual(backend.get_document_string(document_hash('{ allProjects { id } }')),
+                         '{ allProjects { id } }')
+
+    def test_keeps_validation_errors(self):
+        backend = CachedDocumentBackend(DocumentCache(max_size=10))
+
+        document = backend.document_from_string(schema, '{ allProjects { unknown } }')
+
+        self.assertEqual(len(document.validation_errors), 1)
+        self.assertIs(backend.document_from_string(schema, '{ allProjects { unknown } }'), document)
+
+
+class PersistedQueryTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('persisted')
+
+    def post_persisted(self, query_hash, query=None):
+        data = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}}
+        if query is not None:
+            data['query'] = query
+        return self.post_graphql(data, user=self.user)
+
+    def test_registers_queries_sent_with_their_hash(self):
+        query = '{ persisted: allProjects { id } }'
+
+        response = self.post_persisted(document_hash(query), query)
+        self.assertEqual(response.json()['data'], {'persisted': []})
+
+        response = self.post_persisted(document_hash(query))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'persisted': []})
+
+    def test_asks_for_unknown_queries(self):
+        response = self.post_persisted(document_hash('{ unknown: allProjects { id } }'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['errors'][0]['message'], 'PersistedQueryNotFound')
+
+    def test_rejects_mismatching_hashes(self):
+        response = self.post_persisted(document_hash('{ allProjects { id } }'), '{ allProjects { label } }')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['message'], 'provided sha does not match query')
+
+    def test_reports_errors_of_cached_invalid_documents(self):
+        for i in range(2):
+            content = self.execute('{ allProjects { invalidField } }', user=self.user, status=400)
+            self.assertEqual(len(content['errors']), 1)
+
+    def test_reports_syntax_errors(self):
+        content = self.execute('{ allProjects { id }', user=self.user, status=400)
+
+        self.assertIn('Syntax Error', content['errors'][0]['message'])
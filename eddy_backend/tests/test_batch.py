@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from pipelines.models import Pipeline
+from projects.models import Project
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+PIPELINE = 'query($id: IntID!) { pipeline(id: $id) { project { label } } }'
+
+
+@response_cache_enabled(False)
+class BatchTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('batch')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.pipeline = Pipeline.objects.create(user=self.user, project=self.project, label='pipeline', config={})
+
+    def test_answers_every_operation_in_order(self):
+        response = self.post_graphql([
+            {'query': '{ allProjects { label } }'},
+            {'query': PIPELINE, 'variables': {'id': self.pipeline.pk}},
+        ], user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([content['data'] for content in response.json()], [
+            {'allProjects': [{'label': 'project'}]},
+            {'pipeline': {'project': {'label': 'project'}}},
+        ])
+
+    def test_reports_errors_per_operation(self):
+        response = self.post_graphql([
+            {'query': '{ allProjects { unknown } }'},
+            {'query': PIPELINE, 'variables': {'id': 0}},
+            {'query': '{ allProjects { label } }'},
+        ], user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        first, second, third = response.json()
+        self.assertNotIn('data', first)
+        self.assertEqual(second['data'], {'pipeline': None})
+        self.assertEqual(len(second['errors']), 1)
+        self.assertEqual(third['data'], {'allProjects': [{'label': 'project'}]})
+
+    def test_operations_after_a_mutation_see_its_changes(self):
+        response = self.post_graphql([
+            {'query': PIPELINE, 'variables': {'id': self.pipeline.pk}},
+            {'query': 'mutation($id: IntID!) { updateProject(id: $id, label: "renamed") { project { id } } }',
+             'variables': {'id': self.project.pk}},
+            {'query': PIPELINE, 'variables': {'id': self.pipeline.pk}},
+        ], user=self.user)
+
+        first, _, third = response.json()
+        self.assertEqual(first['data']['pipeline']['project']['label'], 'project')
+        self.assertEqual(third['data']['pipeline']['project']['label'], 'renamed')
+
+    def test_reports_invalid_operations_in_their_slot(self):
+        response = self.post_graphql([
+            {'query': 'mutation($id: IntID!) { updateProject(id: $id, label: "renamed") { project { label } } }',
+             'variables': {'id': self.project.pk}},
+            {'variables': {}},
+            {'query': '{ allProjects { label } }'},
+        ], user=self.user)
+
+        self.assertEqual(response.status_code, 200)
+        first, second, third = response.json()
+        self.assertEqual(first['data'], {'updateProject': {'project': {'label': 'renamed'}}})
+        self.assertEqual(second, {'errors': [{'message': 'Must provide query string.'}]})
+        self.assertEqual(third['data'], {'allProjects': [{'label': 'renamed'}]})
+
+    def test_rejects_invalid_batches(self):
+        with override_settings(GRAPHQL_MAX_BATCH_SIZE=2):
+            for batch in ([], [{'query': '{ allProjects { id } }'}] * 3, [{'query': '{ allProjects { id } }'}, 1]):
+                response = self.post_graphql(batch, user=self.user)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(len(response.json()['errors']), 1)
+
+    def test_limits_batches_to_the_configured_size(self):
+        batch = [{'query': '{ allProjects { id } }'}] * settings.GRAPHQL_MAX_BATCH_SIZE
+
+        self.assertEqual(self.post_graphql(batch, user=self.user).status_code, 200)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+from graphql.language.base import parse
+
+from eddy_backend.cache import LocalTagStore, get_operation_tags, response_cache
+from eddy_backend.cost import get_operation
+from pipelines.models import Job
+from projects.models import Project
+from schema import schema
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+from workspaces.models import Workspace
+
+
+def tags_of(query, user_id=1):
+    document_ast = parse(query)
+    return get_operation_tags(schema, document_ast, get_operation(document_ast, None), user_id)
+
+
+class OperationTagsTest(TestCase):
+    def test_tags_owned_models_per_user(self):
+        self.assertEqual(tags_of('{ allProjects { id user { id } } }', user_id=7),
+                         {'projects.project:user:7', 'authentication.user'})
+
+    def test_tags_the_nodes_of_connections(self):
+        self.assertEqual(tags_of('{ allProjectsConnection(first: 1) { totalCount edges { node { id } } '
+                                 'pageInfo { hasNextPage } } }'), {'projects.project:user:1'})
+
+    def test_tags_the_models_declared_by_types_without_a_model(self):
+        self.assertEqual(tags_of('{ allWorkspaces { jobQueues { queue queued } } }'),
+                         {Workspace._meta.label_lower, Job._meta.label_lower + ':user:1'})
+
+    def test_does_not_cache_types_without_a_model(self):
+        self.assertIsNone(tags_of('{ documentCache { hits } }'))
+        self.assertIsNone(tags_of('{ allProjects { id } documentCache { hits } }'))
+
+
+@response_cache_enabled(True)
+class ResponseCacheTest(GraphQLTestMixin, TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(response_cache, 'store', LocalTagStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = create_user('cache')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+
+    def query(self, query, user=None):
+        content = self.execute(query, user=user or self.user)
+        return content.get('extensions', {}).get('responseCache'), content['data']
+
+    def test_answers_repeated_queries_from_the_cache(self):
+        self.assertEqual(self.query('{ allProjects { label } }'), ('MISS', {'allProjects': [{'label': 'project'}]}))
+        self.assertEqual(self.query('{ allProjects { label } }'), ('HIT', {'allProjects': [{'label': 'project'}]}))
+
+    def test_invalidates_responses_of_changed_rows(self):
+        self.query('{ allProjects { label } }')
+
+        self.project.label = 'renamed'
+        self.project.save()
+
+        self.assertEqual(self.query('{ allProjects { label } }'), ('MISS', {'allProjects': [{'label': 'renamed'}]}))
+
+    def test_invalidates_responses_of_created_rows(self):
+        self.query('{ allProjects { label } }')
+
+        Project.objects.create(user=self.user, workspace=self.user.workspace, label='other')
+
+        self.assertEqual(self.query('{ allProjects { label } }')[0], 'MISS')
+
+    def test_keeps_responses_of_other_users(self):
+        other = create_user('other')
+        self.query('{ allProjects { label } }')
+
+        Project.objects.create(user=other, workspace=other.workspace, label='other')
+
+        self.assertEqual(self.query('{ allProjects { label } }')[0], 'HIT')
+
+    def test_does_not_cache_the_document_cache(self):
+        admin = create_user('admin', is_superuser=True)
+
+        status, data = self.query('{ documentCache { hits } }', user=admin)
+        self.assertIsNone(status)
+
+        # the counters moved with the request before, a cached response would repeat them
+        status, repeated = self.query('{ documentCache { hits } }', user=admin)
+        self.assertIsNone(status)
+        self.assertGreater(repeated['documentCache']['hits'], data['documentCache']['hits'])
+
+    def test_does_not_cache_errors(self):
+        content = self.execute('{ project(id: 0) { label } }', user=self.user)
+        self.assertEqual(len(content['errors']), 1)
+
+        content = self.execute('{ project(id: 0) { label } }', user=self.user)
+        self.assertEqual(content['extensions']['responseCache'], 'MISS')
+
+    def test_does_not_cache_mutations(self):
+        query = 'mutation($id: IntID!) { updateProject(id: $id, label: "renamed") { project { label } } }'
+
+        content = self.execute(query, {'id': self.project.pk}, user=self.user)
+
+        self.assertNotIn('responseCache', content['extensions'])
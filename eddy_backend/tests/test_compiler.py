@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase
+
+from dashboards.models import Dashboard
+from eddy_backend.backend import document_hash, operation_registry
+from eddy_backend.compiler import OperationRegistry
+from pipelines.models import Pipeline
+from projects.models import Project
+from schema import schema
+from utils.exceptions import ForbiddenException, NotFoundException
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+def read_operation(file_name):
+    with open(os.path.join(settings.GRAPHQL_COMPILED_OPERATIONS_DIR, file_name)) as file:
+        return file.read()
+
+
+class OperationRegistryTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def register(self, file_name, document_string):
+        with open(os.path.join(self.directory, file_name), 'w') as file:
+            file.write(document_string)
+        return document_hash(document_string)
+
+    def test_compiles_valid_queries_only(self):
+        query = self.register('projects.graphql', 'query projects { allProjects { id label } }')
+        invalid = self.register('invalid.graphql', 'query invalid { allProjects { unknown } }')
+        mutation = self.register('mutation.graphql', 'mutation delete { deleteProject(id: 1) { id } }')
+        self.register('notes.txt', '{ allProjects { id } }')
+
+        registry = OperationRegistry(self.directory, document_hash)
+
+        self.assertEqual(list(registry.get(schema, query)), ['projects'])
+        self.assertIsNone(registry.get(schema, invalid))
+        self.assertIsNone(registry.get(schema, mutation))
+
+    def test_ignores_missing_directories(self):
+        registry = OperationRegistry(os.path.join(self.directory, 'missing'), document_hash)
+
+        self.assertIsNone(registry.get(schema, document_hash('{ allProjects { id } }')))
+
+
+@response_cache_enabled(False)
+class CompiledOperationTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('compiled')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        for i in range(2):
+            Pipeline.objects.create(user=self.user, project=self.project, label='pipeline' + str(i), config={})
+        Dashboard.objects.create(user=self.user, project=self.project, label='dashboard')
+        self.query = read_operation('project.graphql')
+
+    def test_registered_operation_is_compiled(self):
+        self.assertIn('project', operation_registry.get(schema, document_hash(self.query)))
+
+    def test_returns_the_result_of_the_generic_executor(self):
+        compiled = self.execute(self.query, {'id': self.project.pk}, user=self.user)
+        # a different query string is not registered, it runs on the generic executor
+        generic = self.execute(self.query + '\n', {'id': self.project.pk}, user=self.user)
+
+        self.assertNotIn('errors', compiled)
+        self.assertEqual(compiled['data'], generic['data'])
+        self.assertEqual([pipeline['label'] for pipeline in compiled['data']['project']['pipelines']],
+                         ['pipeline0', 'pipeline1'])
+
+    def test_reports_resolver_errors_once(self):
+        other = create_user('other')
+        project = Project.objects.create(user=other, workspace=other.workspace, label='other')
+
+        for project_id, error in ((project.pk, ForbiddenException()), (0, NotFoundException())):
+            content = self.execute(self.query, {'id': project_id}, user=self.user)
+
+            self.assertEqual(content['data'], {'project': None})
+            self.assertEqual([(error['message'], error['path']) for error in content['errors']],
+                             [(error.args[0], ['project'])])
+
+    def test_rejects_invalid_variables(self):
+        content = self.execute(self.query, {'id': 'abc'}, user=self.user, status=400)
+
+        self.assertEqual(len(content['errors']), 1)
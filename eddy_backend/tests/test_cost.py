@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from graphene_django.settings import graphene_settings
+from graphql.error import GraphQLError
+from graphql.language.base import parse
+
+from eddy_backend.cost import analyse_query_cost
+from schema import schema
+from utils.testing import GraphQLTestMixin, create_user
+
+CONNECTION = '''
+query($first: Int) {
+  allProjectsConnection(first: $first) { edges { node { id } } }
+}
+'''
+
+MAX_LIMIT = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+LIST_MULTIPLIER = settings.GRAPHQL_COST['LIST_MULTIPLIER']
+
+
+def cost_of(query, variables=None, operation_name=None):
+    return analyse_query_cost(schema, parse(query), operation_name, variables)
+
+
+class CostAnalysisTest(TestCase):
+    def test_multiplies_lists(self):
+        # the projects, then the pipelines of every project a list is assumed to hold
+        query_cost = cost_of('{ allProjects { id pipelines { id } } }')
+
+        self.assertEqual((query_cost.cost, query_cost.depth), (1 + LIST_MULTIPLIER, 2))
+
+    def test_multiplies_connections_by_their_page_size(self):
+        self.assertEqual(cost_of(CONNECTION, {'first': 5}).cost, 1 + 5 + 5)
+        self.assertEqual(cost_of(CONNECTION, {'first': MAX_LIMIT + 1}).cost, 1 + MAX_LIMIT + MAX_LIMIT)
+
+    def test_costs_connections_without_page_size_at_the_max_limit(self):
+        self.assertEqual(cost_of(CONNECTION).cost, 1 + MAX_LIMIT + MAX_LIMIT)
+        self.assertEqual(cost_of('{ allProjectsConnection(last: 2) { edges { node { id } } } }').cost, 1 + 2 + 2)
+
+    def test_applies_weights(self):
+        query_cost = cost_of('mutation { sendCeleryTask(taskType: "flink", config: "{}") { ok } }')
+
+        self.assertEqual(query_cost.cost, settings.GRAPHQL_COST['WEIGHTS']['Mutation.sendCeleryTask'])
+
+    def test_ignores_introspection(self):
+        self.assertEqual(cost_of('{ __schema { types { name fields { name } } } }').cost, 0)
+
+    def test_rejects_invalid_variables(self):
+        for variables in ({'first': 'abc'}, [1]):
+            with self.assertRaises(GraphQLError):
+                cost_of(CONNECTION, variables)
+
+    def test_skips_unknown_operations(self):
+        self.assertIsNone(cost_of('query a { allProjects { id } } query b { allProjects { id } }'))
+
+
+class CostAdmissionTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('cost')
+
+    def test_reports_the_cost(self):
+        content = self.execute(CONNECTION, {'first': 5}, user=self.user)
+
+        self.assertEqual(content['extensions']['cost']['requestedQueryCost'], 11)
+
+    def test_rejects_operations_over_the_maximum_cost(self):
+        with override_settings(GRAPHQL_COST=dict(settings.GRAPHQL_COST, MAX_COST=10)):
+            content = self.execute(CONNECTION, {'first': 5}, user=self.user, status=400)
+
+        self.assertEqual(content['errors'][0]['message'], 'Query cost 11 exceeds the maximum cost of 10.')
+        self.assertNotIn('data', content)
+
+    def test_rejects_operations_over_the_maximum_depth(self):
+        with override_settings(GRAPHQL_COST=dict(settings.GRAPHQL_COST, MAX_DEPTH=2)):
+            content = self.execute(CONNECTION, {'first': 5}, user=self.user, status=400)
+
+        self.assertEqual(content['errors'][0]['message'], 'Query depth 3 exceeds the maximum depth of 2.')
+
+    def test_rejects_invalid_variables_before_costing(self):
+        # used to fail with a 500 while the page size was read from the raw variables
+        content = self.execute(CONNECTION, {'first': 'abc'}, user=self.user, status=400)
+
+        self.assertEqual(len(content['errors']), 1)
+        self.assertNotIn('extensions', content)
+
+    def test_rejects_invalid_documents_before_costing(self):
+        content = self.execute('{ allProjectsConnection(first: "abc") { edges { node { id } } } }', user=self.user,
+                               status=400)
+
+        self.assertEqual(len(content['errors']), 1)
+        self.assertNotIn('extensions', content)
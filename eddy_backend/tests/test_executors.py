@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from django.test import TestCase, TransactionTestCase
+
+from eddy_backend.executors import RootFieldThreadPoolExecutor
+from pipelines.models import Pipeline
+from projects.models import Project
+from utils.exceptions import NotFoundException
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+def resolve_info(path, operation='query'):
+    return SimpleNamespace(path=path, operation=SimpleNamespace(operation=operation))
+
+
+def current_thread(root, info):
+    return threading.current_thread().name
+
+
+class RootFieldThreadPoolExecutorTest(TestCase):
+    def setUp(self):
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='test')
+        self.addCleanup(pool.shutdown)
+        self.executor = RootFieldThreadPoolExecutor(pool)
+
+    def test_resolves_root_query_fields_on_the_pool(self):
+        promise = self.executor.execute(current_thread, None, resolve_info(['field']))
+        self.executor.wait_until_finished()
+
+        self.assertTrue(promise.get().startswith('test'))
+
+    def test_resolves_nested_fields_and_mutations_on_the_calling_thread(self):
+        name = threading.current_thread().name
+
+        self.assertEqual(self.executor.execute(current_thread, None, resolve_info(['field', 'nested'])), name)
+        self.assertEqual(self.executor.execute(current_thread, None, resolve_info(['field'], 'mutation')), name)
+
+    def test_rejects_the_fields_whose_resolver_raised(self):
+        def fail(root, info):
+            raise NotFoundException()
+
+        promise = self.executor.execute(fail, None, resolve_info(['field']))
+        self.executor.wait_until_finished()
+
+        with self.assertRaises(NotFoundException):
+            promise.get()
+
+
+# the root fields are resolved on connections of the pool threads, which only see committed rows
+@response_cache_enabled(False)
+class ParallelExecutionTest(GraphQLTestMixin, TransactionTestCase):
+    QUERY = '''
+    query($id: IntID!) {
+      allProjects { label }
+      allPipelines { label project { label } }
+      pipeline(id: $id) { label }
+      missing: pipeline(id: 0) { label }
+    }
+    '''
+
+    def setUp(self):
+        self.user = create_user('parallel')
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.pipeline = Pipeline.objects.create(user=self.user, project=project, label='pipeline', config={})
+
+    def test_returns_the_result_of_the_serial_executor(self):
+        serial = self.execute(self.QUERY, {'id': self.pipeline.pk}, user=self.user)
+        parallel = self.execute(self.QUERY, {'id': self.pipeline.pk}, user=self.user,
+                                HTTP_X_GRAPHQL_EXECUTOR='parallel')
+
+        self.assertEqual(parallel['data'], serial['data'])
+        self.assertEqual(parallel['data']['allPipelines'], [{'label': 'pipeline', 'project': {'label': 'project'}}])
+        self.assertEqual([error['path'] for error in parallel['errors']], [['missing']])
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from promise import Promise
+
+from eddy_backend.views import count_queries
+from pipelines.models import Pipeline
+from projects.models import Project
+from utils.loaders import ModelLoader
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+class ModelLoaderTest(TestCase):
+    def setUp(self):
+        self.user = create_user('loader')
+        self.projects = [Project.objects.create(user=self.user, workspace=self.user.workspace, label=str(i))
+                         for i in range(3)]
+
+    def test_batches_keys_into_one_query(self):
+        loader = ModelLoader(Project)
+        keys = [project.pk for project in self.projects] + [0]
+
+        with count_queries() as queries:
+            # loads are dispatched together once the promise callback requesting them returns, as in resolvers
+            projects = Promise.resolve(None).then(lambda _: Promise.all([loader.load(key) for key in keys])).get()
+
+        self.assertEqual(queries.count, 1)
+        self.assertEqual(projects, self.projects + [None])
+
+    def test_loads_by_field(self):
+        loader = ModelLoader(Project, 'label')
+
+        self.assertEqual(loader.load('1').get(), self.projects[1])
+
+
+@response_cache_enabled(False)
+class LoadRelatedTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('related')
+
+    def create_pipeline(self, label):
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label=label)
+        return Pipeline.objects.create(user=self.user, project=project, label=label, config={})
+
+    def test_relations_of_sibling_fields_share_a_query(self):
+        pipelines = [self.create_pipeline(str(i)) for i in range(3)]
+        query = '{ %s }' % ' '.join('p%d: pipeline(id: %d) { project { label } user { username } }' % (i, pipeline.pk)
+                                    for i, pipeline in enumerate(pipelines))
+        # authenticates the user, which is cached afterwards
+        self.execute(query, user=self.user)
+
+        with count_queries() as queries:
+            content = self.execute(query, user=self.user)
+
+        self.assertNotIn('errors', content)
+        self.assertEqual([content['data']['p%d' % i]['project']['label'] for i in range(3)], ['0', '1', '2'])
+        # a query per pipeline, the projects and users of all of them are loaded by one query each
+        self.assertEqual(queries.count, 3 + 2)
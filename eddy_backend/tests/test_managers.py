@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from eddy_backend.views import count_queries
+from projects.models import Project
+from utils.exceptions import ForbiddenException, NotFoundException
+from utils.testing import GraphQLTestMixin, create_user
+from workspaces.models import Workspace
+
+
+class OwnedQuerySetTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('owner')
+        self.other = create_user('other')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.other_project = Project.objects.create(user=self.other, workspace=self.other.workspace, label='other')
+
+    def test_fetches_owned_rows_in_one_query(self):
+        with count_queries() as queries:
+            project = Project.objects.get_owned(self.user, self.project.pk)
+
+        self.assertEqual(project, self.project)
+        self.assertEqual(queries.count, 1)
+
+    def test_lists_owned_rows(self):
+        self.assertEqual(list(Project.objects.owned_by(self.user)), [self.project])
+
+    def test_tells_rows_of_other_users_from_missing_rows(self):
+        with self.assertRaises(ForbiddenException):
+            Project.objects.get_owned(self.user, self.other_project.pk)
+
+        with self.assertRaises(NotFoundException):
+            Project.objects.get_owned(self.user, 0)
+
+    def test_owns_workspaces_through_their_user(self):
+        self.assertEqual(Workspace.objects.get_owned(self.user, self.user.workspace_id), self.user.workspace)
+        self.assertEqual(list(Workspace.objects.owned_by(self.user)), [self.user.workspace])
+
+        with self.assertRaises(ForbiddenException):
+            Workspace.objects.get_owned(self.user, self.other.workspace_id)
+
+    def test_refuses_rows_of_other_users(self):
+        content = self.execute('query($id: IntID!) { project(id: $id) { label } }', {'id': self.other_project.pk},
+                               user=self.user)
+
+        self.assertEqual(content['errors'][0]['message'], ForbiddenException().args[0])
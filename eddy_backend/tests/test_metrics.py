@@ -0,0 +1,72 @@
+import socket
+from unittest import mock
+from urllib.request import urlopen
+
+from django.test import Client, TestCase
+from prometheus_client import REGISTRY
+
+from eddy_backend.metrics import observe_kafka_connect, operation_label, start_metrics_server
+from utils.testing import http_response
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+def sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class OperationLabelTest(TestCase):
+    def test_bounds_the_operation_names(self):
+        self.assertEqual(operation_label(None), 'anonymous')
+        self.assertEqual(operation_label('projects'), 'projects')
+        self.assertEqual(operation_label('not a name'), 'other')
+        self.assertEqual(operation_label('a' * 65), 'other')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class MetricsServerTest(TestCase):
+    def test_exports_the_metrics_of_management_commands(self):
+        port = free_port()
+        observe_kafka_connect('PUT', lambda: http_response(201))
+
+        start_metrics_server(port)
+
+        with urlopen('http://127.0.0.1:%d/metrics' % port) as response:
+            content = response.read().decode()
+        self.assertIn('kafka_connect_request_duration_seconds_count{method="PUT",status="201"}', content)
+
+    def test_keeps_running_without_the_port(self):
+        with mock.patch('eddy_backend.metrics.start_http_server', side_effect=OSError('in use')):
+            start_metrics_server(free_port())
+
+
+@response_cache_enabled(False)
+class MetricsTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('metrics')
+
+    def test_observes_operations(self):
+        labels = {'operation_name': 'projects', 'operation_type': 'query'}
+        operations = sample('graphql_operation_duration_seconds_count', labels)
+        resolvers = sample('graphql_resolver_duration_seconds_count', {'field': 'Query.allProjects'})
+        requests = sample('graphql_request_db_queries_count')
+
+        self.execute('query projects { allProjects { id } }', user=self.user)
+
+        self.assertEqual(sample('graphql_operation_duration_seconds_count', labels), operations + 1)
+        self.assertEqual(sample('graphql_resolver_duration_seconds_count', {'field': 'Query.allProjects'}),
+                         resolvers + 1)
+        self.assertEqual(sample('graphql_request_db_queries_count'), requests + 1)
+
+    def test_exposes_the_metrics(self):
+        self.execute('query projects { allProjects { id } }', user=self.user)
+
+        response = Client().get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'graphql_operation_duration_seconds_count{operation_name="projects"', response.content)
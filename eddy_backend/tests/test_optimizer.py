@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+
+from eddy_backend.views import count_queries
+from pipelines.models import Block, BlockType, Pipeline
+from projects.models import Project
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+@response_cache_enabled(False)
+class OptimizerTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('optimizer')
+        self.block_type = BlockType.objects.create(label='type', config={})
+        # authenticates the user, which is cached afterwards
+        self.execute('{ allProjects { id } }', user=self.user)
+
+    def create_pipeline(self, blocks):
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        pipeline = Pipeline.objects.create(user=self.user, project=project, label='pipeline', config={})
+        for i in range(blocks):
+            Block.objects.create(user=self.user, pipeline=pipeline, block_type=self.block_type, label=str(i),
+                                 config={})
+        return pipeline
+
+    def count_queries(self, query):
+        with count_queries() as queries:
+            content = self.execute(query, user=self.user)
+        self.assertNotIn('errors', content)
+        return queries.count
+
+    def test_joins_selected_foreign_keys(self):
+        self.create_pipeline(blocks=1)
+        query = '{ allBlocks { label pipeline { label project { label } } blockType { label } } }'
+        self.assertEqual(self.count_queries(query), 1)
+
+        self.create_pipeline(blocks=3)
+        self.assertEqual(self.count_queries(query), 1)
+
+    def test_prefetches_selected_reverse_relations(self):
+        self.create_pipeline(blocks=2)
+        query = '{ allPipelines { label blocks { label } } }'
+        self.assertEqual(self.count_queries(query), 2)
+
+        self.create_pipeline(blocks=3)
+        self.assertEqual(self.count_queries(query), 2)
+
+    def test_defers_unselected_columns(self):
+        self.create_pipeline(blocks=1)
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            content = self.execute('{ allBlocks { label } }', user=self.user)
+
+        self.assertEqual(content['data'], {'allBlocks': [{'label': '0'}]})
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn('config', statements[0])
+
+        with connection.execute_wrapper(record):
+            content = self.execute('{ allBlocks { config } }', user=self.user)
+
+        self.assertEqual(content['data'], {'allBlocks': [{'config': '{}'}]})
+        self.assertIn('config', statements[1])
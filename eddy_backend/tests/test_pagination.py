@@ -0,0 +1,131 @@
+from django.test import TestCase
+
+from eddy_backend.views import count_queries
+from pipelines.models import Pipeline
+from projects.models import Project
+from utils.exceptions import BadRequestException
+from utils.pagination import cursor_to_id, id_to_cursor
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+PAGE = '''
+query($first: Int, $after: String, $last: Int, $before: String) {
+  allPipelinesConnection(first: $first, after: $after, last: $last, before: $before) {
+    totalCount
+    edges { cursor node { label } }
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+  }
+}
+'''
+
+NESTED = '''
+{
+  allProjectsConnection(first: 10) {
+    edges {
+      node {
+        label
+        pipelinesConnection(first: 2) {
+          totalCount
+          edges { node { label } }
+          pageInfo { hasNextPage }
+        }
+      }
+    }
+  }
+}
+'''
+
+
+class CursorTest(TestCase):
+    def test_round_trip(self):
+        self.assertEqual(cursor_to_id(id_to_cursor(42)), 42)
+
+    def test_rejects_invalid_cursors(self):
+        for cursor in ('', 'not base64', id_to_cursor('abc'), 'YXJyYXljb25uZWN0aW9uOjE='):
+            with self.assertRaises(BadRequestException):
+                cursor_to_id(cursor)
+
+
+@response_cache_enabled(False)
+class KeysetConnectionTest(GraphQLTestMixin, TestCase):
+    def setUp(self):
+        self.user = create_user('pagination')
+
+    def create_project(self, label, pipelines):
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label=label)
+        for i in range(pipelines):
+            Pipeline.objects.create(user=self.user, project=project, label=label + str(i), config={})
+        return project
+
+    def page(self, **variables):
+        content = self.execute(PAGE, variables, user=self.user)
+        self.assertNotIn('errors', content)
+        return content['data']['allPipelinesConnection']
+
+    def labels(self, page):
+        return [edge['node']['label'] for edge in page['edges']]
+
+    def test_pages_forward(self):
+        self.create_project('p', pipelines=5)
+
+        page = self.page(first=2)
+        self.assertEqual(self.labels(page), ['p0', 'p1'])
+        self.assertEqual(page['totalCount'], 5)
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+        page = self.page(first=2, after=page['pageInfo']['endCursor'])
+        self.assertEqual(self.labels(page), ['p2', 'p3'])
+
+        page = self.page(first=2, after=page['pageInfo']['endCursor'])
+        self.assertEqual(self.labels(page), ['p4'])
+        self.assertFalse(page['pageInfo']['hasNextPage'])
+
+    def test_pages_backward(self):
+        self.create_project('p', pipelines=5)
+
+        page = self.page(last=2)
+        self.assertEqual(self.labels(page), ['p3', 'p4'])
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+        page = self.page(last=2, before=page['pageInfo']['startCursor'])
+        self.assertEqual(self.labels(page), ['p1', 'p2'])
+
+    def test_only_lists_owned_rows(self):
+        self.create_project('p', pipelines=1)
+        other = create_user('other')
+        project = Project.objects.create(user=other, workspace=other.workspace, label='other')
+        Pipeline.objects.create(user=other, project=project, label='other', config={})
+
+        self.assertEqual(self.labels(self.page(first=10)), ['p0'])
+
+    def test_rejects_negative_page_sizes(self):
+        content = self.execute(PAGE, {'first': -1}, user=self.user)
+
+        self.assertEqual(content['errors'][0]['message'], BadRequestException().args[0])
+
+    def test_pages_nested_connections_per_parent(self):
+        for label, pipelines in (('a', 0), ('b', 1), ('c', 3)):
+            self.create_project(label, pipelines)
+
+        content = self.execute(NESTED, user=self.user)
+
+        self.assertNotIn('errors', content)
+        connections = [edge['node']['pipelinesConnection'] for edge in content['data']['allProjectsConnection']['edges']]
+        self.assertEqual([self.labels(connection) for connection in connections], [[], ['b0'], ['c0', 'c1']])
+        self.assertEqual([connection['totalCount'] for connection in connections], [0, 1, 3])
+        self.assertEqual([connection['pageInfo']['hasNextPage'] for connection in connections], [False, False, True])
+
+    def test_loads_nested_connections_together(self):
+        self.create_project('a', pipelines=1)
+        self.execute(NESTED, user=self.user)
+
+        with count_queries() as queries:
+            self.execute(NESTED, user=self.user)
+        count = queries.count
+
+        for i in range(3):
+            self.create_project(str(i), pipelines=3)
+
+        with count_queries() as queries:
+            self.execute(NESTED, user=self.user)
+
+        self.assertEqual(queries.count, count)
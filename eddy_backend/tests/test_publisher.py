@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from eddy_backend.publisher import Publisher, Spool, SpoolFullError
+
+
+def message(task_id):
+    return {'name': 'app.task', 'args': [task_id], 'task_id': task_id, 'options': {}}
+
+
+class SpoolTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.spool = Spool(self.directory, max_size=2)
+
+    def replayed(self):
+        sent = []
+        self.spool.replay(lambda message: sent.append(message['task_id']))
+        return sent
+
+    def test_replays_the_tasks_in_order(self):
+        for task_id in ('b', 'a'):
+            self.spool.put(message(task_id))
+
+        self.assertEqual(self.replayed(), ['b', 'a'])
+        self.assertTrue(self.spool.is_empty())
+
+    def test_limits_its_size_unless_forced(self):
+        self.spool.put(message('a'))
+        self.spool.put(message('b'))
+
+        with self.assertRaises(SpoolFullError):
+            self.spool.put(message('c'))
+        self.spool.put(message('c'), force=True)
+
+        self.assertEqual(len(self.spool.names()), 3)
+
+    def test_keeps_the_tasks_from_the_first_failure(self):
+        for task_id in ('a', 'b'):
+            self.spool.put(message(task_id))
+        send = mock.Mock(side_effect=[None, ConnectionError()])
+
+        with self.assertRaises(ConnectionError):
+            self.spool.replay(send)
+
+        self.assertEqual(self.replayed(), ['b'])
+
+    def test_reclaims_the_tasks_of_exited_processes(self):
+        for task_id in ('a', 'b', 'c'):
+            self.spool.put(message(task_id), force=True)
+        for name, pid in zip(self.spool.names(), (1, 2, os.getpid())):
+            os.rename(os.path.join(self.directory, name), os.path.join(self.directory, name + '.' + str(pid)))
+
+        with mock.patch('eddy_backend.publisher.is_running', side_effect=lambda pid: pid == 2):
+            self.spool.reclaim()
+
+        # the task claimed by the running process is left to it
+        self.assertEqual(self.replayed(), ['a', 'c'])
+
+
+class PublisherTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.spool = Spool(directory, max_size=1)
+        self.publisher = Publisher(app=None, queue_size=1, spool=self.spool, retry_interval=5)
+        # the background thread is not started, the tests flush the queued tasks themselves
+        self.publisher.pid = os.getpid()
+
+        patcher = mock.patch.object(self.publisher, 'send')
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def spooled(self):
+        sent = []
+        self.spool.replay(lambda message: sent.append(message['task_id']))
+        return sent
+
+    def test_returns_before_the_task_is_sent(self):
+        task_id = self.publisher.publish('app.task', ('config',), priority=0)
+
+        self.send.assert_not_called()
+        self.assertEqual(self.publisher.queue.get_nowait(),
+                         {'name': 'app.task', 'args': ['config'], 'task_id': task_id, 'options': {'priority': 0}})
+
+    def test_spools_the_tasks_while_the_broker_is_down(self):
+        self.send.side_effect = ConnectionError()
+        self.publisher.flush(message('a'))
+        self.send.side_effect = None
+
+        # later tasks wait for the spooled ones, past the size of the spool
+        self.publisher.flush(message('b'))
+
+        self.assertEqual(self.send.call_count, 1)
+        self.assertEqual(self.spooled(), ['a', 'b'])
+
+    def test_spools_the_tasks_the_queue_has_no_room_for(self):
+        self.publisher.publish('app.task', (), task_id='a')
+        self.publisher.publish('app.task', (), task_id='b')
+
+        self.send.assert_not_called()
+        self.assertEqual(self.spooled(), ['b'])
+
+    def test_sends_the_tasks_the_spool_has_no_room_for(self):
+        self.spool.put(message('spooled'))
+
+        self.publisher.overflow(message('a'))
+
+        self.send.assert_called_once_with(message('a'))
+
+    def test_never_drops_the_tasks_of_requests(self):
+        self.spool.put(message('spooled'))
+        self.send.side_effect = ConnectionError()
+
+        self.publisher.overflow(message('a'))
+
+        self.assertEqual(self.spooled(), ['spooled', 'a'])
+
+    def test_spills_the_queued_tasks_at_exit(self):
+        self.publisher.publish('app.task', (), task_id='a')
+
+        self.publisher.spill()
+
+        self.assertEqual(self.spooled(), ['a'])
+
+    def test_never_drops_the_queued_tasks_at_exit(self):
+        self.spool.put(message('spooled'))
+        self.publisher.publish('app.task', (), task_id='a')
+
+        self.publisher.spill()
+
+        self.assertEqual(self.spooled(), ['spooled', 'a'])
@@ -0,0 +1,63 @@
+from django.test import TestCase, override_settings
+
+from eddy_backend.tracing import Trace, tracing
+from pipelines.models import Pipeline
+from projects.models import Project
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+class TraceTest(TestCase):
+    def test_records_statements_while_bound(self):
+        trace = Trace('operation')
+
+        with tracing(trace):
+            list(Project.objects.all())
+            list(Project.objects.all())
+        list(Project.objects.all())
+
+        extension = trace.as_extension()
+        self.assertEqual(extension['sql']['count'], 2)
+        self.assertEqual(list(extension['sql']['duplicates'].values()), [2])
+
+    def test_orders_resolvers_by_their_total_duration(self):
+        trace = Trace()
+        trace.add_resolver('Query.fast', 0.001)
+        trace.add_resolver('Query.slow', 0.002)
+        trace.add_resolver('Query.slow', 0.003)
+
+        resolvers = trace.as_extension()['resolvers']
+        self.assertEqual([(resolver['field'], resolver['count'], resolver['max']) for resolver in resolvers],
+                         [('Query.slow', 2, 3.0), ('Query.fast', 1, 1.0)])
+
+
+@response_cache_enabled(False)
+class TracingExtensionTest(GraphQLTestMixin, TestCase):
+    QUERY = '{ allPipelines { label project { label } } }'
+
+    def setUp(self):
+        self.admin = create_user('admin', is_superuser=True)
+        project = Project.objects.create(user=self.admin, workspace=self.admin.workspace, label='project')
+        Pipeline.objects.create(user=self.admin, project=project, label='pipeline', config={})
+
+    def test_traces_operations_of_superusers(self):
+        content = self.execute(self.QUERY, user=self.admin, HTTP_X_GRAPHQL_TRACE='1')
+
+        tracing = content['extensions']['tracing']
+        self.assertEqual(tracing['sql']['count'], len(tracing['sql']['statements']))
+        self.assertEqual(tracing['sql']['statements'][-1]['path'], 'allPipelines')
+        self.assertIn('Query.allPipelines', [resolver['field'] for resolver in tracing['resolvers']])
+
+    def test_only_traces_on_request(self):
+        content = self.execute(self.QUERY, user=self.admin)
+
+        self.assertNotIn('tracing', content['extensions'])
+
+    def test_does_not_trace_operations_of_other_users(self):
+        user = create_user('user')
+
+        content = self.execute(self.QUERY, user=user, HTTP_X_GRAPHQL_TRACE='1')
+        self.assertNotIn('tracing', content['extensions'])
+
+        with override_settings(DEBUG=True):
+            content = self.execute(self.QUERY, user=user, HTTP_X_GRAPHQL_TRACE='1')
+        self.assertIn('tracing', content['extensions'])
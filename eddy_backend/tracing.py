@@ -0,0 +1,181 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import ExitStack
+from functools import partial
+
+import requests
+from django.db import connections
+from django.db.models import QuerySet
+from promise import Promise
+
+logger = logging.getLogger(__name__)
+
+local = threading.local()
+
+
+def current_trace():
+    return getattr(local, 'trace', None)
+
+
+def format_path(path):
+    return '.'.join(str(key) for key in path) if path else None
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+class Trace(object):
+    """
+    Records the SQL statements, resolvers and outbound HTTP calls of a single operation.
+
+    Statements and HTTP calls are attributed to the resolver path last entered on their thread. Batches of data
+    loaders are dispatched after the resolvers requesting them, their statements are attributed to a sibling.
+    """
+
+    def __init__(self, operation_name=None):
+        self.operation_name = operation_name
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.statements = []
+        self.resolvers = OrderedDict()
+        self.http = []
+
+    def add_statement(self, sql, duration, path):
+        with self.lock:
+            self.statements.append({'sql': sql, 'duration': milliseconds(duration), 'path': format_path(path)})
+
+    def add_resolver(self, field, duration):
+        with self.lock:
+            count, total, longest = self.resolvers.get(field, (0, 0.0, 0.0))
+            self.resolvers[field] = (count + 1, total + duration, max(longest, duration))
+
+    def add_http(self, method, url, status, duration, path):
+        with self.lock:
+            self.http.append({'method': method, 'url': url, 'status': status, 'duration': milliseconds(duration),
+                              'path': format_path(path)})
+
+    def as_extension(self):
+        counts = Counter(statement['sql'] for statement in self.statements)
+        resolvers = sorted(self.resolvers.items(), key=lambda item: item[1][1], reverse=True)
+
+        return {
+            'duration': milliseconds(time.perf_counter() - self.start),
+            'sql': {
+                'count': len(self.statements),
+                'duration': round(sum(statement['duration'] for statement in self.statements), 3),
+                # statements executed more than once usually point at an N+1 pattern
+                'duplicates': {sql: count for sql, count in counts.items() if count > 1},
+                'statements': self.statements,
+            },
+            'resolvers': [
+                {'field': field, 'count': count, 'duration': milliseconds(total), 'max': milliseconds(longest)}
+                for field, (count, total, longest) in resolvers
+            ],
+            'http': self.http,
+        }
+
+    def log(self, extension):
+        logger.info(json.dumps({
+            'operation': self.operation_name,
+            'duration': extension['duration'],
+            'sql_count': extension['sql']['count'],
+            'sql_duration': extension['sql']['duration'],
+            'sql_duplicates': sum(extension['sql']['duplicates'].values()),
+            'resolver_count': sum(resolver['count'] for resolver in extension['resolvers']),
+            'slowest_resolvers': extension['resolvers'][:5],
+            'http_count': len(extension['http']),
+            'http_duration': round(sum(call['duration'] for call in extension['http']), 3),
+        }))
+
+
+def record_statement(execute, sql, params, many, context):
+    trace = current_trace()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if trace is not None:
+            trace.add_statement(sql, time.perf_counter() - start, getattr(local, 'path', None))
+
+
+class tracing(object):
+    """
+    Binds a trace to the current thread, does nothing without a trace.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.stack = ExitStack()
+
+    def __enter__(self):
+        if self.trace is not None:
+            local.trace = self.trace
+            local.path = None
+            for connection in connections.all():
+                self.stack.enter_context(connection.execute_wrapper(record_statement))
+        return self.trace
+
+    def __exit__(self, *args):
+        if self.trace is not None:
+            self.stack.close()
+            local.trace = None
+            local.path = None
+
+
+def evaluate(value, path):
+    # querysets are evaluated right away instead of while completing their field, so their statements are
+    # attributed to the resolver returning them
+    if isinstance(value, QuerySet):
+        local.path = path
+        len(value)
+
+    return value
+
+
+class TracingMiddleware(object):
+    """
+    Records the wall time of every resolver, without the time spent waiting for the promises it returns.
+    """
+
+    def resolve(self, next, root, info, **kwargs):
+        trace = current_trace()
+        if trace is None:
+            return next(root, info, **kwargs)
+
+        local.path = info.path
+        start = time.perf_counter()
+        try:
+            result = next(root, info, **kwargs)
+
+            if Promise.is_thenable(result):
+                return Promise.resolve(result).then(partial(evaluate, path=info.path))
+
+            return evaluate(result, info.path)
+        finally:
+            trace.add_resolver(info.parent_type.name + '.' + info.field_name, time.perf_counter() - start)
+
+
+send = requests.Session.send
+
+
+def traced_send(session, request, **kwargs):
+    trace = current_trace()
+    if trace is None:
+        return send(session, request, **kwargs)
+
+    start = time.perf_counter()
+    status = None
+    try:
+        response = send(session, request, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        trace.add_http(request.method, request.url, status, time.perf_counter() - start, getattr(local, 'path', None))
+
+
+# every outbound call made with requests, like the kafka connect calls of the models, goes through Session.send
+requests.Session.send = traced_send
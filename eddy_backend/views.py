@@ -0,0 +1,318 @@
+import json
+import time
+from contextlib import ExitStack
+
+import six
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http.response import HttpResponseBadRequest
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import ensure_csrf_cookie
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.validation import validate
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from authentication.tokens import authenticate_request
+from eddy_backend.backend import backend, document_hash
+from eddy_backend.cache import collect_tags, get_operation_tags, response_cache, response_key
+from eddy_backend.cost import analyse_query_cost, check_query_cost, get_operation
+from eddy_backend.executors import get_parallel_executor
+from eddy_backend.metrics import get_registry, operation_duration, operation_label, request_db_queries
+from eddy_backend.tracing import Trace, TracingMiddleware, tracing
+from utils.loaders import clear_loaders
+
+
+def get_persisted_query_hash(request, data):
+    # automatic persisted queries send the sha256 of the query in the persistedQuery extension
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if not extensions:
+        return None
+
+    if isinstance(extensions, six.text_type):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest('Extensions are invalid JSON.'))
+
+    persisted_query = extensions.get('persistedQuery') if isinstance(extensions, dict) else None
+    if not isinstance(persisted_query, dict):
+        return None
+
+    return persisted_query.get('sha256Hash')
+
+
+class count_queries(object):
+    """
+    Counts the database queries executed by the current thread.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *args):
+        self.stack.close()
+
+
+def metrics(request):
+    registry = get_registry()
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+class GraphQLView(BaseGraphQLView):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('backend', backend)
+        super(GraphQLView, self).__init__(**kwargs)
+
+    def is_traced(self, request):
+        # traces expose the SQL of the request, they are only handed to superusers outside of debug
+        if not request.META.get('HTTP_X_GRAPHQL_TRACE'):
+            return False
+
+        return settings.DEBUG or request.user.is_superuser
+
+    def get_executor(self, request):
+        if request.META.get('HTTP_X_GRAPHQL_EXECUTOR') != 'parallel':
+            return self.executor
+
+        return get_parallel_executor()
+
+    @method_decorator(ensure_csrf_cookie)
+    def dispatch(self, request, *args, **kwargs):
+        queries = count_queries()
+        try:
+            with queries:
+                return self.dispatch_request(request, *args, **kwargs)
+        finally:
+            request_db_queries.observe(queries.count)
+
+    def dispatch_request(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ('get', 'post'):
+                raise HttpError(HttpResponseNotAllowed(['GET', 'POST'], 'GraphQL only supports GET and POST requests.'))
+
+            data = self.parse_body(request)
+
+            # authenticated once per request instead of by a middleware on every resolved field
+            request.authentication_error = authenticate_request(request)
+
+            if isinstance(data, list):
+                # a batch shares the request, so authentication and the request scoped loaders are shared as well
+                # every operation reports its own errors, one invalid operation does not fail the whole batch
+                responses = [self.get_batch_response_data(request, entry) for entry in data]
+                result = self.json_encode(request, responses)
+                return HttpResponse(status=200, content=result, content_type='application/json')
+
+            show_graphiql = self.graphiql and self.can_display_graphiql(request, data)
+
+            if show_graphiql:
+                return self.render_graphiql(request, graphiql_version=self.graphiql_version,
+                                            react_version=self.react_version)
+
+            result, status_code = self.get_response(request, data, show_graphiql)
+            return HttpResponse(status=status_code, content=result, content_type='application/json')
+
+        except HttpError as e:
+            response = e.response
+            response['Content-Type'] = 'application/json'
+            response.content = self.json_encode(request, {'errors': [self.format_error(e)]})
+            return response
+
+    def parse_body(self, request):
+        if self.get_content_type(request) != 'application/json':
+            return super(GraphQLView, self).parse_body(request)
+
+        try:
+            request_json = json.loads(request.body.decode('utf-8'))
+        except (TypeError, ValueError):
+            raise HttpError(HttpResponseBadRequest('POST body sent invalid JSON.'))
+
+        if isinstance(request_json, list):
+            if not request_json:
+                raise HttpError(HttpResponseBadRequest('Received an empty list in the batch request.'))
+            if len(request_json) > settings.GRAPHQL_MAX_BATCH_SIZE:
+                raise HttpError(HttpResponseBadRequest(
+                    'Batch requests can contain at most {} operations.'.format(settings.GRAPHQL_MAX_BATCH_SIZE)))
+            if not all(isinstance(entry, dict) for entry in request_json):
+                raise HttpError(HttpResponseBadRequest('The received data is not a valid JSON query.'))
+        elif not isinstance(request_json, dict):
+            raise HttpError(HttpResponseBadRequest('The received data is not a valid JSON query.'))
+
+        return request_json
+
+    def get_response(self, request, data, show_graphiql=False):
+        response, status_code = self.get_response_data(request, data, show_graphiql)
+
+        if response is None:
+            return None, status_code
+
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def get_response_data(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if not execution_result:
+            return None, 200
+
+        status_code = 200
+        response = {}
+
+        if execution_result.errors:
+            response['errors'] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.invalid:
+            status_code = 400
+        else:
+            response['data'] = execution_result.data
+
+        if execution_result.extensions:
+            response['extensions'] = execution_result.extensions
+
+        return response, status_code
+
+    def get_batch_response_data(self, request, data):
+        try:
+            return self.get_response_data(request, data)[0]
+        except HttpError as e:
+            # the operations before it already ran, their results are returned next to its error
+            return {'errors': [self.format_error(e)]}
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        query_hash = get_persisted_query_hash(request, data)
+
+        if query_hash is not None:
+            if query:
+                # the query is registered under its hash by the document cache when it is parsed
+                if document_hash(query) != query_hash:
+                    return ExecutionResult(errors=[GraphQLError('provided sha does not match query')], invalid=True)
+            else:
+                query = self.get_backend(request).get_document_string(query_hash)
+                if query is None:
+                    # the client retries with the full query string
+                    return ExecutionResult(errors=[GraphQLError('PersistedQueryNotFound')])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest('Must provide query string.'))
+
+        try:
+            backend = self.get_backend(request)
+            document = backend.document_from_string(self.schema, query)
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+        if request.method.lower() == 'get':
+            operation_type = document.get_operation_type(operation_name)
+            if operation_type and operation_type != 'query':
+                if show_graphiql:
+                    return None
+
+                raise HttpError(HttpResponseNotAllowed(
+                    ['POST'], 'Can only perform a {} operation from a POST request.'.format(operation_type)
+                ))
+
+        # invalid documents and variables are reported before the cost of the operation is estimated
+        validation_errors = getattr(document, 'validation_errors', None)
+        if validation_errors is None:
+            validation_errors = validate(self.schema, document.document_ast)
+        if validation_errors:
+            return ExecutionResult(errors=validation_errors, invalid=True)
+
+        # queries over the cost budget are rejected before any resolver runs
+        try:
+            query_cost = analyse_query_cost(self.schema, document.document_ast, operation_name, variables)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e], invalid=True)
+        extensions = dict()
+        if query_cost is not None:
+            extensions['cost'] = query_cost.as_extension()
+            error = check_query_cost(query_cost)
+            if error is not None:
+                return ExecutionResult(errors=[error], invalid=True, extensions=extensions)
+
+        if getattr(request, 'authentication_error', None) is not None:
+            return ExecutionResult(errors=[request.authentication_error], extensions=extensions)
+
+        trace = Trace(operation_name) if self.is_traced(request) else None
+        start = time.perf_counter()
+        with tracing(trace):
+            execution_result = self.execute_document(request, document, variables, operation_name, extensions, trace)
+        operation = get_operation(document.document_ast, operation_name)
+        operation_duration.labels(operation_label(operation.name.value if operation and operation.name else None),
+                                  operation.operation if operation else 'unknown').observe(time.perf_counter() - start)
+
+        if trace is not None:
+            extensions['tracing'] = trace.as_extension()
+            trace.log(extensions['tracing'])
+
+        execution_result.extensions.update(extensions)
+        return execution_result
+
+    def execute_document(self, request, document, variables, operation_name, extensions, trace=None):
+        # read queries of authenticated users are answered from the response cache when possible
+        cache_key = None
+        if settings.GRAPHQL_RESPONSE_CACHE['ENABLED'] and document.get_operation_type(operation_name) == 'query':
+            user = request.user if request.user.is_authenticated else None
+            operation = get_operation(document.document_ast, operation_name)
+            tags = None
+            if user is not None and operation is not None:
+                tags = get_operation_tags(self.schema, document.document_ast, operation, user.pk)
+
+            if tags is not None:
+                cache_key = response_key(user.pk, document_hash(document.document_string), operation_name, variables)
+                data = response_cache.get(cache_key)
+                if data is not None:
+                    extensions['responseCache'] = 'HIT'
+                    return ExecutionResult(data=data)
+
+                extensions['responseCache'] = 'MISS'
+                versions = response_cache.get_versions(tags)
+
+        try:
+            extra_options = {}
+            executor = self.get_executor(request)
+            if executor:
+                # executor is not a valid argument in all backends
+                extra_options['executor'] = executor
+
+            middleware = list(self.get_middleware(request) or [])
+            if trace is not None:
+                middleware.append(TracingMiddleware())
+
+            with collect_tags() as collected:
+                execution_result = document.execute(
+                    root=self.get_root_value(request),
+                    variables=variables,
+                    operation_name=operation_name,
+                    context=self.get_context(request),
+                    middleware=middleware,
+                    **extra_options
+                )
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+        if cache_key is not None and not execution_result.errors and not collected.untracked:
+            response_cache.set(cache_key, execution_result.data, tags | collected.tags, versions)
+
+        if document.get_operation_type(operation_name) == 'mutation':
+            # following operations of a batch must not see objects loaded before the mutation
+            clear_loaders(self.get_context(request))
+
+        return execution_result
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from eddy_backend.metrics import observe_kafka_connect
+
+HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised instead of calling a Kafka Connect cluster that failed repeatedly, handled like a connection error.
+    """
+
+
+class CircuitBreaker(object):
+    """
+    Opens after consecutive failures, then lets a single call through once the reset timeout has passed.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+
+            # half open, the calls after this one are refused until it succeeds
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class KafkaConnectClient(object):
+    """
+    Calls the REST API of a Kafka Connect cluster over a pooled session with keep-alive connections.
+    Requests answered with 409 while the cluster rebalances are retried with backoff.
+    """
+
+    def __init__(self, base_url):
+        config = settings.KAFKA_CONNECT
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (config['CONNECT_TIMEOUT'], config['READ_TIMEOUT'])
+        self.retries = config['RETRIES']
+        self.retry_delay = config['RETRY_DELAY']
+        self.breaker = CircuitBreaker(config['FAILURE_THRESHOLD'], config['RESET_TIMEOUT'])
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config['POOL_SIZE'])
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, payload=None):
+        if not self.breaker.allow():
+            raise CircuitOpenError('Kafka Connect at ' + self.base_url + ' is unavailable')
+
+        url = self.base_url + path
+        data = json.dumps(payload) if payload is not None else None
+        for attempt in range(self.retries + 1):
+            try:
+                response = observe_kafka_connect(method, self.session.request, method, url, data=data,
+                                                 timeout=self.timeout)
+            except requests.RequestException:
+                self.breaker.record_failure()
+                raise
+
+            if response.status_code == 409 and attempt < self.retries:
+                time.sleep(self.retry_delay * 2 ** attempt)
+                continue
+
+            break
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        return response
+
+    def get_connectors(self):
+        return self.request('GET', '/connectors/')
+
+    def get_expanded_connectors(self):
+        # the config and the status of every connector of the cluster in a single call
+        return self.request('GET', '/connectors?expand=status&expand=info')
+
+    def get_connector_statuses(self):
+        return self.request('GET', '/connectors?expand=status')
+
+    def put_connector_config(self, name, config):
+        # creates the connector or updates its config
+        return self.request('PUT', '/connectors/' + name + '/config', config)
+
+    def delete_connector(self, name):
+        return self.request('DELETE', '/connectors/' + name)
+
+
+clients = dict()
+clients_lock = threading.Lock()
+
+
+def get_client(base_url):
+    # one client per cluster, shared by the integrations pointing at it
+    with clients_lock:
+        client = clients.get(base_url)
+        if client is None:
+            client = clients[base_url] = KafkaConnectClient(base_url)
+        return client
+
+
+def integration_url(integration):
+    return 'http://' + integration.config['host'] + ':' + integration.config['port']
+
+
+def get_integration_client(integration):
+    return get_client(integration_url(integration))
+
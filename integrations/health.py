@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.utils import timezone
+
+from integrations.connect import get_client, integration_url
+
+HEALTHY = 'healthy'
+# kafka connect answered with an error
+UNHEALTHY = 'unhealthy'
+UNREACHABLE = 'unreachable'
+HEALTH_STATUSES = (
+    (HEALTHY, 'healthy'),
+    (UNHEALTHY, 'unhealthy'),
+    (UNREACHABLE, 'unreachable'),
+)
+
+HEALTH_FIELDS = ('health_status', 'health_latency', 'health_checked_at', 'last_seen_at')
+
+
+def is_probed(integration):
+    return integration.integration_type == 'debezium'
+
+
+def connect_address(integration_type, config):
+    return integration_type, config.get('host'), config.get('port')
+
+
+def check(base_url):
+    """
+    Returns the health status of a kafka connect cluster and the latency of its answer in milliseconds.
+    """
+    start = time.perf_counter()
+    try:
+        response = get_client(base_url).get_connectors()
+    except requests.RequestException:
+        return UNREACHABLE, None
+
+    latency = round((time.perf_counter() - start) * 1000, 3)
+    return (HEALTHY if response.status_code == 200 else UNHEALTHY), latency
+
+
+def apply(integration, status, latency, checked_at):
+    integration.health_status = status
+    integration.health_latency = latency
+    integration.health_checked_at = checked_at
+    if status == HEALTHY:
+        integration.last_seen_at = checked_at
+
+
+def probe(integration):
+    status, latency = check(integration_url(integration))
+    apply(integration, status, latency, timezone.now())
+
+
+def probe_all(integrations, max_workers):
+    """
+    Probes the clusters of the integrations concurrently, once per cluster however many integrations point at it.
+    Returns the integrations whose health was updated.
+    """
+    clusters = dict()
+    for integration in integrations:
+        if is_probed(integration):
+            clusters.setdefault(integration_url(integration), []).append(integration)
+
+    if not clusters:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(clusters))) as executor:
+        results = dict(zip(clusters, executor.map(check, clusters)))
+
+    checked_at = timezone.now()
+    probed = []
+    for base_url, (status, latency) in results.items():
+        for integration in clusters[base_url]:
+            apply(integration, status, latency, checked_at)
+            probed.append(integration)
+
+    return probed
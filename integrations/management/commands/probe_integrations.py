@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eddy_backend.cache import invalidate_instance
+from eddy_backend.metrics import start_metrics_server
+from integrations.health import HEALTH_FIELDS, probe_all
+from integrations.models import Integration
+
+
+class Command(BaseCommand):
+    help = 'Probes the Kafka Connect clusters of the integrations and stores their health'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='probes the integrations once and exits')
+
+    def handle(self, *args, **options):
+        config = settings.INTEGRATION_HEALTH
+        if not options['once']:
+            start_metrics_server(settings.METRICS_PORT)
+
+        while True:
+            start = time.monotonic()
+            probed = probe_all(Integration.objects.all(), config['MAX_WORKERS'])
+            for integration in probed:
+                # updated without saving, a save would check the cluster of the integration once more
+                Integration.objects.filter(pk=integration.pk).update(
+                    **{field: getattr(integration, field) for field in HEALTH_FIELDS})
+                invalidate_instance(Integration, integration)
+            self.stdout.write('Probed %d integrations' % len(probed))
+
+            if options['once']:
+                break
+
+            close_old_connections()
+            time.sleep(max(config['INTERVAL'] - (time.monotonic() - start), 0))
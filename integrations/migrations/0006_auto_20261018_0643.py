@@ -0,0 +1,33 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0005_auto_20191016_1732'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='integration',
+            name='health_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='integration',
+            name='health_latency',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='integration',
+            name='health_status',
+            field=models.CharField(blank=True, choices=[('healthy', 'healthy'), ('unhealthy', 'unhealthy'), ('unreachable', 'unreachable')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='integration',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,12 @@
-import requests
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django_mysql.models import JSONField
 
 from utils.exceptions import ConflictException
+from eddy_backend.cache import invalidate_on_change
+from integrations.health import HEALTH_STATUSES, HEALTHY, connect_address, is_probed, probe
+from utils.managers import OwnedQuerySet
 
 integration_types = ['debezium']
 
@@ -26,21 +28,35 @@ class Integration(models.Model):
     supports_data_connectors = models.BooleanField(default=False)
     config = JSONField(default=default)
 
+    # reported by the probe_integrations command, never fetched while serving a request
+    health_status = models.CharField(max_length=20, choices=HEALTH_STATUSES, null=True, blank=True)
+    # milliseconds kafka connect took to answer the last probe
+    health_latency = models.FloatField(null=True, blank=True)
+    health_checked_at = models.DateTimeField(null=True, blank=True)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
 
-@receiver(post_save, sender=Integration)
-def post_save_integration(signal, sender, instance: Integration, using, **kwargs):
+@receiver(pre_save, sender=Integration)
+def pre_save_integration(signal, sender, instance: Integration, using, **kwargs):
     integration = instance
-    if integration.integration_type == 'debezium':
-        headers = dict()
-        headers['Accept'] = 'application/json'
-        headers['Content-Type'] = 'application/json'
-        url = 'http://' + integration.config['host'] + ':' + integration.config['port'] + '/connectors/'
-        try:
-            response = requests.get(url, headers=headers)
-        except requests.exceptions.ConnectionError:
-            raise ConflictException()
-        if response.status_code != 200:
-            raise ConflictException()
+    if not is_probed(integration):
+        return
+
+    if integration.pk is not None:
+        previous = Integration.objects.filter(pk=integration.pk).values_list('integration_type', 'config').first()
+        if previous is not None and connect_address(*previous) == connect_address(integration.integration_type,
+                                                                                  integration.config):
+            # kafka connect is only checked when the integration points at another cluster
+            return
+
+    probe(integration)
+    if integration.health_status != HEALTHY:
+        raise ConflictException()
+
+
+invalidate_on_change(Integration)
@@ -4,7 +4,10 @@ from graphene_django import DjangoObjectType
 from authentication.models import User
 from authentication.schema import UserType
 from integrations.models import Integration
-from utils.exceptions import UnauthorizedException, ForbiddenException, NotFoundException
+from utils.exceptions import UnauthorizedException
+from utils.loaders import load_related
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField
 from utils.utils import IntID
 from workspaces.models import Workspace
 
@@ -18,6 +21,19 @@ class IntegrationType(DjangoObjectType):
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_workspace(cls, root, info, **kwargs):
+        return load_related(info, root, 'workspace')
+
+
+class IntegrationConnection(CountableConnection):
+    class Meta:
+        node = IntegrationType
+
 
 class IntegrationQuery(graphene.ObjectType):
     integration = graphene.Field(IntegrationType, id=IntID(required=True))
@@ -28,15 +44,8 @@ class IntegrationQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            integration = Integration.objects.get(pk=kwargs.get('id'))
-        except Integration.DoesNotExist:
-            # any user can only request integrations that exist
-            raise NotFoundException()
-
         # any user can only request integrations associated to itself
-        if integration.user != info.context.user:
-            raise ForbiddenException()
+        integration = Integration.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return integration
 
@@ -49,10 +58,21 @@ class IntegrationQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request integrations associated to itself
-        all_integrations = Integration.objects.filter(user=info.context.user)
+        all_integrations = optimize_queryset(Integration.objects.owned_by(info.context.user), info)
 
         return all_integrations
 
+    all_integrations_connection = KeysetConnectionField(IntegrationConnection)
+
+    @classmethod
+    def resolve_all_integrations_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request integrations associated to itself
+        return Integration.objects.owned_by(info.context.user)
+
 
 class CreateIntegration(graphene.Mutation):
     class Arguments:
@@ -74,14 +94,8 @@ class CreateIntegration(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            workspace = Workspace.objects.get(pk=kwargs.get('workspace_id'))
-        except Workspace.DoesNotExist:
-            # any user can only create a integration if it associates it to a workspace
-            raise NotFoundException()
-
-        if workspace.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a integration if it associates it to a workspace
+        workspace = Workspace.objects.get_owned(info.context.user, kwargs.get('workspace_id'))
 
         del create_kwargs['workspace_id']
         create_kwargs['workspace'] = workspace
@@ -112,15 +126,8 @@ class UpdateIntegration(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            integration = Integration.objects.get(pk=kwargs.get('id'))
-        except Integration.DoesNotExist:
-            # any user can only update integrations that exist
-            raise NotFoundException()
-
-        if integration.user != info.context.user:
-            # any user can only update integrations associated to itself
-            raise ForbiddenException()
+        # any user can only update integrations associated to itself
+        integration = Integration.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(integration, key, value)
@@ -142,15 +149,8 @@ class DeleteIntegration(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            integration = Integration.objects.get(pk=kwargs.get('id'))
-        except Integration.DoesNotExist:
-            # any user can only delete integrations that exist
-            raise NotFoundException()
-
-        if integration.user != info.context.user:
-            # any user can only delete integrations that are associated to itself
-            raise ForbiddenException()
+        # any user can only delete integrations that are associated to itself
+        integration = Integration.objects.get_owned(info.context.user, kwargs.get('id'))
 
         integration.delete()
 
@@ -0,0 +1,94 @@
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.test import TestCase
+
+from integrations.connect import CircuitBreaker, CircuitOpenError, KafkaConnectClient, get_client
+from utils.testing import KafkaConnectTestMixin, http_response
+
+
+class CircuitBreakerTest(TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+
+        self.assertFalse(breaker.allow())
+
+    def test_lets_a_single_call_through_after_the_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with mock.patch('time.monotonic', return_value=100):
+            breaker.record_failure()
+
+        with mock.patch('time.monotonic', return_value=131):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+
+            breaker.record_success()
+            self.assertTrue(breaker.allow())
+
+
+class KafkaConnectClientTest(KafkaConnectTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.connect = get_client('http://connect:8083/')
+        patcher = mock.patch('time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shares_a_client_per_cluster(self):
+        self.assertIs(get_client('http://connect:8083/'), self.connect)
+        self.assertIsNot(get_client('http://other:8083'), self.connect)
+
+    def test_sends_json_with_timeouts(self):
+        response = self.connect.put_connector_config('connector', {'tasks.max': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        self.kafka_connect.assert_called_once_with(
+            'PUT', 'http://connect:8083/connectors/connector/config', data='{"tasks.max": "1"}',
+            timeout=(settings.KAFKA_CONNECT['CONNECT_TIMEOUT'], settings.KAFKA_CONNECT['READ_TIMEOUT']))
+
+    def test_retries_while_the_cluster_rebalances(self):
+        self.answer_kafka_connect(http_response(409), http_response(409), http_response(201))
+
+        self.assertEqual(self.connect.delete_connector('connector').status_code, 201)
+        self.assertEqual([call[0][0] for call in self.sleep.call_args_list],
+                         [settings.KAFKA_CONNECT['RETRY_DELAY'], settings.KAFKA_CONNECT['RETRY_DELAY'] * 2])
+
+    def test_returns_the_conflict_after_the_last_retry(self):
+        request = self.answer_kafka_connect(http_response(409))
+
+        self.assertEqual(self.connect.delete_connector('connector').status_code, 409)
+        self.assertEqual(request.call_count, settings.KAFKA_CONNECT['RETRIES'] + 1)
+
+    def test_refuses_calls_while_the_circuit_is_open(self):
+        request = self.answer_kafka_connect(http_response(503))
+        for _ in range(settings.KAFKA_CONNECT['FAILURE_THRESHOLD']):
+            self.connect.get_connectors()
+
+        with self.assertRaises(CircuitOpenError):
+            self.connect.get_connectors()
+        self.assertEqual(request.call_count, settings.KAFKA_CONNECT['FAILURE_THRESHOLD'])
+
+    def test_counts_connection_errors_as_failures(self):
+        request = self.answer_kafka_connect(http_response(200))
+        request.side_effect = requests.ConnectionError()
+        for _ in range(settings.KAFKA_CONNECT['FAILURE_THRESHOLD']):
+            with self.assertRaises(requests.ConnectionError):
+                self.connect.get_connectors()
+
+        # handled like the connection errors by the callers
+        with self.assertRaises(requests.ConnectionError):
+            self.connect.get_connectors()
+        self.assertFalse(self.connect.breaker.allow())
+
+    def test_pools_connections_per_cluster(self):
+        client = KafkaConnectClient('http://connect:8083')
+        adapter = client.session.get_adapter('http://connect:8083/connectors')
+
+        self.assertEqual(adapter._pool_maxsize, settings.KAFKA_CONNECT['POOL_SIZE'])
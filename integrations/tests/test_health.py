@@ -0,0 +1,89 @@
+from io import StringIO
+
+import requests
+from django.core.management import call_command
+from django.test import TestCase
+
+from integrations.health import HEALTHY, UNHEALTHY, UNREACHABLE, check, probe_all
+from integrations.models import Integration
+from utils.exceptions import ConflictException
+from utils.testing import GraphQLTestMixin, KafkaConnectTestMixin, create_user, http_response, \
+    response_cache_enabled
+
+
+class CheckTest(KafkaConnectTestMixin, TestCase):
+    def test_reports_the_status_and_latency(self):
+        status, latency = check('http://connect:8083')
+        self.assertEqual(status, HEALTHY)
+        self.assertGreaterEqual(latency, 0)
+
+        self.answer_kafka_connect(http_response(500))
+        self.assertEqual(check('http://connect:8083')[0], UNHEALTHY)
+
+    def test_reports_unreachable_clusters(self):
+        for error in (requests.ConnectionError(), requests.Timeout()):
+            self.kafka_connect.side_effect = error
+
+            self.assertEqual(check('http://connect:8083'), (UNREACHABLE, None))
+
+
+class ProbeTest(KafkaConnectTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('health')
+
+    def test_probes_each_cluster_once(self):
+        integrations = [self.create_integration(self.user, label=str(i)) for i in range(3)]
+        integrations.append(self.create_integration(self.user, config={'host': 'other', 'port': '8083'}))
+        integrations.append(self.create_integration(self.user, integration_type='flink'))
+        self.kafka_connect.reset_mock()
+
+        probed = probe_all(integrations, max_workers=4)
+
+        self.assertEqual(len(probed), 4)
+        self.assertEqual(self.kafka_connect.call_count, 2)
+        self.assertTrue(all(integration.health_status == HEALTHY for integration in probed))
+
+    def test_rejects_integrations_of_unreachable_clusters(self):
+        self.kafka_connect.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(ConflictException):
+            self.create_integration(self.user)
+        self.assertFalse(Integration.objects.exists())
+
+    def test_checks_the_cluster_only_when_it_changed(self):
+        integration = self.create_integration(self.user)
+        self.kafka_connect.reset_mock()
+
+        integration.label = 'renamed'
+        integration.save()
+        self.kafka_connect.assert_not_called()
+
+        integration.config = {'host': 'other', 'port': '8083'}
+        integration.save()
+        self.kafka_connect.assert_called_once()
+
+    def test_command_stores_the_health(self):
+        integration = self.create_integration(self.user)
+        self.answer_kafka_connect(http_response(500))
+
+        call_command('probe_integrations', '--once', stdout=StringIO())
+
+        integration.refresh_from_db()
+        self.assertEqual(integration.health_status, UNHEALTHY)
+        self.assertIsNotNone(integration.health_checked_at)
+        # kept from the check of the cluster when the integration was created
+        self.assertIsNotNone(integration.last_seen_at)
+
+
+@response_cache_enabled(False)
+class IntegrationHealthQueryTest(KafkaConnectTestMixin, GraphQLTestMixin, TestCase):
+    def test_reads_the_stored_health(self):
+        user = create_user('health')
+        self.create_integration(user)
+        self.kafka_connect.reset_mock()
+
+        content = self.execute('{ allIntegrations { healthStatus healthLatency lastSeenAt } }', user=user)
+
+        self.assertEqual(content['data']['allIntegrations'][0]['healthStatus'], HEALTHY.upper())
+        self.kafka_connect.assert_not_called()
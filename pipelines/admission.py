@@ -0,0 +1,87 @@
+from celery import states
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from pipelines.models import Job, TokenBucket
+
+# held jobs are admitted by priority, then in the order they were submitted
+PRIORITY_ORDER = Case(When(priority=Job.HIGH, then=Value(0)), When(priority=Job.NORMAL, then=Value(1)),
+                      default=Value(2), output_field=IntegerField())
+
+
+def get_tokens(bucket, now):
+    config = settings.JOB_ADMISSION
+    elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+    return min(bucket.tokens + elapsed * config['RATE'], config['BURST'])
+
+
+def lock_bucket(workspace_id, queue):
+    """
+    Returns the token bucket of a workspace on a queue, locked until the end of the transaction.
+    """
+    # the bucket is created before it is locked, locking a missing row takes a gap lock on mysql and two concurrent
+    # first submissions inserting into the same gap deadlock
+    if not TokenBucket.objects.filter(workspace_id=workspace_id, queue=queue).exists():
+        try:
+            with transaction.atomic():
+                TokenBucket.objects.create(workspace_id=workspace_id, queue=queue,
+                                           tokens=settings.JOB_ADMISSION['BURST'], updated_at=timezone.now())
+        except IntegrityError:
+            # created by a concurrent submission
+            pass
+
+    return TokenBucket.objects.select_for_update().get(workspace_id=workspace_id, queue=queue)
+
+
+def take(bucket, count):
+    """
+    Takes up to count tokens from a locked bucket, returns how many were taken.
+    """
+    now = timezone.now()
+    tokens = get_tokens(bucket, now)
+    taken = min(int(tokens), count)
+    if taken:
+        bucket.tokens = tokens - taken
+        bucket.updated_at = now
+        bucket.save(update_fields=['tokens', 'updated_at'])
+    return taken
+
+
+def held_jobs(workspace_id, queue):
+    return Job.objects.filter(user__workspace=workspace_id, queue=queue, status=Job.QUEUED)
+
+
+def admit(job, bucket):
+    """
+    Decides whether a new job is published right away or held, the bucket of its workspace needs to be locked.
+    """
+    # a submission does not overtake the held jobs of its workspace, they are admitted by priority
+    if held_jobs(job.user.workspace_id, job.queue).exists() or not take(bucket, 1):
+        job.status = Job.QUEUED
+    return job.status != Job.QUEUED
+
+
+def admit_held():
+    """
+    Admits the held jobs the buckets of their workspaces have tokens for, returns the admitted jobs.
+    Every workspace drains its own bucket, a workspace with a backlog does not delay the jobs of the others.
+    """
+    admitted = []
+    groups = Job.objects.filter(status=Job.QUEUED).values_list('user__workspace', 'queue').distinct()
+    for workspace_id, queue in groups:
+        with transaction.atomic():
+            bucket = lock_bucket(workspace_id, queue)
+            available = int(get_tokens(bucket, timezone.now()))
+            if not available:
+                continue
+
+            jobs = list(held_jobs(workspace_id, queue).order_by(PRIORITY_ORDER, 'pk')[:available])
+            take(bucket, len(jobs))
+            for job in jobs:
+                job.status = states.PENDING
+                job.save(update_fields=['status'])
+            admitted += jobs
+
+    return admitted
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from pipelines.models import PipelineArtifact
+from projects.models import DataConnector, connector_name, get_debezium_integration
+
+# bump when the generated artifacts change, so artifacts compiled before are not reused
+VERSION = 1
+
+FLINK = 'flink'
+BEAM = 'beam'
+TARGETS = (FLINK, BEAM)
+
+# blocks are wired by the ids listed in the 'inputs' of their config, the 'kind' of the config of their block type is
+# source: reads the topic of a data connector, {'data_connector': id, 'table': 'database.table', 'schema': columns},
+#   the table is needed for debezium data connectors only
+# transform: a query over its inputs, the 'template' of its block type or the 'sql' of its config is formatted with
+#   the names of its inputs as {input} or {inputs[n]} and the 'params' of its config
+# sink: writes its single input to a topic of the project, {'inputs': [id], 'topic': name, 'schema': columns}
+# columns are listed as [{'name': 'id', 'type': 'BIGINT'}, ...]
+SOURCE = 'source'
+TRANSFORM = 'transform'
+SINK = 'sink'
+
+COLUMN_TYPE = re.compile(r'^[A-Za-z][A-Za-z0-9_ ]*(\([0-9, ]+\))?$')
+
+
+class CompileError(Exception):
+    """
+    Raised for pipelines whose blocks do not form a valid graph, the message names the offending block.
+    """
+
+
+def quote_name(name):
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def quote_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def block_name(block):
+    return 'block_' + str(block.pk)
+
+
+def bootstrap_servers():
+    return settings.KAFKA_HOST + ':' + settings.KAFKA_PORT
+
+
+def check_config(label, instance):
+    # configs are free form json, the compiler reads them as objects
+    if not isinstance(instance.config, dict):
+        raise CompileError('%s %s has a config which is not an object' % (label, instance.pk))
+
+
+def get_target(pipeline, target=None):
+    check_config('Pipeline', pipeline)
+    return target or pipeline.config.get('target') or FLINK
+
+
+def get_kind(block):
+    kind = block.block_type.config.get('kind')
+    if kind not in (SOURCE, TRANSFORM, SINK):
+        raise CompileError('Block %s has a block type of unknown kind %r' % (block.pk, kind))
+    return kind
+
+
+def get_schema(block):
+    columns = block.config.get('schema')
+    if not columns or not isinstance(columns, list):
+        raise CompileError('Block %s has no schema' % block.pk)
+
+    for column in columns:
+        if not isinstance(column, dict) or not column.get('name') or not COLUMN_TYPE.match(str(column.get('type', ''))):
+            raise CompileError('Block %s has an invalid column %r' % (block.pk, column))
+    return [{'name': str(column['name']), 'type': str(column['type'])} for column in columns]
+
+
+def load_inputs(pipeline):
+    """
+    Reads the blocks of a pipeline and the data connectors its sources read from.
+    """
+    check_config('Pipeline', pipeline)
+    blocks = list(pipeline.blocks.select_related('block_type').order_by('pk'))
+    for block in blocks:
+        check_config('Block', block)
+        check_config('Block type', block.block_type)
+
+    ids = {block.config.get('data_connector') for block in blocks if block.block_type.config.get('kind') == SOURCE}
+    # sources can only read from the data connectors of the owner of the pipeline
+    data_connectors = DataConnector.objects.filter(user=pipeline.user_id, pk__in=[pk for pk in ids if pk]) \
+        .select_related('data_connector_type__integration')
+    return blocks, {data_connector.pk: data_connector for data_connector in data_connectors}
+
+
+def hash_inputs(pipeline, target, blocks, data_connectors):
+    key = json.dumps({
+        'version': VERSION,
+        'target': target,
+        'kafka': bootstrap_servers(),
+        'pipeline': [pipeline.pk, pipeline.project_id, pipeline.config],
+        'blocks': [[block.pk, block.config, block.block_type.config] for block in blocks],
+        'data_connectors': [[data_connector.pk, data_connector.project_id, data_connector.data_connector_type.label,
+                             data_connector.data_connector_type.integration_id, data_connector.config]
+                            for _, data_connector in sorted(data_connectors.items())],
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def sort_blocks(blocks):
+    """
+    Orders the blocks so every block follows its inputs, returns them with their input blocks.
+    """
+    by_id = {block.pk: block for block in blocks}
+    inputs = dict()
+    for block in blocks:
+        ids = block.config.get('inputs', [])
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            raise CompileError('Block %s has inputs which are not a list of block ids' % block.pk)
+        unknown = [pk for pk in ids if pk not in by_id]
+        if unknown:
+            raise CompileError('Block %s reads from blocks %s outside of the pipeline' % (block.pk, unknown))
+        inputs[block.pk] = [by_id[pk] for pk in ids]
+
+    ordered = []
+    state = dict()
+
+    def visit(block):
+        if state.get(block.pk) == 'done':
+            return
+        if state.get(block.pk) == 'visiting':
+            raise CompileError('Block %s is part of a cycle' % block.pk)
+
+        state[block.pk] = 'visiting'
+        for input_block in inputs[block.pk]:
+            visit(input_block)
+        state[block.pk] = 'done'
+        ordered.append(block)
+
+    for block in blocks:
+        visit(block)
+
+    return ordered, inputs
+
+
+def source_topic(block, data_connectors):
+    data_connector = data_connectors.get(block.config.get('data_connector'))
+    if data_connector is None:
+        raise CompileError('Block %s reads from an unknown data connector' % block.pk)
+
+    if get_debezium_integration(data_connector.data_connector_type) is not None:
+        # debezium publishes a topic per table, named after the connector
+        if not block.config.get('table'):
+            raise CompileError('Block %s reads from a debezium data connector without a table' % block.pk)
+        return connector_name(data_connector) + '.' + block.config['table'], 'debezium-json'
+
+    if data_connector.data_connector_type.label == 'CSV' and isinstance(data_connector.config, dict) \
+            and data_connector.config.get('topic'):
+        return connector_name(data_connector) + '.' + data_connector.config['topic'], 'csv'
+
+    raise CompileError('Block %s reads from a data connector without a topic' % block.pk)
+
+
+def sink_topic(pipeline, block):
+    if not block.config.get('topic'):
+        raise CompileError('Block %s has no topic' % block.pk)
+    return str(pipeline.project_id) + '.' + str(pipeline.pk) + '.' + block.config['topic']
+
+
+def render_query(block, input_blocks):
+    template = block.block_type.config.get('template') or block.config.get('sql')
+    if not template or not isinstance(template, str):
+        raise CompileError('Block %s has no query' % block.pk)
+
+    params = block.config.get('params', {})
+    if not isinstance(params, dict):
+        raise CompileError('Block %s has params which are not an object' % block.pk)
+
+    names = [quote_name(block_name(input_block)) for input_block in input_blocks]
+    params = dict(params, input=names[0], inputs=names)
+    try:
+        return template.format(*names, **params)
+    except (KeyError, IndexError, ValueError) as e:
+        raise CompileError('Block %s has an invalid query: %s' % (block.pk, e))
+
+
+def build_graph(pipeline, blocks, data_connectors):
+    """
+    Validates the blocks and resolves their topics and queries, in an order where every block follows its inputs.
+    """
+    ordered, inputs = sort_blocks(blocks)
+
+    graph = {SOURCE: [], TRANSFORM: [], SINK: []}
+    for block in ordered:
+        kind = get_kind(block)
+        input_blocks = inputs[block.pk]
+        node = {'name': block_name(block)}
+
+        if kind == SOURCE:
+            if input_blocks:
+                raise CompileError('Block %s is a source but reads from other blocks' % block.pk)
+            node['topic'], node['format'] = source_topic(block, data_connectors)
+            node['schema'] = get_schema(block)
+        elif kind == TRANSFORM:
+            if not input_blocks:
+                raise CompileError('Block %s is a transform without inputs' % block.pk)
+            node['inputs'] = [block_name(input_block) for input_block in input_blocks]
+            node['sql'] = render_query(block, input_blocks)
+        else:
+            if len(input_blocks) != 1:
+                raise CompileError('Block %s is a sink and needs exactly one input' % block.pk)
+            if get_kind(input_blocks[0]) == SINK:
+                raise CompileError('Block %s reads from a sink' % block.pk)
+            node['input'] = block_name(input_blocks[0])
+            node['topic'] = sink_topic(pipeline, block)
+            node['format'] = block.config.get('format', 'json')
+            node['schema'] = get_schema(block)
+
+        graph[kind].append(node)
+
+    if not graph[SOURCE] or not graph[SINK]:
+        raise CompileError('Pipeline %s needs at least one source and one sink' % pipeline.pk)
+
+    return graph
+
+
+def create_table(node, options):
+    columns = ',\n'.join('  %s %s' % (quote_name(column['name']), column['type']) for column in node['schema'])
+    options = dict({
+        'connector': 'kafka',
+        'topic': node['topic'],
+        'properties.bootstrap.servers': bootstrap_servers(),
+        'format': node['format'],
+    }, **options)
+    rendered = ',\n'.join('  %s = %s' % (quote_string(key), quote_string(value)) for key, value in options.items())
+    return 'CREATE TABLE %s (\n%s\n) WITH (\n%s\n);' % (quote_name(node['name']), columns, rendered)
+
+
+def compile_flink(pipeline, graph):
+    statements = ['-- pipeline %s' % pipeline.pk]
+    for node in graph[SOURCE]:
+        # consumers of a pipeline share their offsets, a redeployed pipeline continues where it stopped
+        statements.append(create_table(node, {
+            'properties.group.id': 'pipeline-' + str(pipeline.pk),
+            'scan.startup.mode': pipeline.config.get('startup_mode', 'earliest-offset'),
+        }))
+    for node in graph[TRANSFORM]:
+        statements.append('CREATE VIEW %s AS\n%s;' % (quote_name(node['name']), node['sql'].strip().rstrip(';')))
+    for node in graph[SINK]:
+        statements.append(create_table(node, {}))
+
+    inserts = ['INSERT INTO %s SELECT * FROM %s;' % (quote_name(node['name']), quote_name(node['input']))
+               for node in graph[SINK]]
+    if len(inserts) > 1:
+        # the sinks run in a single flink job
+        inserts = ['EXECUTE STATEMENT SET\nBEGIN\n' + '\n'.join(inserts) + '\nEND;']
+
+    return '\n\n'.join(statements + inserts) + '\n'
+
+
+def compile_beam(pipeline, graph):
+    spec = {
+        'pipeline': pipeline.pk,
+        'bootstrap_servers': bootstrap_servers(),
+        'consumer_group': 'pipeline-' + str(pipeline.pk),
+        'sources': graph[SOURCE],
+        # in an order where every transform follows its inputs
+        'transforms': graph[TRANSFORM],
+        'sinks': graph[SINK],
+    }
+    return json.dumps(spec, indent=2, sort_keys=True)
+
+
+COMPILERS = {
+    FLINK: compile_flink,
+    BEAM: compile_beam,
+}
+
+
+def compile_pipeline(pipeline, target, save=True):
+    """
+    Returns the artifact of a pipeline for a target and whether it was compiled.
+    A pipeline whose blocks, block types and data connectors did not change reuses its last artifact, other
+    artifacts replace it when saved, unsaved ones are only returned.
+    """
+    if target not in COMPILERS:
+        raise CompileError('Pipelines can not be compiled for %r' % target)
+
+    blocks, data_connectors = load_inputs(pipeline)
+    input_hash = hash_inputs(pipeline, target, blocks, data_connectors)
+
+    artifact = PipelineArtifact.objects.filter(pipeline=pipeline, target=target).first()
+    if artifact is not None and artifact.input_hash == input_hash:
+        return artifact, False
+
+    text = COMPILERS[target](pipeline, build_graph(pipeline, blocks, data_connectors))
+    if not save:
+        return PipelineArtifact(pipeline=pipeline, target=target, input_hash=input_hash, artifact=text), True
+
+    if artifact is None:
+        try:
+            with transaction.atomic():
+                artifact = PipelineArtifact.objects.create(pipeline=pipeline, target=target, input_hash=input_hash,
+                                                           artifact=text)
+            return artifact, True
+        except IntegrityError:
+            # compiled by a concurrent request
+            artifact = PipelineArtifact.objects.get(pipeline=pipeline, target=target)
+
+    artifact.input_hash = input_hash
+    artifact.artifact = text
+    artifact.save()
+    return artifact, True
+
+
+def get_job_config(artifact):
+    # the config of the task submitting the artifact to the flink or beam workers
+    if artifact.target == FLINK:
+        return {'pipeline': artifact.pipeline_id, 'sql': artifact.artifact}
+    return json.loads(artifact.artifact)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from celery import states
+from celery.backends.base import BaseKeyValueStoreBackend
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+import eddy_backend.celery
+from eddy_backend.publisher import publish
+from pipelines import admission
+from pipelines.models import Job
+
+logger = logging.getLogger(__name__)
+
+# task types of the SendCeleryTask mutation
+TASKS = {
+    'flink': 'app.submit_flink_sql',
+    'beam': 'app.submit_beam_sql',
+    'beam-python': 'app.submit_beam_python',
+}
+
+# celery events reporting the state of a task
+EVENT_STATES = {
+    'task-received': states.RECEIVED,
+    'task-started': states.STARTED,
+    'task-succeeded': states.SUCCESS,
+    'task-failed': states.FAILURE,
+    'task-retried': states.RETRY,
+    'task-revoked': states.REVOKED,
+}
+
+
+def get_queue(name):
+    app = eddy_backend.celery.app
+    route = app.conf.task_routes.get(name)
+    return route['queue'] if route else app.conf.task_default_queue
+
+
+def get_queues():
+    return sorted({get_queue(name) for name in TASKS.values()})
+
+
+def send(job):
+    # returns once the task is queued, it is published in the background
+    publish(job.task_name, (json.dumps(job.config),), task_id=job.task_id,
+            priority=settings.JOB_PRIORITIES[job.priority])
+
+
+def hash_submission(task_type, config, pipeline):
+    # the keys of the config are sorted, configs differing in their order only are the same submission
+    key = json.dumps([task_type, config, pipeline.pk if pipeline else None], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def find_duplicate(job):
+    """
+    Returns the unfinished or recently succeeded job of the same submission, failed jobs can be submitted again.
+    """
+    now = timezone.now()
+    since = now - timedelta(seconds=settings.JOB_DEDUPLICATION_WINDOW)
+    # the task of a job unfinished for that long was lost, or its result expired before the monitor read it
+    in_flight_since = now - timedelta(seconds=settings.JOB_IN_FLIGHT_TIMEOUT)
+    # held jobs wait for the bucket of their workspace, they are published eventually however old they are
+    unfinished = Q(status=Job.QUEUED) | Q(created_at__gte=in_flight_since) | Q(started_at__gte=in_flight_since)
+    duplicates = Job.objects.filter(user=job.user, submission_hash=job.submission_hash) \
+        .filter(Q(unfinished, finished_at__isnull=True) | Q(status=states.SUCCESS, finished_at__gte=since))
+    return duplicates.order_by('-pk').first()
+
+
+def submit(user, pipeline, task_type, config, priority=Job.NORMAL):
+    """
+    Creates the job of a task, the task is published unless the workspace exceeds its rate on the queue.
+    Returns the job and whether it was created, an identical submission returns the existing job instead.
+    """
+    name = TASKS[task_type]
+    job = Job(user=user, pipeline=pipeline, task_id=str(uuid4()), task_name=name, queue=get_queue(name),
+              priority=priority, config=config, submission_hash=hash_submission(task_type, config, pipeline))
+    with transaction.atomic():
+        # the submissions of a workspace to a queue are serialized by its bucket, retries find the first job
+        bucket = admission.lock_bucket(user.workspace_id, job.queue)
+        duplicate = find_duplicate(job)
+        if duplicate is not None:
+            return duplicate, False
+
+        admitted = admission.admit(job, bucket)
+        job.save()
+
+    # published once committed, the events of the task find its job
+    if admitted:
+        send(job)
+
+    return job, True
+
+
+def admit_held():
+    """
+    Publishes the held jobs the buckets of their workspaces have tokens for, returns how many were published.
+    """
+    jobs = admission.admit_held()
+    for job in jobs:
+        send(job)
+    return len(jobs)
+
+
+def get_queue_depths(workspace):
+    """
+    Counts the unfinished jobs of a workspace on every queue, by held, waiting for a worker and running.
+    """
+    depths = {queue: {'queue': queue, 'queued': 0, 'pending': 0, 'running': 0} for queue in get_queues()}
+    counts = Job.objects.filter(user__workspace=workspace).exclude(status__in=states.READY_STATES) \
+        .values_list('queue', 'status').annotate(count=Count('id')).order_by()
+    for queue, status, count in counts:
+        depth = depths.setdefault(queue, {'queue': queue, 'queued': 0, 'pending': 0, 'running': 0})
+        if status == Job.QUEUED:
+            depth['queued'] += count
+        elif status == states.STARTED:
+            depth['running'] += count
+        else:
+            depth['pending'] += count
+    return list(depths.values())
+
+
+def update_job(job, state, result=None, error=None, timestamp=None):
+    """
+    Applies a state reported for the task of a job, returns whether the job changed.
+    """
+    if job.status in states.READY_STATES:
+        # late and repeated reports do not reopen finished jobs
+        return False
+
+    if state == states.RECEIVED and job.status == states.STARTED:
+        # events are not guaranteed to arrive in order
+        return False
+
+    if state == job.status and result is None and error is None:
+        return False
+
+    timestamp = timestamp or timezone.now()
+    job.status = state
+    if state == states.STARTED and job.started_at is None:
+        job.started_at = timestamp
+    if state in states.READY_STATES:
+        job.finished_at = timestamp
+    if result is not None:
+        job.result = result
+    if error is not None:
+        job.error = error
+
+    job.save()
+    return True
+
+
+def on_event(event):
+    state = EVENT_STATES.get(event.get('type'))
+    if state is None:
+        return
+
+    job = Job.objects.filter(task_id=event.get('uuid')).first()
+    if job is None:
+        # tasks not submitted as jobs, like the csv connector ones
+        return
+
+    error = None
+    if state == states.FAILURE:
+        error = event.get('traceback') or event.get('exception') or ''
+    elif state == states.RETRY:
+        error = event.get('exception') or ''
+
+    timestamp = datetime.fromtimestamp(event['timestamp'], tz=timezone.utc) if 'timestamp' in event else None
+    update_job(job, state, result=event.get('result'), error=error, timestamp=timestamp)
+
+
+def capture_events(reconnect_delay=5):
+    """
+    Applies the task events of the workers to their jobs, the workers need to send events (celery worker -E).
+    """
+    app = eddy_backend.celery.app
+    while True:
+        try:
+            with app.connection() as connection:
+                receiver = app.events.Receiver(connection, handlers={'*': on_event})
+                receiver.capture(limit=None, timeout=None, wakeup=True)
+        except Exception as e:
+            logger.warning('Capturing celery events failed: %s', e)
+            close_old_connections()
+            time.sleep(reconnect_delay)
+
+
+def sync_results(batch_size):
+    """
+    Reads the results of the unfinished jobs from the result backend, one round trip per batch of jobs.
+    Catches up on the events missed while no monitor was running. Returns how many jobs changed.
+    """
+    backend = eddy_backend.celery.app.backend
+    if not isinstance(backend, BaseKeyValueStoreBackend):
+        return 0
+
+    changed = 0
+    last_pk = 0
+    while True:
+        # held jobs were not published yet
+        jobs = list(Job.objects.exclude(status__in=states.READY_STATES | {Job.QUEUED}).filter(pk__gt=last_pk)
+                    .order_by('pk')[:batch_size])
+        if not jobs:
+            return changed
+        last_pk = jobs[-1].pk
+
+        keys = [backend.get_key_for_task(job.task_id) for job in jobs]
+        values = backend.mget(keys)
+        if hasattr(values, 'items'):
+            # the memcached clients return the found keys only, mapped to their values
+            values = [values.get(key) for key in keys]
+        for job, value in zip(jobs, values):
+            if value is None:
+                # tasks without result yet are pending in the result backend
+                continue
+
+            meta = backend.decode_result(value)
+            if meta['status'] == states.FAILURE:
+                changed += update_job(job, meta['status'], error=meta.get('traceback') or str(meta['result']))
+            elif meta['status'] == states.SUCCESS:
+                changed += update_job(job, meta['status'], result=json.dumps(meta['result'], default=str))
+            else:
+                changed += update_job(job, meta['status'])
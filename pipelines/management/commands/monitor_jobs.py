@@ -0,0 +1,43 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eddy_backend.metrics import start_metrics_server
+from pipelines.jobs import admit_held, capture_events, sync_results
+
+
+class Command(BaseCommand):
+    help = 'Admits the held jobs and reports the status of the submitted jobs from the celery events and the ' \
+           'result backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='admits the held jobs and reads the result backend once and exits')
+
+    def handle(self, *args, **options):
+        config = settings.JOB_MONITOR
+        if not options['once']:
+            start_metrics_server(settings.METRICS_PORT)
+            threading.Thread(target=capture_events, name='celery-events', daemon=True).start()
+
+        synced_at = None
+        while True:
+            admitted = admit_held()
+            if admitted:
+                self.stdout.write('%d jobs admitted' % admitted)
+
+            # the held jobs are admitted more often than the result backend is read
+            if synced_at is None or time.monotonic() - synced_at >= config['INTERVAL']:
+                changed = sync_results(config['BATCH_SIZE'])
+                synced_at = time.monotonic()
+                if changed:
+                    self.stdout.write('%d jobs changed' % changed)
+
+            if options['once']:
+                break
+
+            close_old_connections()
+            time.sleep(settings.JOB_ADMISSION['INTERVAL'])
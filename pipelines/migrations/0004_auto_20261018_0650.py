@@ -0,0 +1,53 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_mysql.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0001_initial'),
+        ('pipelines', '0003_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenBucket',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('queue', models.CharField(max_length=200)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='config',
+            field=django_mysql.models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.CharField(choices=[('low', 'Low'), ('normal', 'Normal'), ('high', 'High')], default='normal', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='status',
+            field=models.CharField(choices=[('FAILURE', 'FAILURE'), ('PENDING', 'PENDING'), ('QUEUED', 'QUEUED'), ('RECEIVED', 'RECEIVED'), ('RETRY', 'RETRY'), ('REVOKED', 'REVOKED'), ('STARTED', 'STARTED'), ('SUCCESS', 'SUCCESS')], default='PENDING', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'queue'], name='pipelines_j_status_3d73a0_idx'),
+        ),
+        migrations.AddField(
+            model_name='tokenbucket',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='token_buckets', to='workspaces.Workspace'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tokenbucket',
+            unique_together={('workspace', 'queue')},
+        ),
+    ]
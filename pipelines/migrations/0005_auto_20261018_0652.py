@@ -0,0 +1,22 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0004_auto_20261018_0650'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='submission_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['user', 'submission_hash'], name='pipelines_j_user_id_6e7add_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0005_auto_20261018_0652'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineArtifact',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('target', models.CharField(max_length=20)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('artifact', models.TextField()),
+                ('compiled_at', models.DateTimeField(auto_now=True)),
+                ('pipeline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='pipelines.Pipeline')),
+            ],
+            options={
+                'unique_together': {('pipeline', 'target')},
+            },
+        ),
+    ]
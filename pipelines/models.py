@@ -1,6 +1,10 @@
+from celery import states
 from django.db import models
 from django_mysql.models import JSONField
 
+from eddy_backend.cache import invalidate_on_change
+from utils.managers import OwnedQuerySet
+
 
 class Pipeline(models.Model):
     id = models.AutoField(primary_key=True)
@@ -9,6 +13,8 @@ class Pipeline(models.Model):
     label = models.CharField(max_length=200)
     config = JSONField()
 
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
@@ -21,6 +27,8 @@ class Block(models.Model):
     block_type = models.ForeignKey('pipelines.BlockType', related_name='blocks', on_delete=models.CASCADE)
     config = JSONField()
 
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
@@ -32,3 +40,79 @@ class BlockType(models.Model):
 
     def __str__(self):
         return self.label
+
+
+# a celery task submitted to the flink or beam workers, its status is reported by the monitor_jobs command
+class Job(models.Model):
+    # held back by the token bucket of its workspace, admitted by the monitor_jobs command
+    QUEUED = 'QUEUED'
+    STATUSES = [(state, state) for state in sorted(states.ALL_STATES | {QUEUED})]
+
+    LOW = 'low'
+    NORMAL = 'normal'
+    HIGH = 'high'
+    PRIORITIES = [(LOW, 'Low'), (NORMAL, 'Normal'), (HIGH, 'High')]
+
+    id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('authentication.User', related_name='jobs', on_delete=models.CASCADE)
+    pipeline = models.ForeignKey('pipelines.Pipeline', related_name='jobs', on_delete=models.SET_NULL, null=True,
+                                 blank=True)
+    task_id = models.CharField(max_length=36, unique=True)
+    task_name = models.CharField(max_length=200)
+    queue = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=STATUSES, default=states.PENDING)
+    priority = models.CharField(max_length=20, choices=PRIORITIES, default=NORMAL)
+    config = JSONField()
+    # identical submissions of a user are deduplicated by this hash
+    submission_hash = models.CharField(max_length=64, blank=True, default='')
+    result = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'queue']),
+            models.Index(fields=['user', 'submission_hash']),
+        ]
+
+    def __str__(self):
+        return self.task_name + ' ' + self.task_id
+
+
+# the last artifact compiled from a pipeline for a target, reused while the hash of the compiler inputs is unchanged
+class PipelineArtifact(models.Model):
+    id = models.AutoField(primary_key=True)
+    pipeline = models.ForeignKey('pipelines.Pipeline', related_name='artifacts', on_delete=models.CASCADE)
+    target = models.CharField(max_length=20)
+    input_hash = models.CharField(max_length=64)
+    # a flink sql script or a json beam job spec
+    artifact = models.TextField()
+    compiled_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('pipeline', 'target')
+
+    def __str__(self):
+        return str(self.pipeline_id) + ' ' + self.target
+
+
+# the admission rate left to a workspace on a queue, refilled continuously up to the burst size
+class TokenBucket(models.Model):
+    id = models.AutoField(primary_key=True)
+    workspace = models.ForeignKey('workspaces.Workspace', related_name='token_buckets', on_delete=models.CASCADE)
+    queue = models.CharField(max_length=200)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('workspace', 'queue')
+
+    def __str__(self):
+        return str(self.workspace_id) + ' ' + self.queue
+
+
+invalidate_on_change(Pipeline, Block, BlockType, Job, PipelineArtifact)
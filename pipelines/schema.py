@@ -1,15 +1,15 @@
-import json
-
 import graphene
 from graphene_django import DjangoObjectType
 
-import eddy_backend.celery
 from authentication.models import User
 from authentication.schema import UserType
-from pipelines import models
-from pipelines.models import Pipeline, Block
-from projects.models import Project
-from utils.exceptions import UnauthorizedException, NotFoundException, ForbiddenException
+from pipelines import compiler, jobs, models
+from pipelines.models import Pipeline, Block, Job, PipelineArtifact
+from projects.models import DataConnector, DataConnectorType, Project
+from utils.exceptions import UnauthorizedException, NotFoundException, ForbiddenException, BadRequestException
+from utils.loaders import load_related
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField, RelatedConnectionField
 from utils.utils import IntID
 
 
@@ -22,6 +22,22 @@ class PipelineType(DjangoObjectType):
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_project(cls, root, info, **kwargs):
+        return load_related(info, root, 'project')
+
+    blocks_connection = RelatedConnectionField(lambda: BlockConnection, 'blocks')
+    jobs_connection = RelatedConnectionField(lambda: JobConnection, 'jobs')
+
+
+class PipelineConnection(CountableConnection):
+    class Meta:
+        node = PipelineType
+
 
 class PipelineQuery(graphene.ObjectType):
     pipeline = graphene.Field(PipelineType, id=IntID(required=True))
@@ -32,15 +48,8 @@ class PipelineQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            pipeline = Pipeline.objects.get(pk=kwargs.get('id'))
-        except Pipeline.DoesNotExist:
-            # any user can only request pipelines that exist
-            raise NotFoundException()
-
         # any user can only request pipelines associated to itself
-        if pipeline.user != info.context.user:
-            raise ForbiddenException()
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return pipeline
 
@@ -53,10 +62,21 @@ class PipelineQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request pipelines associated to itself
-        all_pipelines = Pipeline.objects.filter(user=info.context.user)
+        all_pipelines = optimize_queryset(Pipeline.objects.owned_by(info.context.user), info)
 
         return all_pipelines
 
+    all_pipelines_connection = KeysetConnectionField(PipelineConnection)
+
+    @classmethod
+    def resolve_all_pipelines_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request pipelines associated to itself
+        return Pipeline.objects.owned_by(info.context.user)
+
 
 class CreatePipeline(graphene.Mutation):
     class Arguments:
@@ -75,14 +95,8 @@ class CreatePipeline(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('project_id'))
-        except Project.DoesNotExist:
-            # any user can only create a pipeline if it associates it to a project
-            raise NotFoundException()
-
-        if project.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a pipeline if it associates it to a project
+        project = Project.objects.get_owned(info.context.user, kwargs.get('project_id'))
 
         del create_kwargs['project_id']
         create_kwargs['project'] = project
@@ -113,11 +127,8 @@ class UpdatePipeline(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            pipeline = Pipeline.objects.get(pk=kwargs.get('id'))
-        except Pipeline.DoesNotExist:
-            # any user can only update pipelines that exist
-            raise NotFoundException()
+        # any user can only update pipelines associated to itself
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(pipeline, key, value)
@@ -139,15 +150,8 @@ class DeletePipeline(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            pipeline = Pipeline.objects.get(pk=kwargs.get('id'))
-        except Pipeline.DoesNotExist:
-            # any user can only update pipelines that exist
-            raise NotFoundException()
-
-        if pipeline.user != info.context.user:
-            # any user can only delete pipelines associated to itself
-            raise ForbiddenException()
+        # any user can only delete pipelines associated to itself
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('id'))
 
         pipeline.delete()
 
@@ -169,6 +173,23 @@ class BlockType(DjangoObjectType):
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_pipeline(cls, root, info, **kwargs):
+        return load_related(info, root, 'pipeline')
+
+    @classmethod
+    def resolve_block_type(cls, root, info, **kwargs):
+        return load_related(info, root, 'block_type')
+
+
+class BlockConnection(CountableConnection):
+    class Meta:
+        node = BlockType
+
 
 class BlockQuery(graphene.ObjectType):
     block = graphene.Field(BlockType, id=IntID(required=True))
@@ -179,15 +200,8 @@ class BlockQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            block = Block.objects.get(pk=kwargs.get('id'))
-        except Block.DoesNotExist:
-            # any user can only request blocks that exist
-            raise NotFoundException()
-
         # any user can only request blocks associated to itself
-        if block.user != info.context.user:
-            raise ForbiddenException()
+        block = Block.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return block
 
@@ -200,10 +214,21 @@ class BlockQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request blocks associated to itself
-        all_blocks = Block.objects.filter(user=info.context.user)
+        all_blocks = optimize_queryset(Block.objects.owned_by(info.context.user), info)
 
         return all_blocks
 
+    all_blocks_connection = KeysetConnectionField(BlockConnection)
+
+    @classmethod
+    def resolve_all_blocks_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request blocks associated to itself
+        return Block.objects.owned_by(info.context.user)
+
 
 class CreateBlock(graphene.Mutation):
     class Arguments:
@@ -224,14 +249,8 @@ class CreateBlock(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            pipeline = Pipeline.objects.get(pk=kwargs.get('pipeline_id'))
-        except Pipeline.DoesNotExist:
-            # any user can only create a block if it associates it to a pipeline
-            raise NotFoundException()
-
-        if pipeline.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a block if it associates it to a pipeline
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('pipeline_id'))
 
         del create_kwargs['pipeline_id']
         create_kwargs['pipeline'] = pipeline
@@ -271,15 +290,8 @@ class UpdateBlock(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            block = Block.objects.get(pk=kwargs.get('id'))
-        except Block.DoesNotExist:
-            # any user can only update blocks that exist
-            raise NotFoundException()
-
-        if block.user != info.context.user:
-            # any user can only update blocks associated to itself
-            raise ForbiddenException()
+        # any user can only update blocks associated to itself
+        block = Block.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(block, key, value)
@@ -301,15 +313,8 @@ class DeleteBlock(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            block = Block.objects.get(pk=kwargs.get('id'))
-        except Block.DoesNotExist:
-            # any user can only delete blocks that exist
-            raise NotFoundException()
-
-        if block.user != info.context.user:
-            # any user can only delete blocks associated to itself
-            raise ForbiddenException()
+        # any user can only delete blocks associated to itself
+        block = Block.objects.get_owned(info.context.user, kwargs.get('id'))
 
         block.delete()
 
@@ -331,6 +336,11 @@ class BlockTypeType(DjangoObjectType):
     id = IntID(required=True)
 
 
+class BlockTypeConnection(CountableConnection):
+    class Meta:
+        node = BlockTypeType
+
+
 class BlockTypeQuery(graphene.ObjectType):
     block_type = graphene.Field(BlockTypeType, id=IntID(required=True))
 
@@ -356,10 +366,20 @@ class BlockTypeQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        all_block_types = models.BlockType.objects.filter()
+        all_block_types = optimize_queryset(models.BlockType.objects.filter(), info)
 
         return all_block_types
 
+    all_block_types_connection = KeysetConnectionField(BlockTypeConnection)
+
+    @classmethod
+    def resolve_all_block_types_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        return models.BlockType.objects.filter()
+
 
 class CreateBlockType(graphene.Mutation):
     class Arguments:
@@ -457,30 +477,208 @@ class BlockTypeMutation(object):
     delete_block_type = DeleteBlockType.Field()
 
 
+# Job
+class JobType(DjangoObjectType):
+    class Meta:
+        model = Job
+        exclude = ('id', 'user')
+
+    id = IntID(required=True)
+    user = graphene.Field(UserType, required=True)
+
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_pipeline(cls, root, info, **kwargs):
+        return load_related(info, root, 'pipeline')
+
+
+# the unfinished jobs of a workspace on a queue
+class JobQueueType(graphene.ObjectType):
+    # counted from the jobs of the user, cached responses are invalidated by changes of its jobs
+    cache_models = (Job,)
+
+    queue = graphene.String(required=True)
+    # held back by the rate limit of the workspace
+    queued = graphene.Int(required=True)
+    # published, waiting for a worker
+    pending = graphene.Int(required=True)
+    running = graphene.Int(required=True)
+
+
+class JobConnection(CountableConnection):
+    class Meta:
+        node = JobType
+
+
+class JobQuery(graphene.ObjectType):
+    job = graphene.Field(JobType, id=IntID(required=True))
+
+    @classmethod
+    def resolve_job(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request jobs associated to itself
+        job = Job.objects.get_owned(info.context.user, kwargs.get('id'))
+
+        return job
+
+    # the statuses are read from the database, polling many jobs at once costs a single query
+    all_jobs = graphene.Field(graphene.List(JobType), ids=graphene.List(graphene.NonNull(IntID)),
+                              pipeline_id=IntID())
+
+    @classmethod
+    def resolve_all_jobs(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request jobs associated to itself
+        all_jobs = Job.objects.owned_by(info.context.user)
+        if kwargs.get('ids') is not None:
+            all_jobs = all_jobs.filter(pk__in=kwargs.get('ids'))
+        if kwargs.get('pipeline_id') is not None:
+            all_jobs = all_jobs.filter(pipeline_id=kwargs.get('pipeline_id'))
+
+        return optimize_queryset(all_jobs, info)
+
+    all_jobs_connection = KeysetConnectionField(JobConnection)
+
+    @classmethod
+    def resolve_all_jobs_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request jobs associated to itself
+        return Job.objects.owned_by(info.context.user)
+
+
 class SendCeleryTask(graphene.Mutation):
     class Arguments:
         task_type = graphene.String(required=True)
         config = graphene.JSONString(required=True)
+        pipeline_id = IntID()
+        priority = graphene.String()
 
     ok = graphene.Field(graphene.Boolean)
+    job = graphene.Field(JobType)
+    # false when an identical submission returned its job
+    created = graphene.Field(graphene.Boolean)
 
     @classmethod
     def mutate(cls, root, info, **kwargs):
-        if kwargs.get('task_type') == 'flink':
-            eddy_backend.celery.app.send_task('app.submit_flink_sql', (json.dumps(kwargs.get('config')),))
-        elif kwargs.get('task_type') == 'beam':
-            eddy_backend.celery.app.send_task('app.submit_beam_sql', (json.dumps(kwargs.get('config')),))
-        elif kwargs.get('task_type') == 'beam-python':
-            eddy_backend.celery.app.send_task('app.submit_beam_python', (json.dumps(kwargs.get('config')),))
-        else:
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        if kwargs.get('task_type') not in jobs.TASKS:
             raise NotFoundException()
 
-        return SendCeleryTask(ok=True)
+        priority = kwargs.get('priority') or Job.NORMAL
+        if priority not in dict(Job.PRIORITIES):
+            raise BadRequestException()
+
+        pipeline = None
+        if kwargs.get('pipeline_id') is not None:
+            # any user can only submit jobs of pipelines associated to itself
+            pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('pipeline_id'))
+
+        job, created = jobs.submit(info.context.user, pipeline, kwargs.get('task_type'), kwargs.get('config'),
+                                   priority)
+
+        return SendCeleryTask(ok=True, job=job, created=created)
 
 
 class SendCeleryTaskMutation(object):
     send_celery_task = SendCeleryTask.Field()
 
 
-query_list = [PipelineQuery, BlockQuery, BlockTypeQuery]
-mutation_list = [PipelineMutation, BlockMutation, BlockTypeMutation, SendCeleryTaskMutation]
+# PipelineArtifact
+class PipelineArtifactType(DjangoObjectType):
+    class Meta:
+        model = PipelineArtifact
+        exclude = ('id',)
+
+    id = IntID(required=True)
+
+    @classmethod
+    def resolve_pipeline(cls, root, info, **kwargs):
+        return load_related(info, root, 'pipeline')
+
+
+# the artifact of a pipeline as it would be deployed now
+class CompiledPipelineType(graphene.ObjectType):
+    # compiled from the blocks of the pipeline, cached responses are invalidated by changes of any of them
+    cache_models = (Pipeline, Block, models.BlockType, DataConnector, DataConnectorType, PipelineArtifact)
+
+    target = graphene.String(required=True)
+    input_hash = graphene.String(required=True)
+    artifact = graphene.String(required=True)
+    # false when the artifact of the last deployment was reused
+    compiled = graphene.Boolean(required=True)
+
+
+class CompilePipelineQuery(graphene.ObjectType):
+    compile_pipeline = graphene.Field(CompiledPipelineType, id=IntID(required=True), target=graphene.String())
+
+    @classmethod
+    def resolve_compile_pipeline(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only compile pipelines associated to itself
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('id'))
+
+        # queries never store artifacts, only deployments do
+        artifact, compiled = compiler.compile_pipeline(pipeline, compiler.get_target(pipeline, kwargs.get('target')),
+                                                       save=False)
+
+        return CompiledPipelineType(target=artifact.target, input_hash=artifact.input_hash,
+                                    artifact=artifact.artifact, compiled=compiled)
+
+
+class DeployPipeline(graphene.Mutation):
+    class Arguments:
+        id = IntID(required=True)
+        target = graphene.String()
+        priority = graphene.String()
+
+    ok = graphene.Field(graphene.Boolean)
+    artifact = graphene.Field(PipelineArtifactType)
+    job = graphene.Field(JobType)
+    # false when the job of an identical deployment was returned
+    created = graphene.Field(graphene.Boolean)
+
+    @classmethod
+    def mutate(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        priority = kwargs.get('priority') or Job.NORMAL
+        if priority not in dict(Job.PRIORITIES):
+            raise BadRequestException()
+
+        # any user can only deploy pipelines associated to itself
+        pipeline = Pipeline.objects.get_owned(info.context.user, kwargs.get('id'))
+
+        # unchanged pipelines are not compiled again
+        artifact, _ = compiler.compile_pipeline(pipeline, compiler.get_target(pipeline, kwargs.get('target')))
+        job, created = jobs.submit(info.context.user, pipeline, artifact.target, compiler.get_job_config(artifact),
+                                   priority)
+
+        return DeployPipeline(ok=True, artifact=artifact, job=job, created=created)
+
+
+class DeployPipelineMutation(object):
+    deploy_pipeline = DeployPipeline.Field()
+
+
+query_list = [PipelineQuery, BlockQuery, BlockTypeQuery, JobQuery, CompilePipelineQuery]
+mutation_list = [PipelineMutation, BlockMutation, BlockTypeMutation, SendCeleryTaskMutation, DeployPipelineMutation]
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from celery import states
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from pipelines import jobs
+from pipelines.admission import lock_bucket
+from pipelines.models import Job, TokenBucket
+from pipelines.tests.test_jobs import JobTestMixin
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+@override_settings(JOB_ADMISSION=dict(settings.JOB_ADMISSION, RATE=0.5, BURST=2))
+class AdmissionTest(JobTestMixin, TestCase):
+    def submit(self, n, user=None, priority=Job.NORMAL):
+        job, _ = jobs.submit(user or self.user, None, 'flink', {'n': n}, priority)
+        return job
+
+    def statuses(self):
+        return list(Job.objects.order_by('pk').values_list('status', flat=True))
+
+    def refill(self, seconds):
+        TokenBucket.objects.update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_holds_the_jobs_over_the_burst(self):
+        for n in range(3):
+            self.submit(n)
+
+        self.assertEqual(self.statuses(), [states.PENDING, states.PENDING, Job.QUEUED])
+        self.assertEqual(self.publish.call_count, 2)
+
+    def test_does_not_overtake_held_jobs(self):
+        for n in range(3):
+            self.submit(n)
+        self.refill(2)
+
+        self.submit(3)
+
+        self.assertEqual(self.statuses()[2:], [Job.QUEUED, Job.QUEUED])
+
+    def test_admits_held_jobs_by_priority_as_tokens_refill(self):
+        for n in range(2):
+            self.submit(n)
+        low, normal, high = [self.submit(n, priority=priority)
+                             for n, priority in ((2, Job.LOW), (3, Job.NORMAL), (4, Job.HIGH))]
+        self.publish.reset_mock()
+
+        self.assertEqual(jobs.admit_held(), 0)
+        self.refill(4)
+
+        self.assertEqual(jobs.admit_held(), 2)
+        self.assertEqual([call[1]['task_id'] for call in self.publish.call_args_list], [high.task_id, normal.task_id])
+        self.assertEqual(Job.objects.get(pk=low.pk).status, Job.QUEUED)
+
+    def test_workspaces_have_their_own_buckets(self):
+        other = create_user('other')
+        for n in range(3):
+            self.submit(n)
+
+        self.assertEqual(self.submit(0, user=other).status, states.PENDING)
+
+    def test_creates_a_bucket_once(self):
+        workspace_id = self.user.workspace_id
+
+        bucket = lock_bucket(workspace_id, 'celery')
+        self.assertEqual(bucket.tokens, 2)
+        bucket.tokens = 0
+        bucket.save()
+
+        self.assertEqual(lock_bucket(workspace_id, 'celery').tokens, 0)
+        self.assertEqual(TokenBucket.objects.count(), 1)
+
+
+@response_cache_enabled(False)
+@override_settings(JOB_ADMISSION=dict(settings.JOB_ADMISSION, RATE=0, BURST=1))
+class JobQueuesTest(JobTestMixin, GraphQLTestMixin, TestCase):
+    def test_counts_the_unfinished_jobs_per_queue(self):
+        for n in range(3):
+            jobs.submit(self.user, None, 'flink', {'n': n})
+        Job.objects.filter(status=states.PENDING).update(status=states.STARTED)
+        jobs.submit(self.user, None, 'beam', {})
+
+        content = self.execute('{ allWorkspaces { jobQueues { queue queued pending running } } }', user=self.user)
+
+        queues = {queue['queue']: queue for queue in content['data']['allWorkspaces'][0]['jobQueues']}
+        self.assertEqual(queues['beam'], {'queue': 'beam', 'queued': 0, 'pending': 1, 'running': 0})
+        self.assertEqual(queues[jobs.get_queue('app.submit_flink_sql')]['queued'], 2)
+        self.assertEqual(queues[jobs.get_queue('app.submit_flink_sql')]['running'], 1)
@@ -0,0 +1,158 @@
+import json
+
+from django.test import TestCase
+
+from pipelines.compiler import BEAM, FLINK, CompileError, compile_pipeline, get_target
+from pipelines.models import Block, BlockType, Job, PipelineArtifact
+from pipelines.tests.test_jobs import JobTestMixin
+from projects.models import DataConnector, DataConnectorType, Project
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+SCHEMA = [{'name': 'id', 'type': 'BIGINT'}, {'name': 'label', 'type': 'VARCHAR(200)'}]
+
+
+class CompilerTestMixin(JobTestMixin):
+    def setUp(self):
+        super().setUp()
+        data_connector_type = DataConnectorType.objects.create(label='CSV')
+        self.data_connector = DataConnector.objects.create(
+            user=self.user, project=self.pipeline.project, label='csv', data_connector_type=data_connector_type,
+            config={'url': 'http://csv', 'topic': 'rows'})
+
+        self.source = self.create_block('source', data_connector=self.data_connector.pk, schema=SCHEMA)
+        self.transform = self.create_block('transform', inputs=[self.source.pk], params={'min': 1},
+                                           sql='SELECT * FROM {input} WHERE id > {min}')
+        self.sink = self.create_block('sink', inputs=[self.transform.pk], topic='out', schema=SCHEMA)
+
+    def create_block(self, kind, **config):
+        block_type = BlockType.objects.create(label=kind, config={'kind': kind})
+        return Block.objects.create(user=self.user, pipeline=self.pipeline, label=kind, block_type=block_type,
+                                    config=config)
+
+    def update_config(self, instance, **config):
+        instance.config = dict(instance.config, **config)
+        instance.save()
+
+
+class CompilerTest(CompilerTestMixin, TestCase):
+    def assertCompileError(self, message):
+        with self.assertRaisesMessage(CompileError, message):
+            compile_pipeline(self.pipeline, FLINK)
+
+    def test_compiles_flink_sql(self):
+        artifact, compiled = compile_pipeline(self.pipeline, FLINK)
+
+        self.assertTrue(compiled)
+        source, transform, sink = ['block_%d' % block.pk for block in (self.source, self.transform, self.sink)]
+        self.assertIn("CREATE TABLE `%s` (\n  `id` BIGINT,\n  `label` VARCHAR(200)\n)" % source, artifact.artifact)
+        self.assertIn("'topic' = '%d.%d.rows'" % (self.pipeline.project_id, self.data_connector.pk),
+                      artifact.artifact)
+        self.assertIn("CREATE VIEW `%s` AS\nSELECT * FROM `%s` WHERE id > 1;" % (transform, source), artifact.artifact)
+        self.assertIn("'topic' = '%d.%d.out'" % (self.pipeline.project_id, self.pipeline.pk), artifact.artifact)
+        self.assertTrue(artifact.artifact.endswith('INSERT INTO `%s` SELECT * FROM `%s`;\n' % (sink, transform)))
+
+    def test_compiles_beam_job_specs(self):
+        spec = json.loads(compile_pipeline(self.pipeline, BEAM)[0].artifact)
+
+        self.assertEqual([source['format'] for source in spec['sources']], ['csv'])
+        self.assertEqual(spec['transforms'], [{'name': 'block_%d' % self.transform.pk,
+                                               'inputs': ['block_%d' % self.source.pk],
+                                               'sql': 'SELECT * FROM `block_%d` WHERE id > 1' % self.source.pk}])
+        self.assertEqual(spec['sinks'][0]['input'], 'block_%d' % self.transform.pk)
+
+    def test_targets_flink_unless_configured(self):
+        self.assertEqual(get_target(self.pipeline), FLINK)
+        self.update_config(self.pipeline, target=BEAM)
+        self.assertEqual(get_target(self.pipeline), BEAM)
+
+    def test_reuses_the_artifact_of_unchanged_pipelines(self):
+        artifact, _ = compile_pipeline(self.pipeline, FLINK)
+        self.assertEqual(compile_pipeline(self.pipeline, FLINK), (artifact, False))
+
+        self.update_config(self.transform, params={'min': 2})
+        recompiled, compiled = compile_pipeline(self.pipeline, FLINK)
+
+        self.assertTrue(compiled)
+        self.assertEqual(recompiled.pk, artifact.pk)
+        self.assertIn('WHERE id > 2', recompiled.artifact)
+
+    def test_only_stores_saved_artifacts(self):
+        compile_pipeline(self.pipeline, FLINK, save=False)
+
+        self.assertFalse(PipelineArtifact.objects.exists())
+
+    def test_rejects_cycles(self):
+        self.update_config(self.source, inputs=[self.sink.pk])
+
+        self.assertCompileError('is part of a cycle')
+
+    def test_rejects_inputs_outside_of_the_pipeline(self):
+        self.update_config(self.sink, inputs=[0])
+
+        self.assertCompileError('Block %d reads from blocks [0] outside of the pipeline' % self.sink.pk)
+
+    def test_rejects_data_connectors_of_other_users(self):
+        other = create_user('other')
+        project = Project.objects.create(user=other, workspace=other.workspace, label='other')
+        data_connector = DataConnector.objects.create(user=other, project=project, label='csv',
+                                                      data_connector_type=self.data_connector.data_connector_type,
+                                                      config={'url': 'http://csv', 'topic': 'rows'})
+        self.update_config(self.source, data_connector=data_connector.pk)
+
+        self.assertCompileError('Block %d reads from an unknown data connector' % self.source.pk)
+
+    def test_rejects_pipelines_without_sink(self):
+        self.sink.delete()
+
+        self.assertCompileError('Pipeline %d needs at least one source and one sink' % self.pipeline.pk)
+
+    def test_rejects_invalid_columns(self):
+        self.update_config(self.sink, schema=[{'name': 'id', 'type': 'BIGINT); DROP TABLE x; --'}])
+
+        self.assertCompileError('Block %d has an invalid column' % self.sink.pk)
+
+    def test_rejects_configs_which_are_not_objects(self):
+        Block.objects.filter(pk=self.transform.pk).update(config=[])
+
+        self.assertCompileError('Block %d has a config which is not an object' % self.transform.pk)
+
+    def test_rejects_unknown_targets(self):
+        with self.assertRaises(CompileError):
+            compile_pipeline(self.pipeline, 'spark')
+
+
+@response_cache_enabled(False)
+class CompilePipelineQueryTest(CompilerTestMixin, GraphQLTestMixin, TestCase):
+    COMPILE = 'query($id: IntID!) { compilePipeline(id: $id) { target artifact compiled } }'
+    DEPLOY = 'mutation($id: IntID!) { deployPipeline(id: $id) { created artifact { id } job { taskName } } }'
+
+    def test_compiling_stores_nothing(self):
+        content = self.execute(self.COMPILE, {'id': self.pipeline.pk}, user=self.user)
+
+        self.assertEqual(content['data']['compilePipeline']['target'], FLINK)
+        self.assertTrue(content['data']['compilePipeline']['compiled'])
+        self.assertFalse(PipelineArtifact.objects.exists())
+
+    def test_reports_compile_errors(self):
+        self.pipeline.config = []
+        self.pipeline.save()
+
+        content = self.execute(self.COMPILE, {'id': self.pipeline.pk}, user=self.user)
+
+        self.assertEqual(content['data']['compilePipeline'], None)
+        self.assertEqual(content['errors'][0]['message'],
+                         'Pipeline %d has a config which is not an object' % self.pipeline.pk)
+
+    def test_deploys_the_stored_artifact(self):
+        first = self.execute(self.DEPLOY, {'id': self.pipeline.pk}, user=self.user)['data']['deployPipeline']
+        second = self.execute(self.DEPLOY, {'id': self.pipeline.pk}, user=self.user)['data']['deployPipeline']
+
+        artifact = PipelineArtifact.objects.get()
+        self.assertEqual(first['artifact'], {'id': artifact.pk})
+        self.assertEqual(first['job'], {'taskName': 'app.submit_flink_sql'})
+        self.assertEqual((first['created'], second['created']), (True, False))
+        self.assertEqual(Job.objects.get().config, {'pipeline': self.pipeline.pk, 'sql': artifact.artifact})
+        self.publish.assert_called_once()
+
+        content = self.execute(self.COMPILE, {'id': self.pipeline.pk}, user=self.user)
+        self.assertFalse(content['data']['compilePipeline']['compiled'])
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from celery import states
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+from pipelines import jobs
+from pipelines.jobs import hash_submission
+from pipelines.models import Job
+from pipelines.tests.test_jobs import SEND, JobTestMixin
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+
+class HashSubmissionTest(JobTestMixin, TestCase):
+    def test_ignores_the_order_of_the_config(self):
+        self.assertEqual(hash_submission('flink', {'a': 1, 'b': {'c': 2, 'd': 3}}, None),
+                         hash_submission('flink', {'b': {'d': 3, 'c': 2}, 'a': 1}, None))
+
+    def test_distinguishes_task_types_and_pipelines(self):
+        hashes = {hash_submission('flink', {}, None), hash_submission('beam', {}, None),
+                  hash_submission('flink', {}, self.pipeline)}
+
+        self.assertEqual(len(hashes), 3)
+
+
+class DeduplicationTest(JobTestMixin, TestCase):
+    def submit(self, user=None, config=None):
+        return jobs.submit(user or self.user, self.pipeline, 'flink', config or {'sql': 'SELECT 1'})
+
+    def test_returns_the_unfinished_job_of_an_identical_submission(self):
+        job, created = self.submit()
+
+        self.assertEqual(self.submit(config={'sql': 'SELECT 1'}), (job, False))
+        self.assertTrue(created)
+        self.publish.assert_called_once()
+
+    def test_returns_recently_succeeded_jobs(self):
+        job, _ = self.submit()
+        Job.objects.update(status=states.SUCCESS, finished_at=timezone.now())
+
+        self.assertEqual(self.submit()[0], job)
+
+        Job.objects.update(finished_at=timezone.now() - timedelta(seconds=settings.JOB_DEDUPLICATION_WINDOW + 1))
+        self.assertTrue(self.submit()[1])
+
+    def test_submits_jobs_presumed_lost_again(self):
+        self.submit()
+        # the task never reported back
+        Job.objects.update(created_at=timezone.now() - timedelta(seconds=settings.JOB_IN_FLIGHT_TIMEOUT + 1))
+
+        _, created = self.submit()
+
+        self.assertTrue(created)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_returns_jobs_started_recently(self):
+        job, _ = self.submit()
+        Job.objects.update(status=states.STARTED, started_at=timezone.now(),
+                           created_at=timezone.now() - timedelta(seconds=settings.JOB_IN_FLIGHT_TIMEOUT + 1))
+
+        self.assertEqual(self.submit(), (job, False))
+
+    def test_returns_held_jobs_however_old(self):
+        job, _ = self.submit()
+        Job.objects.update(status=Job.QUEUED,
+                           created_at=timezone.now() - timedelta(seconds=settings.JOB_IN_FLIGHT_TIMEOUT + 1))
+
+        self.assertEqual(self.submit(), (job, False))
+
+    def test_submits_failed_jobs_again(self):
+        self.submit()
+        Job.objects.update(status=states.FAILURE, finished_at=timezone.now())
+
+        _, created = self.submit()
+
+        self.assertTrue(created)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_deduplicates_per_user(self):
+        self.submit()
+
+        self.assertTrue(self.submit(user=create_user('other'))[1])
+
+
+@response_cache_enabled(False)
+class SendCeleryTaskDeduplicationTest(JobTestMixin, GraphQLTestMixin, TestCase):
+    def test_reports_whether_the_job_was_created(self):
+        variables = {'taskType': 'flink', 'config': '{"sql": "SELECT 1"}'}
+
+        first = self.execute(SEND, variables, user=self.user)['data']['sendCeleryTask']
+        second = self.execute(SEND, variables, user=self.user)['data']['sendCeleryTask']
+
+        self.assertEqual((first['created'], second['created']), (True, False))
+        self.assertEqual(first['job'], second['job'])
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest import mock
+
+from celery import states
+from celery.backends.cache import CacheBackend
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+import eddy_backend.celery
+from pipelines.jobs import on_event, sync_results, update_job
+from pipelines.models import Job, Pipeline
+from projects.models import Project
+from utils.testing import GraphQLTestMixin, create_user, response_cache_enabled
+
+SEND = '''
+mutation($taskType: String!, $config: JSONString!, $pipelineId: IntID, $priority: String) {
+  sendCeleryTask(taskType: $taskType, config: $config, pipelineId: $pipelineId, priority: $priority) {
+    ok
+    created
+    job { id taskId taskName queue status priority pipeline { id } }
+  }
+}
+'''
+
+
+class JobTestMixin(object):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('jobs')
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.pipeline = Pipeline.objects.create(user=self.user, project=project, label='pipeline', config={})
+
+        patcher = mock.patch('pipelines.jobs.publish')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_job(self, **kwargs):
+        kwargs.setdefault('task_id', 'task-%d' % Job.objects.count())
+        return Job.objects.create(user=self.user, task_name='app.submit_flink_sql', queue='celery', config={},
+                                  **kwargs)
+
+
+@response_cache_enabled(False)
+class SendCeleryTaskTest(JobTestMixin, GraphQLTestMixin, TestCase):
+    def test_tracks_the_task_as_a_job(self):
+        content = self.execute(SEND, {'taskType': 'beam', 'config': '{"sql": "SELECT 1"}',
+                                      'pipelineId': self.pipeline.pk, 'priority': 'high'}, user=self.user)
+
+        job = content['data']['sendCeleryTask']['job']
+        self.assertEqual(content['data']['sendCeleryTask']['ok'], True)
+        self.assertEqual((job['taskName'], job['queue'], job['status'], job['priority'], job['pipeline']),
+                         ('app.submit_beam_sql', 'beam', states.PENDING, 'HIGH', {'id': self.pipeline.pk}))
+        self.publish.assert_called_once_with('app.submit_beam_sql', ('{"sql": "SELECT 1"}',), task_id=job['taskId'],
+                                             priority=settings.JOB_PRIORITIES['high'])
+
+    def test_rejects_unknown_tasks_and_priorities(self):
+        for variables in ({'taskType': 'spark', 'config': '{}'},
+                          {'taskType': 'flink', 'config': '{}', 'priority': 'urgent'}):
+            content = self.execute(SEND, variables, user=self.user)
+
+            self.assertEqual(content['data']['sendCeleryTask'], None)
+        self.publish.assert_not_called()
+        self.assertFalse(Job.objects.exists())
+
+    def test_reads_the_statuses_of_many_jobs_at_once(self):
+        jobs = [self.create_job(status=status) for status in (states.STARTED, states.SUCCESS)]
+        other = create_user('other')
+        Job.objects.create(user=other, task_id='other', task_name='app.submit_flink_sql', queue='celery', config={})
+
+        content = self.execute('query($ids: [IntID!]) { allJobs(ids: $ids) { status } }',
+                               {'ids': [job.pk for job in jobs] + [Job.objects.get(task_id='other').pk]},
+                               user=self.user)
+
+        self.assertEqual(content['data']['allJobs'], [{'status': states.STARTED}, {'status': states.SUCCESS}])
+
+
+class UpdateJobTest(JobTestMixin, TestCase):
+    def test_records_the_start_and_the_end(self):
+        job = self.create_job()
+        started_at = timezone.now() - timedelta(minutes=1)
+
+        self.assertTrue(update_job(job, states.STARTED, timestamp=started_at))
+        self.assertTrue(update_job(job, states.SUCCESS, result='42'))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.started_at), (states.SUCCESS, '42', started_at))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_ignores_late_reports(self):
+        job = self.create_job(status=states.STARTED)
+
+        self.assertFalse(update_job(job, states.RECEIVED))
+        self.assertFalse(update_job(job, states.STARTED))
+        update_job(job, states.FAILURE, error='failed')
+        self.assertFalse(update_job(job, states.SUCCESS))
+
+        self.assertEqual(Job.objects.get().status, states.FAILURE)
+
+    def test_applies_task_events(self):
+        job = self.create_job()
+
+        on_event({'type': 'task-failed', 'uuid': job.task_id, 'traceback': 'Traceback', 'timestamp': 0})
+        on_event({'type': 'task-started', 'uuid': 'unknown'})
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (states.FAILURE, 'Traceback'))
+        self.assertEqual(job.finished_at.timestamp(), 0)
+
+
+class SyncResultsTest(JobTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = CacheBackend(app=eddy_backend.celery.app, backend='memory')
+        patcher = mock.patch.object(eddy_backend.celery.app, 'backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_the_results_of_unfinished_jobs(self):
+        succeeded, failed, pending, held = [self.create_job() for _ in range(4)]
+        Job.objects.filter(pk=held.pk).update(status=Job.QUEUED)
+        self.backend.store_result(succeeded.task_id, {'rows': 1}, states.SUCCESS)
+        self.backend.store_result(failed.task_id, ValueError('invalid'), states.FAILURE, traceback='Traceback')
+        self.backend.store_result(held.task_id, None, states.SUCCESS)
+
+        self.assertEqual(sync_results(batch_size=2), 2)
+
+        self.assertEqual([(job.status, job.result, job.error) for job in Job.objects.order_by('pk')], [
+            (states.SUCCESS, '{"rows": 1}', ''),
+            (states.FAILURE, '', 'Traceback'),
+            (states.PENDING, '', ''),
+            (Job.QUEUED, '', ''),
+        ])
+        self.assertEqual(sync_results(batch_size=2), 0)
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eddy_backend.metrics import start_metrics_server
+from projects.outbox import dispatch
+
+
+class Command(BaseCommand):
+    help = 'Delivers the Kafka Connect requests recorded by data connector changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='delivers the due requests and exits')
+
+    def handle(self, *args, **options):
+        config = settings.KAFKA_CONNECT_OUTBOX
+        if not options['once']:
+            start_metrics_server(settings.METRICS_PORT)
+
+        while True:
+            count = dispatch(config['BATCH_SIZE'])
+            if count:
+                self.stdout.write('Attempted %d requests' % count)
+
+            if options['once']:
+                break
+
+            if count < config['BATCH_SIZE']:
+                # drops connections the database closed while idle
+                close_old_connections()
+                time.sleep(config['POLL_INTERVAL'])
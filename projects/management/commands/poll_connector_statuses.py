@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eddy_backend.metrics import start_metrics_server
+from projects.status import poll_all
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the Kafka Connect statuses of the data connectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='polls every cluster once and exits')
+
+    def handle(self, *args, **options):
+        config = settings.CONNECTOR_STATUS
+        if not options['once']:
+            start_metrics_server(settings.METRICS_PORT)
+
+        while True:
+            start = time.monotonic()
+            count = poll_all()
+            if count:
+                self.stdout.write('%d statuses changed' % count)
+
+            if options['once']:
+                break
+
+            close_old_connections()
+            time.sleep(max(config['INTERVAL'] - (time.monotonic() - start), 0))
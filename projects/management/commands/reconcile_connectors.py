@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eddy_backend.metrics import start_metrics_server
+from projects.reconcile import reconcile_all
+
+
+class Command(BaseCommand):
+    help = 'Creates, updates and deletes the Kafka Connect connectors drifting from the data connectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='reconciles every cluster once and exits')
+        parser.add_argument('--dry-run', action='store_true', help='only reports the calls it would issue')
+
+    def handle(self, *args, **options):
+        config = settings.KAFKA_CONNECT_RECONCILER
+        if not (options['once'] or options['dry_run']):
+            start_metrics_server(settings.METRICS_PORT)
+
+        while True:
+            start = time.monotonic()
+            for plan in reconcile_all(config['MAX_WORKERS'], dry_run=options['dry_run']):
+                self.stdout.write(str(plan))
+
+            if options['once'] or options['dry_run']:
+                break
+
+            close_old_connections()
+            time.sleep(max(config['INTERVAL'] - (time.monotonic() - start), 0))
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import django_mysql.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_auto_20191104_1335'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataconnector',
+            name='provisioning_status',
+            field=models.CharField(blank=True, choices=[('pending', 'pending'), ('provisioned', 'provisioned'), ('failed', 'failed')], max_length=20, null=True),
+        ),
+        migrations.CreateModel(
+            name='ConnectorRequest',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('connector', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('url', models.CharField(max_length=500)),
+                ('payload', django_mysql.models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('delivered', 'delivered'), ('failed', 'failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('data_connector', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='connector_requests', to='projects.DataConnector')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='connectorrequest',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='projects_co_status_279909_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='connectorrequest',
+            index=models.Index(fields=['connector', 'status'], name='projects_co_connect_a606f6_idx'),
+        ),
+    ]
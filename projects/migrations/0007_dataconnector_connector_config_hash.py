@@ -0,0 +1,18 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_auto_20261018_0641'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataconnector',
+            name='connector_config_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_mysql.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_dataconnector_connector_config_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConnectorStatus',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('state', models.CharField(max_length=20)),
+                ('worker_id', models.CharField(blank=True, default='', max_length=200)),
+                ('tasks', django_mysql.models.JSONField(default=list)),
+                ('tasks_running', models.PositiveIntegerField(default=0)),
+                ('tasks_failed', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('polled_at', models.DateTimeField()),
+                ('data_connector', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='connector_status', to='projects.DataConnector')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.20 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_connectorstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='connectorrequest',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,16 +1,17 @@
+import hashlib
 import json
-import logging
 
-import requests
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from django_mysql.models import JSONField
 
-import eddy_backend.celery
-
-logger = logging.getLogger(__name__)
+from eddy_backend.cache import invalidate_on_change
+from eddy_backend.publisher import publish
+from integrations.connect import integration_url
+from utils.managers import OwnedQuerySet
 
 
 class Project(models.Model):
@@ -19,6 +20,8 @@ class Project(models.Model):
     workspace = models.ForeignKey('workspaces.Workspace', related_name='projects', on_delete=models.CASCADE)
     label = models.CharField(max_length=200)
 
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
@@ -46,78 +49,116 @@ class DataConnector(models.Model):
                                             related_name='data_connectors')
     config = JSONField(default=default)
 
+    # state of the connector at kafka connect, null for data connectors not provisioned there
+    PROVISIONING_PENDING = 'pending'
+    PROVISIONED = 'provisioned'
+    PROVISIONING_FAILED = 'failed'
+    PROVISIONING_STATUSES = (
+        (PROVISIONING_PENDING, 'pending'),
+        (PROVISIONED, 'provisioned'),
+        (PROVISIONING_FAILED, 'failed'),
+    )
+    provisioning_status = models.CharField(max_length=20, choices=PROVISIONING_STATUSES, null=True, blank=True)
+    # hash of the connector config last sent to kafka connect
+    connector_config_hash = models.CharField(max_length=64, null=True, blank=True)
+
+    objects = OwnedQuerySet.as_manager()
+
     def __str__(self):
         return self.label
 
 
+def get_debezium_integration(data_connector_type):
+    integration = data_connector_type.integration
+    if integration is not None and integration.integration_type == 'debezium':
+        return integration
+
+    return None
+
+
+def connector_name(data_connector):
+    return str(data_connector.project_id) + '.' + str(data_connector.id)
+
+
+def connector_url(integration, path=''):
+    return integration_url(integration) + '/connectors/' + path
+
+
+def connector_config(data_connector):
+    unique_name = connector_name(data_connector)
+    unique_id = str(data_connector.id)
+
+    config_dict = dict()
+    if data_connector.config['type'] == 'mysql':
+        config_dict['connector.class'] = 'io.debezium.connector.mysql.MySqlConnector'
+        config_dict['tasks.max'] = '1'
+        config_dict['database.hostname'] = data_connector.config['host']
+        config_dict['database.port'] = data_connector.config['port']
+        config_dict['database.user'] = data_connector.config['user']
+        config_dict['database.password'] = data_connector.config['password']
+        config_dict['database.server.id'] = unique_id
+        config_dict['database.server.name'] = unique_name
+        config_dict['database.include.list'] = data_connector.config['databases']
+        config_dict['database.history.kafka.topic'] = 'schema-changes' + '.' + unique_name
+        config_dict['database.history.kafka.bootstrap.servers'] = settings.KAFKA_HOST + ':' + settings.KAFKA_PORT
+
+    return config_dict
+
+
+def hash_connector_config(integration, config):
+    # the cluster is part of the hash, moving a data connector to another cluster deploys it there
+    key = json.dumps([integration_url(integration), config], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+# kafka connect is not called while changing a data connector, the calls are recorded in the same transaction and
+# delivered by the dispatch_connector_requests command
 @receiver(post_save, sender=DataConnector)
 def post_save_data_connector(signal, sender, instance: DataConnector, using, **kwargs):
     data_connector = instance
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) <= {'provisioning_status'}:
+        # the dispatcher reporting the provisioning status
+        return
+
     data_connector_type = data_connector.data_connector_type
-    if hasattr(data_connector_type,
-               'integration') and data_connector_type.integration is not None and data_connector_type.integration.integration_type == 'debezium':
-        integration = data_connector.data_connector_type.integration
-
-        headers = dict()
-        headers['Accept'] = 'application/json'
-        headers['Content-Type'] = 'application/json'
-
-        unique_name = str(data_connector.project.id) + '.' + str(data_connector.id)
-        unique_id = str(data_connector.id)
-
-        connector_dict = dict()
-        connector_dict['name'] = unique_name
-
-        config_dict = dict()
-        if data_connector.config['type'] == 'mysql':
-            config_dict['connector.class'] = 'io.debezium.connector.mysql.MySqlConnector'
-            config_dict['tasks.max'] = '1'
-            config_dict['database.hostname'] = data_connector.config['host']
-            config_dict['database.port'] = data_connector.config['port']
-            config_dict['database.user'] = data_connector.config['user']
-            config_dict['database.password'] = data_connector.config['password']
-            config_dict['database.server.id'] = unique_id
-            config_dict['database.server.name'] = unique_name
-            config_dict['database.include.list'] = data_connector.config['databases']
-            config_dict['database.history.kafka.topic'] = 'schema-changes' + '.' + unique_name
-            config_dict['database.history.kafka.bootstrap.servers'] = settings.KAFKA_HOST + ':' + settings.KAFKA_PORT
-
-        connector_dict['config'] = config_dict
-
-        url = 'http://' + integration.config['host'] + ':' + integration.config['port'] \
-              + '/connectors/'
-
-        data = json.dumps(connector_dict)
-        logger.debug(data)
-
-        response = requests.post(url, headers=headers, data=data)
-        logger.debug(response)
-        logger.debug(response.content)
+    integration = get_debezium_integration(data_connector_type)
+    if integration is not None:
+        unique_name = connector_name(data_connector)
+        config = connector_config(data_connector)
+        config_hash = hash_connector_config(integration, config)
+
+        if config_hash == data_connector.connector_config_hash and \
+                data_connector.provisioning_status != DataConnector.PROVISIONING_FAILED:
+            # renames and saves without changes leave the connector alone, updating it rebalances the whole cluster
+            return
+
+        # creates the connector or updates its config, delivering it more than once is harmless
+        ConnectorRequest.objects.create(data_connector=data_connector, connector=unique_name, method='PUT',
+                                        url=connector_url(integration, unique_name + '/config'), payload=config)
+
+        data_connector.provisioning_status = DataConnector.PROVISIONING_PENDING
+        data_connector.connector_config_hash = config_hash
+        DataConnector.objects.filter(pk=data_connector.pk).update(
+            provisioning_status=DataConnector.PROVISIONING_PENDING, connector_config_hash=config_hash)
     elif data_connector_type.label == 'CSV':
-        unique_name = str(data_connector.project.id) + '.' + str(data_connector.id)
+        unique_name = connector_name(data_connector)
         url = data_connector.config['url']
         topic = data_connector.config['topic']
-        eddy_backend.celery.app.send_task('app.csv_to_kafka', (url, unique_name + '.' + topic))
+        # published once the data connector is committed, a rolled back change does not reach the csv connector
+        transaction.on_commit(lambda: publish('app.csv_to_kafka', (url, unique_name + '.' + topic)))
 
 
 @receiver(pre_delete, sender=DataConnector)
 def pre_delete_data_connector(signal, sender, instance: DataConnector, using, **kwargs):
     data_connector = instance
-    data_connector_type = data_connector.data_connector_type
-    if hasattr(data_connector_type,
-               'integration') and data_connector_type.integration is not None and data_connector_type.integration.integration_type == 'debezium':
-        integration = data_connector.data_connector_type.integration
+    integration = get_debezium_integration(data_connector.data_connector_type)
+    if integration is not None:
+        unique_name = connector_name(data_connector)
 
-        headers = dict()
-        headers['Accept'] = 'application/json'
-        headers['Content-Type'] = 'application/json'
-
-        unique_name = str(data_connector.project.id) + '.' + str(data_connector.id)
-
-        url = 'http://' + integration.config['host'] + ':' + integration.config['port'] + '/connectors/' + unique_name
-
-        response = requests.delete(url, headers=headers)
-        logger.debug(response)
+        # the request outlives the data connector, it does not reference it
+        ConnectorRequest.objects.create(connector=unique_name, method='DELETE',
+                                        url=connector_url(integration, unique_name), payload={})
 
 
 class DataConnectorType(models.Model):
@@ -129,3 +170,66 @@ class DataConnectorType(models.Model):
 
     def __str__(self):
         return self.label
+
+
+# state of a data connector at kafka connect, refreshed by the poll_connector_statuses command
+class ConnectorStatus(models.Model):
+    # connectors missing from their cluster, like connectors still to be provisioned
+    MISSING = 'MISSING'
+
+    id = models.AutoField(primary_key=True)
+    data_connector = models.OneToOneField('projects.DataConnector', models.CASCADE, related_name='connector_status')
+    # RUNNING, PAUSED, FAILED, UNASSIGNED as reported by kafka connect, or MISSING
+    state = models.CharField(max_length=20)
+    worker_id = models.CharField(max_length=200, blank=True, default='')
+    # id, state and worker_id of every task
+    tasks = JSONField(default=list)
+    tasks_running = models.PositiveIntegerField(default=0)
+    tasks_failed = models.PositiveIntegerField(default=0)
+    # trace of the failed connector or of its first failed task
+    last_error = models.TextField(blank=True, default='')
+    polled_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.state
+
+
+# outbox of the kafka connect calls of data connectors
+class ConnectorRequest(models.Model):
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'pending'),
+        (DELIVERED, 'delivered'),
+        (FAILED, 'failed'),
+    )
+
+    id = models.AutoField(primary_key=True)
+    data_connector = models.ForeignKey('projects.DataConnector', models.SET_NULL, related_name='connector_requests',
+                                       null=True, blank=True)
+    # name of the connector at kafka connect, the requests of a connector are delivered in order
+    connector = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    url = models.CharField(max_length=500)
+    payload = JSONField()
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    # claimed by a dispatcher delivering it until then, requests of a dispatcher that died are claimed again after
+    leased_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['connector', 'status']),
+        ]
+
+    def __str__(self):
+        return self.method + ' ' + self.connector
+
+
+invalidate_on_change(Project, DataConnector, DataConnectorType, ConnectorStatus)
@@ -0,0 +1,144 @@
+import logging
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from integrations.connect import get_client
+from projects.models import ConnectorRequest, DataConnector
+
+logger = logging.getLogger(__name__)
+
+# kafka connect answers 409 while rebalancing its workers, the client gives up after a few quick retries
+RETRIED_STATUS_CODES = {409, 429}
+
+
+def retry_delay(attempts):
+    config = settings.KAFKA_CONNECT_OUTBOX
+    return min(config['RETRY_DELAY'] * 2 ** (attempts - 1), config['MAX_RETRY_DELAY'])
+
+
+def due_requests():
+    # a request waits for the earlier pending requests of its connector, so kafka connect sees them in order
+    earlier = ConnectorRequest.objects.filter(connector=OuterRef('connector'), status=ConnectorRequest.PENDING,
+                                              pk__lt=OuterRef('pk'))
+    now = timezone.now()
+
+    return ConnectorRequest.objects \
+        .filter(status=ConnectorRequest.PENDING, next_attempt_at__lte=now) \
+        .filter(Q(leased_until__isnull=True) | Q(leased_until__lt=now)) \
+        .annotate(blocked=Exists(earlier)) \
+        .filter(blocked=False) \
+        .order_by('pk')
+
+
+def send(connector_request):
+    url = urlsplit(connector_request.url)
+    client = get_client(url.scheme + '://' + url.netloc)
+    payload = connector_request.payload if connector_request.method != 'DELETE' else None
+
+    return client.request(connector_request.method, url.path, payload)
+
+
+def retry(connector_request, error):
+    connector_request.last_error = error
+    if connector_request.attempts >= settings.KAFKA_CONNECT_OUTBOX['MAX_ATTEMPTS']:
+        connector_request.status = ConnectorRequest.FAILED
+        logger.warning('Giving up %s after %d attempts: %s', connector_request, connector_request.attempts, error)
+    else:
+        connector_request.next_attempt_at = timezone.now() + timedelta(
+            seconds=retry_delay(connector_request.attempts))
+
+
+def report_status(connector_request):
+    if connector_request.data_connector_id is None or connector_request.status == ConnectorRequest.PENDING:
+        return
+
+    # the status of a later change is reported once that change is delivered
+    if ConnectorRequest.objects.filter(connector=connector_request.connector,
+                                       status=ConnectorRequest.PENDING).exists():
+        return
+
+    data_connector = DataConnector.objects.get(pk=connector_request.data_connector_id)
+    if connector_request.status == ConnectorRequest.DELIVERED:
+        provisioning_status = DataConnector.PROVISIONED
+    else:
+        provisioning_status = DataConnector.PROVISIONING_FAILED
+
+    if data_connector.provisioning_status != provisioning_status:
+        data_connector.provisioning_status = provisioning_status
+        data_connector.save(update_fields=['provisioning_status'])
+
+
+def deliver(connector_request):
+    """
+    Calls kafka connect and applies the outcome to the request, without saving it.
+    """
+    connector_request.attempts += 1
+    try:
+        response = send(connector_request)
+    except requests.RequestException as e:
+        # includes the calls refused while the circuit of the cluster is open
+        retry(connector_request, str(e))
+    else:
+        if response.status_code < 300 or (connector_request.method == 'DELETE' and response.status_code == 404):
+            # deleting a connector that is already gone succeeds as well
+            connector_request.status = ConnectorRequest.DELIVERED
+            connector_request.delivered_at = timezone.now()
+        elif response.status_code >= 500 or response.status_code in RETRIED_STATUS_CODES:
+            retry(connector_request, str(response.status_code) + ' ' + response.text)
+        else:
+            # the request itself is rejected, repeating it does not help
+            connector_request.status = ConnectorRequest.FAILED
+            connector_request.last_error = str(response.status_code) + ' ' + response.text
+            logger.warning('Kafka Connect rejected %s: %s', connector_request, connector_request.last_error)
+
+
+def claim(batch_size):
+    """
+    Leases a batch of due requests to this dispatcher, dispatchers running concurrently skip each other's requests.
+    """
+    leased_until = timezone.now() + timedelta(seconds=settings.KAFKA_CONNECT_OUTBOX['LEASE'])
+    with transaction.atomic():
+        connector_requests = list(due_requests().select_for_update(skip_locked=True)[:batch_size])
+        ConnectorRequest.objects.filter(pk__in=[connector_request.pk for connector_request in connector_requests]) \
+            .update(leased_until=leased_until)
+
+    for connector_request in connector_requests:
+        connector_request.leased_until = leased_until
+    return connector_requests
+
+
+def record(connector_request):
+    """
+    Saves the outcome of a delivery, unless the lease expired and the request was claimed again meanwhile.
+    """
+    with transaction.atomic():
+        updated = ConnectorRequest.objects \
+            .filter(pk=connector_request.pk, leased_until=connector_request.leased_until) \
+            .update(status=connector_request.status, attempts=connector_request.attempts,
+                    next_attempt_at=connector_request.next_attempt_at, last_error=connector_request.last_error,
+                    delivered_at=connector_request.delivered_at, leased_until=None)
+        if not updated:
+            logger.warning('The lease of %s expired during its delivery, dropping the outcome', connector_request)
+            return
+
+        connector_request.leased_until = None
+        report_status(connector_request)
+
+
+def dispatch(batch_size):
+    """
+    Delivers the due requests of the outbox, returns how many were attempted.
+    Kafka connect is called outside of any transaction, the requests are leased while they are delivered.
+    """
+    connector_requests = claim(batch_size)
+    for connector_request in connector_requests:
+        deliver(connector_request)
+        record(connector_request)
+
+    return len(connector_requests)
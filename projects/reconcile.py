@@ -0,0 +1,158 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from eddy_backend.cache import instance_tag, response_cache
+from integrations.connect import get_client, integration_url
+from integrations.models import Integration
+from projects.models import ConnectorRequest, DataConnector, connector_config, connector_name
+
+logger = logging.getLogger(__name__)
+
+# connectors named after a data connector, the other connectors of a cluster are not managed by the backend
+MANAGED_NAME = re.compile(r'^\d+\.\d+$')
+
+
+class Plan(object):
+    """
+    The calls bringing the connectors of a cluster in line with the data connectors pointing at it.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        # connector names to configs
+        self.create = dict()
+        self.update = dict()
+        self.delete = []
+        self.unchanged = []
+
+    def __str__(self):
+        return '%s: %d to create, %d to update, %d to delete, %d unchanged' % (
+            self.base_url, len(self.create), len(self.update), len(self.delete), len(self.unchanged))
+
+
+def get_clusters():
+    # integrations pointing at the same cluster are reconciled together
+    clusters = dict()
+    for integration in Integration.objects.filter(integration_type='debezium'):
+        clusters.setdefault(integration_url(integration), []).append(integration.pk)
+    return clusters
+
+
+def get_actual_configs(client):
+    response = client.get_expanded_connectors()
+    response.raise_for_status()
+
+    configs = dict()
+    for name, connector in response.json().items():
+        config = dict(connector['info']['config'])
+        # kafka connect adds the name to the config it stores
+        config.pop('name', None)
+        configs[name] = config
+    return configs
+
+
+def plan(base_url, integration_ids, actual_configs):
+    # read after the connectors were listed, so connectors created meanwhile have their data connector here
+    data_connectors = {
+        connector_name(data_connector): data_connector
+        for data_connector in DataConnector.objects.filter(data_connector_type__integration__in=integration_ids)
+    }
+    # the outbox delivers the pending changes in order, the reconciler leaves those connectors alone
+    pending = set(ConnectorRequest.objects.filter(status=ConnectorRequest.PENDING).values_list('connector',
+                                                                                            flat=True))
+
+    result = Plan(base_url)
+    for name, data_connector in data_connectors.items():
+        if name in pending:
+            continue
+
+        config = connector_config(data_connector)
+        if name not in actual_configs:
+            result.create[name] = config
+        elif actual_configs[name] != config:
+            result.update[name] = config
+        else:
+            result.unchanged.append(name)
+
+    orphans = [name for name in actual_configs
+               if MANAGED_NAME.match(name) and name not in data_connectors and name not in pending]
+    # clusters are shared with other deployments naming their connectors alike, only the connectors this database
+    # sent to the cluster are deleted, like the ones of deleted data connectors or moved to another cluster
+    recorded = set(ConnectorRequest.objects.filter(connector__in=orphans, url__startswith=base_url + '/')
+                   .values_list('connector', flat=True))
+    result.delete = [name for name in orphans if name in recorded]
+
+    return result, data_connectors
+
+
+def apply(client, result, max_workers):
+    """
+    Issues the calls of the plan concurrently, returns the names of the connectors whose call failed.
+    """
+    calls = [('PUT', name, config) for name, config in list(result.create.items()) + list(result.update.items())]
+    calls += [('DELETE', name, None) for name in result.delete]
+
+    def call(args):
+        method, name, config = args
+        try:
+            if method == 'PUT':
+                response = client.put_connector_config(name, config)
+            else:
+                response = client.delete_connector(name)
+        except requests.RequestException as e:
+            logger.warning('Reconciling %s failed: %s', name, e)
+            return name
+
+        if response.status_code >= 300 and not (method == 'DELETE' and response.status_code == 404):
+            logger.warning('Reconciling %s failed: %s %s', name, response.status_code, response.text)
+            return name
+        return None
+
+    if not calls:
+        return set()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        return {name for name in executor.map(call, calls) if name is not None}
+
+
+def report_status(result, data_connectors, failed):
+    changed = {DataConnector.PROVISIONED: [], DataConnector.PROVISIONING_FAILED: []}
+    for name in list(result.create) + list(result.update) + result.unchanged:
+        data_connector = data_connectors[name]
+        status = DataConnector.PROVISIONING_FAILED if name in failed else DataConnector.PROVISIONED
+        if data_connector.provisioning_status != status:
+            changed[status].append(data_connector)
+
+    # updated without saving, a save would record another kafka connect request
+    for status, changed_connectors in changed.items():
+        if changed_connectors:
+            DataConnector.objects.filter(pk__in=[data_connector.pk for data_connector in changed_connectors]) \
+                .update(provisioning_status=status)
+
+    response_cache.invalidate({instance_tag(data_connector)
+                               for changed_connectors in changed.values() for data_connector in changed_connectors})
+
+
+def reconcile(base_url, integration_ids, max_workers, dry_run=False):
+    client = get_client(base_url)
+    result, data_connectors = plan(base_url, integration_ids, get_actual_configs(client))
+    if not dry_run:
+        failed = apply(client, result, max_workers)
+        report_status(result, data_connectors, failed)
+    return result
+
+
+def reconcile_all(max_workers, dry_run=False):
+    """
+    Reconciles every cluster, returns the plans of the clusters that could be listed.
+    """
+    plans = []
+    for base_url, integration_ids in get_clusters().items():
+        try:
+            plans.append(reconcile(base_url, integration_ids, max_workers, dry_run))
+        except (requests.RequestException, ValueError) as e:
+            logger.warning('Listing the connectors of %s failed: %s', base_url, e)
+    return plans
@@ -1,12 +1,18 @@
 import graphene
+from django.db import transaction
 from graphene_django import DjangoObjectType
 
 from authentication.models import User
 from authentication.schema import UserType
+from dashboards.schema import DashboardConnection
 from integrations.models import Integration
+from pipelines.schema import PipelineConnection
 from projects import models
 from projects.models import Project, DataConnector
 from utils.exceptions import ForbiddenException, NotFoundException, UnauthorizedException, ConflictException
+from utils.loaders import load_related
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField, RelatedConnectionField
 from utils.utils import IntID
 from workspaces.models import Workspace
 
@@ -20,6 +26,23 @@ class ProjectType(DjangoObjectType):
     id = graphene.Field(IntID, required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_workspace(cls, root, info, **kwargs):
+        return load_related(info, root, 'workspace')
+
+    pipelines_connection = RelatedConnectionField(PipelineConnection, 'pipelines')
+    dashboards_connection = RelatedConnectionField(DashboardConnection, 'dashboards')
+    data_connectors_connection = RelatedConnectionField(lambda: DataConnectorConnection, 'data_connectors')
+
+
+class ProjectConnection(CountableConnection):
+    class Meta:
+        node = ProjectType
+
 
 class ProjectQuery(graphene.ObjectType):
     project = graphene.Field(ProjectType, id=IntID(required=True))
@@ -30,15 +53,8 @@ class ProjectQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('id'))
-        except Project.DoesNotExist:
-            # any user can only request projects that exist
-            raise NotFoundException()
-
         # any user can only request projects associated to itself
-        if project.user != info.context.user:
-            raise ForbiddenException()
+        project = Project.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return project
 
@@ -51,10 +67,21 @@ class ProjectQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request projects associated to itself
-        all_projects = Project.objects.filter(user=info.context.user)
+        all_projects = optimize_queryset(Project.objects.owned_by(info.context.user), info)
 
         return all_projects
 
+    all_projects_connection = KeysetConnectionField(ProjectConnection)
+
+    @classmethod
+    def resolve_all_projects_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request projects associated to itself
+        return Project.objects.owned_by(info.context.user)
+
 
 class CreateProject(graphene.Mutation):
     class Arguments:
@@ -72,14 +99,8 @@ class CreateProject(graphene.Mutation):
         create_kwargs = dict(kwargs)
         create_kwargs['user'] = info.context.user
 
-        try:
-            workspace = Workspace.objects.get(pk=kwargs.get('workspace_id'))
-        except Workspace.DoesNotExist:
-            # any user can only create a project if it associates it to a workspace
-            raise NotFoundException()
-
-        if workspace.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a project if it associates it to a workspace
+        workspace = Workspace.objects.get_owned(info.context.user, kwargs.get('workspace_id'))
 
         del create_kwargs['workspace_id']
         create_kwargs['workspace'] = workspace
@@ -109,15 +130,8 @@ class UpdateProject(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('id'))
-        except Project.DoesNotExist:
-            # any user can only update projects that exist
-            raise NotFoundException()
-
-        if project.user != info.context.user:
-            # any user can only update projects associated to itself
-            raise ForbiddenException()
+        # any user can only update projects associated to itself
+        project = Project.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(project, key, value)
@@ -139,15 +153,8 @@ class DeleteProject(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('id'))
-        except Project.DoesNotExist:
-            # any user can only update projects that exist
-            raise NotFoundException()
-
-        if project.user != info.context.user:
-            # any user can only delete projects associated to itself
-            raise ForbiddenException()
+        # any user can only delete projects associated to itself
+        project = Project.objects.get_owned(info.context.user, kwargs.get('id'))
 
         project.delete()
 
@@ -161,14 +168,44 @@ class ProjectMutation(object):
 
 
 # DataConnector
+class ConnectorStatusType(DjangoObjectType):
+    class Meta:
+        model = models.ConnectorStatus
+        exclude = ('id', 'data_connector')
+
+
 class DataConnectorType(DjangoObjectType):
     class Meta:
         model = DataConnector
-        exclude = ('id', 'user')
+        exclude = ('id', 'user', 'connector_config_hash')
 
     id = IntID(required=True)
     user = graphene.Field(UserType, required=True)
 
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_project(cls, root, info, **kwargs):
+        return load_related(info, root, 'project')
+
+    @classmethod
+    def resolve_data_connector_type(cls, root, info, **kwargs):
+        return load_related(info, root, 'data_connector_type')
+
+    # read from the statuses polled in the background, kafka connect is never called while resolving it
+    connector_status = graphene.Field(ConnectorStatusType)
+
+    @classmethod
+    def resolve_connector_status(cls, root, info, **kwargs):
+        return load_related(info, root, 'connector_status')
+
+
+class DataConnectorConnection(CountableConnection):
+    class Meta:
+        node = DataConnectorType
+
 
 class DataConnectorQuery(graphene.ObjectType):
     data_connector = graphene.Field(DataConnectorType, id=IntID(required=True))
@@ -179,15 +216,8 @@ class DataConnectorQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            data_connector = DataConnector.objects.get(pk=kwargs.get('id'))
-        except DataConnector.DoesNotExist:
-            # any user can only request data_connectors that exist
-            raise NotFoundException()
-
         # any user can only request data_connectors associated to itself
-        if data_connector.user != info.context.user:
-            raise ForbiddenException()
+        data_connector = DataConnector.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return data_connector
 
@@ -200,10 +230,21 @@ class DataConnectorQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request all_data_connectors associated to itself
-        all_data_connectors = DataConnector.objects.filter(user=info.context.user)
+        all_data_connectors = optimize_queryset(DataConnector.objects.owned_by(info.context.user), info)
 
         return all_data_connectors
 
+    all_data_connectors_connection = KeysetConnectionField(DataConnectorConnection)
+
+    @classmethod
+    def resolve_all_data_connectors_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request all_data_connectors associated to itself
+        return DataConnector.objects.owned_by(info.context.user)
+
 
 class CreateDataConnector(graphene.Mutation):
     class Arguments:
@@ -224,14 +265,8 @@ class CreateDataConnector(graphene.Mutation):
 
         create_kwargs['user'] = info.context.user
 
-        try:
-            project = Project.objects.get(pk=kwargs.get('project_id'))
-        except Project.DoesNotExist:
-            # any user can only create a data_connector if it associates it to a project
-            raise NotFoundException()
-
-        if project.user != info.context.user:
-            raise ForbiddenException()
+        # any user can only create a data_connector if it associates it to a project
+        project = Project.objects.get_owned(info.context.user, kwargs.get('project_id'))
 
         del create_kwargs['project_id']
         create_kwargs['project'] = project
@@ -250,7 +285,9 @@ class CreateDataConnector(graphene.Mutation):
         for key, value in create_kwargs.items():
             setattr(data_connector, key, value)
 
-        data_connector.save()
+        # the kafka connect requests of the data connector are recorded in the same transaction
+        with transaction.atomic():
+            data_connector.save()
 
         return CreateDataConnector(data_connector=data_connector)
 
@@ -271,20 +308,15 @@ class UpdateDataConnector(graphene.Mutation):
 
         update_kwargs = dict(kwargs)
 
-        try:
-            data_connector = DataConnector.objects.get(pk=kwargs.get('id'))
-        except DataConnector.DoesNotExist:
-            # any user can only update data_connectors that exist
-            raise NotFoundException()
-
-        if data_connector.user != info.context.user:
-            # any user can only update data_connectors associated to itself
-            raise ForbiddenException()
+        # any user can only update data_connectors associated to itself
+        data_connector = DataConnector.objects.get_owned(info.context.user, kwargs.get('id'))
 
         for key, value in update_kwargs.items():
             setattr(data_connector, key, value)
 
-        data_connector.save()
+        # the kafka connect requests of the data connector are recorded in the same transaction
+        with transaction.atomic():
+            data_connector.save()
 
         return UpdateDataConnector(data_connector=data_connector)
 
@@ -301,15 +333,8 @@ class DeleteDataConnector(graphene.Mutation):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            data_connector = DataConnector.objects.get(pk=kwargs.get('id'))
-        except DataConnector.DoesNotExist:
-            # any user can only delete data_connectors that exist
-            raise NotFoundException()
-
-        if data_connector.user != info.context.user:
-            # any user can only delete data_connectors associated to itself
-            raise ForbiddenException()
+        # any user can only delete data_connectors associated to itself
+        data_connector = DataConnector.objects.get_owned(info.context.user, kwargs.get('id'))
 
         data_connector.delete()
 
@@ -330,6 +355,15 @@ class DataConnectorTypeType(DjangoObjectType):
 
     id = IntID(required=True)
 
+    @classmethod
+    def resolve_integration(cls, root, info, **kwargs):
+        return load_related(info, root, 'integration')
+
+
+class DataConnectorTypeConnection(CountableConnection):
+    class Meta:
+        node = DataConnectorTypeType
+
 
 class DataConnectorTypeQuery(graphene.ObjectType):
     data_connector_type = graphene.Field(DataConnectorTypeType, id=IntID(required=True))
@@ -356,10 +390,20 @@ class DataConnectorTypeQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        all_data_connector_types = models.DataConnectorType.objects.filter()
+        all_data_connector_types = optimize_queryset(models.DataConnectorType.objects.filter(), info)
 
         return all_data_connector_types
 
+    all_data_connector_types_connection = KeysetConnectionField(DataConnectorTypeConnection)
+
+    @classmethod
+    def resolve_all_data_connector_types_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        return models.DataConnectorType.objects.filter()
+
 
 class CreateDataConnectorType(graphene.Mutation):
     class Arguments:
@@ -382,14 +426,8 @@ class CreateDataConnectorType(graphene.Mutation):
             raise ForbiddenException()
 
         if 'integration_id' in kwargs.keys():
-            try:
-                integration = Integration.objects.get(pk=kwargs.get('integration_id'))
-            except Integration.DoesNotExist:
-                # any user can only create a data_connector if it associates it to a integration
-                raise NotFoundException()
-
-            if integration.user != info.context.user:
-                raise ForbiddenException()
+            # any user can only create a data_connector if it associates it to a integration
+            integration = Integration.objects.get_owned(info.context.user, kwargs.get('integration_id'))
 
             if not integration.supports_data_connectors:
                 raise ConflictException()
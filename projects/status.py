@@ -0,0 +1,87 @@
+import logging
+
+import requests
+from django.utils import timezone
+
+from eddy_backend.cache import model_tag, response_cache
+from integrations.connect import get_client
+from projects.models import ConnectorStatus, DataConnector, connector_name
+from projects.reconcile import get_clusters
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('state', 'worker_id', 'tasks', 'tasks_running', 'tasks_failed', 'last_error')
+
+
+def parse_status(status):
+    if status is None:
+        return {'state': ConnectorStatus.MISSING, 'worker_id': '', 'tasks': [], 'tasks_running': 0,
+                'tasks_failed': 0, 'last_error': ''}
+
+    connector = status.get('connector', {})
+    tasks = status.get('tasks', [])
+
+    traces = [connector.get('trace')] + [task.get('trace') for task in tasks]
+    return {
+        'state': connector.get('state', ''),
+        'worker_id': connector.get('worker_id', ''),
+        'tasks': [{'id': task.get('id'), 'state': task.get('state'), 'worker_id': task.get('worker_id')}
+                  for task in tasks],
+        'tasks_running': sum(1 for task in tasks if task.get('state') == 'RUNNING'),
+        'tasks_failed': sum(1 for task in tasks if task.get('state') == 'FAILED'),
+        'last_error': next((trace for trace in traces if trace), ''),
+    }
+
+
+def poll(base_url, integration_ids):
+    """
+    Refreshes the statuses of the data connectors of a cluster from a single call, returns how many changed.
+    """
+    response = get_client(base_url).get_connector_statuses()
+    response.raise_for_status()
+    statuses = {name: connector.get('status') for name, connector in response.json().items()}
+
+    polled_at = timezone.now()
+    data_connectors = DataConnector.objects.filter(data_connector_type__integration__in=integration_ids) \
+        .only('id', 'project')
+    existing = {connector_status.data_connector_id: connector_status for connector_status in
+                ConnectorStatus.objects.filter(data_connector__in=data_connectors)}
+
+    created = []
+    changed = []
+    for data_connector in data_connectors:
+        values = parse_status(statuses.get(connector_name(data_connector)))
+        connector_status = existing.get(data_connector.pk)
+        if connector_status is None:
+            created.append(ConnectorStatus(data_connector=data_connector, polled_at=polled_at, **values))
+        elif any(getattr(connector_status, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(connector_status, field, value)
+            connector_status.polled_at = polled_at
+            changed.append(connector_status)
+
+    # the statuses are written in bulk, without the signals invalidating the cached responses row by row
+    ConnectorStatus.objects.bulk_create(created)
+    ConnectorStatus.objects.bulk_update(changed, FIELDS + ('polled_at',))
+    changed_ids = {connector_status.pk for connector_status in changed}
+    ConnectorStatus.objects.filter(pk__in=[connector_status.pk for connector_status in existing.values()
+                                           if connector_status.pk not in changed_ids]).update(polled_at=polled_at)
+
+    if created or existing:
+        # the unchanged statuses were polled again as well, cached responses selecting polledAt are stale
+        response_cache.invalidate([model_tag(ConnectorStatus)])
+
+    return len(created) + len(changed)
+
+
+def poll_all():
+    """
+    Polls every cluster, returns how many statuses changed.
+    """
+    count = 0
+    for base_url, integration_ids in get_clusters().items():
+        try:
+            count += poll(base_url, integration_ids)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning('Polling the connector statuses of %s failed: %s', base_url, e)
+    return count
@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from projects.models import ConnectorRequest, DataConnector, DataConnectorType, Project
+from projects.tests.test_outbox import CONFIG
+from utils.testing import GraphQLTestMixin, KafkaConnectTestMixin, create_user, response_cache_enabled
+
+
+@response_cache_enabled(False)
+class ChangeDetectionTest(KafkaConnectTestMixin, GraphQLTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('changes')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.integration = self.create_integration(self.user)
+        data_connector_type = DataConnectorType.objects.create(label='Debezium', integration=self.integration)
+        self.data_connector = DataConnector.objects.create(user=self.user, project=self.project, label='connector',
+                                                           data_connector_type=data_connector_type, config=CONFIG)
+
+    def provisioned(self, status=DataConnector.PROVISIONED):
+        ConnectorRequest.objects.update(status=ConnectorRequest.DELIVERED)
+        self.data_connector.provisioning_status = status
+        self.data_connector.save(update_fields=['provisioning_status'])
+
+    def test_skips_saves_leaving_the_config_unchanged(self):
+        self.provisioned()
+
+        self.data_connector.label = 'renamed'
+        self.data_connector.save()
+        self.data_connector.save()
+
+        self.assertEqual(ConnectorRequest.objects.count(), 1)
+        self.assertEqual(DataConnector.objects.get().provisioning_status, DataConnector.PROVISIONED)
+
+    def test_records_config_changes(self):
+        self.provisioned()
+        config_hash = self.data_connector.connector_config_hash
+
+        self.data_connector.config = dict(CONFIG, databases='other')
+        self.data_connector.save()
+
+        connector_request = ConnectorRequest.objects.latest('pk')
+        self.assertEqual(connector_request.payload['database.include.list'], 'other')
+        self.assertNotEqual(DataConnector.objects.get().connector_config_hash, config_hash)
+
+    def test_records_moves_to_another_cluster(self):
+        self.provisioned()
+        other = self.create_integration(self.user, config={'host': 'other', 'port': '8083'})
+
+        self.data_connector.data_connector_type = DataConnectorType.objects.create(label='Debezium',
+                                                                                   integration=other)
+        self.data_connector.save()
+
+        self.assertTrue(ConnectorRequest.objects.latest('pk').url.startswith('http://other:8083/'))
+
+    def test_sends_failed_connectors_again(self):
+        self.provisioned(DataConnector.PROVISIONING_FAILED)
+
+        self.data_connector.save()
+
+        self.assertEqual(ConnectorRequest.objects.filter(status=ConnectorRequest.PENDING).count(), 1)
+
+    def test_keeps_the_hash_out_of_the_schema(self):
+        content = self.execute('{ allDataConnectors { connectorConfigHash } }', user=self.user, status=400)
+
+        self.assertIn('connectorConfigHash', content['errors'][0]['message'])
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from projects.models import ConnectorRequest, DataConnector, DataConnectorType, Project
+from projects.outbox import claim, deliver, dispatch, record
+from utils.testing import KafkaConnectTestMixin, create_user, http_response
+
+CONFIG = {'type': 'mysql', 'host': 'mysql', 'port': '3306', 'user': 'root', 'password': 'debezium',
+          'databases': 'inventory'}
+
+
+class OutboxTest(KafkaConnectTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('outbox')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        integration = self.create_integration(self.user)
+        self.data_connector_type = DataConnectorType.objects.create(label='Debezium', integration=integration)
+        self.data_connector = DataConnector.objects.create(user=self.user, project=self.project, label='connector',
+                                                           data_connector_type=self.data_connector_type,
+                                                           config=CONFIG)
+        self.kafka_connect.reset_mock()
+
+    def dispatch(self, *responses):
+        self.answer_kafka_connect(*responses)
+        return dispatch(10)
+
+    def test_records_the_calls_of_data_connector_changes(self):
+        connector_request = ConnectorRequest.objects.get()
+        self.assertEqual((connector_request.method, connector_request.status), ('PUT', ConnectorRequest.PENDING))
+        self.assertTrue(connector_request.url.endswith('/connectors/%s/config' % connector_request.connector))
+        self.data_connector.refresh_from_db()
+        self.assertEqual(self.data_connector.provisioning_status, DataConnector.PROVISIONING_PENDING)
+
+        self.data_connector.delete()
+
+        self.assertEqual(list(ConnectorRequest.objects.order_by('pk').values_list('method', flat=True)),
+                         ['PUT', 'DELETE'])
+        # kafka connect is only called by the dispatcher
+        self.kafka_connect.assert_not_called()
+
+    def test_delivers_due_requests(self):
+        self.assertEqual(self.dispatch(http_response(201)), 1)
+
+        connector_request = ConnectorRequest.objects.get()
+        self.assertEqual(connector_request.status, ConnectorRequest.DELIVERED)
+        self.assertEqual(connector_request.attempts, 1)
+        self.assertIsNone(connector_request.leased_until)
+        self.data_connector.refresh_from_db()
+        self.assertEqual(self.data_connector.provisioning_status, DataConnector.PROVISIONED)
+        self.assertEqual(self.dispatch(http_response(201)), 0)
+
+    def test_retries_server_errors_later(self):
+        self.assertEqual(self.dispatch(http_response(503)), 1)
+
+        connector_request = ConnectorRequest.objects.get()
+        self.assertEqual(connector_request.status, ConnectorRequest.PENDING)
+        self.assertEqual(connector_request.last_error, '503 ')
+        self.assertGreater(connector_request.next_attempt_at, timezone.now())
+        self.assertEqual(self.dispatch(http_response(201)), 0)
+
+    @override_settings(KAFKA_CONNECT_OUTBOX=dict(settings.KAFKA_CONNECT_OUTBOX, MAX_ATTEMPTS=1))
+    def test_gives_up_after_the_maximum_attempts(self):
+        self.dispatch(http_response(503))
+
+        self.assertEqual(ConnectorRequest.objects.get().status, ConnectorRequest.FAILED)
+        self.data_connector.refresh_from_db()
+        self.assertEqual(self.data_connector.provisioning_status, DataConnector.PROVISIONING_FAILED)
+
+    def test_fails_rejected_requests_at_once(self):
+        self.dispatch(http_response(400, {'message': 'invalid config'}))
+
+        connector_request = ConnectorRequest.objects.get()
+        self.assertEqual(connector_request.status, ConnectorRequest.FAILED)
+        self.assertEqual(connector_request.last_error, '400 {"message": "invalid config"}')
+
+    def test_deleting_missing_connectors_succeeds(self):
+        ConnectorRequest.objects.update(status=ConnectorRequest.DELIVERED)
+        self.data_connector.delete()
+
+        self.dispatch(http_response(404))
+
+        self.assertEqual(ConnectorRequest.objects.get(method='DELETE').status, ConnectorRequest.DELIVERED)
+
+    def test_delivers_the_requests_of_a_connector_in_order(self):
+        self.data_connector.delete()
+
+        self.assertEqual(self.dispatch(http_response(201)), 1)
+        self.assertEqual(ConnectorRequest.objects.get(method='PUT').status, ConnectorRequest.DELIVERED)
+        self.assertEqual(ConnectorRequest.objects.get(method='DELETE').status, ConnectorRequest.PENDING)
+
+        self.assertEqual(self.dispatch(http_response(201)), 1)
+        self.assertEqual(ConnectorRequest.objects.get(method='DELETE').status, ConnectorRequest.DELIVERED)
+
+    def test_skips_requests_leased_to_another_dispatcher(self):
+        ConnectorRequest.objects.update(leased_until=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(self.dispatch(http_response(201)), 0)
+
+        # the dispatcher holding the lease died
+        ConnectorRequest.objects.update(leased_until=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.dispatch(http_response(201)), 1)
+
+    def test_drops_the_outcome_once_the_lease_expired(self):
+        self.answer_kafka_connect(http_response(201))
+        connector_request, = claim(10)
+        # claimed again by another dispatcher after the lease expired
+        ConnectorRequest.objects.update(leased_until=timezone.now() + timedelta(hours=1))
+
+        deliver(connector_request)
+        record(connector_request)
+
+        self.assertEqual(ConnectorRequest.objects.get().status, ConnectorRequest.PENDING)
+
+
+class CsvDataConnectorTest(TransactionTestCase):
+    def setUp(self):
+        self.user = create_user('csv')
+        self.project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        self.data_connector_type = DataConnectorType.objects.create(label='CSV')
+
+    def create(self):
+        return DataConnector.objects.create(user=self.user, project=self.project, label='csv',
+                                            data_connector_type=self.data_connector_type,
+                                            config={'url': 'http://csv', 'topic': 'topic'})
+
+    def test_publishes_once_committed(self):
+        with mock.patch('projects.models.publish') as publish:
+            with transaction.atomic():
+                data_connector = self.create()
+                publish.assert_not_called()
+
+        publish.assert_called_once_with('app.csv_to_kafka',
+                                        ('http://csv', str(self.project.pk) + '.' + str(data_connector.pk) + '.topic'))
+
+    def test_does_not_publish_rolled_back_changes(self):
+        with mock.patch('projects.models.publish') as publish:
+            with transaction.atomic():
+                self.create()
+                transaction.set_rollback(True)
+
+        publish.assert_not_called()
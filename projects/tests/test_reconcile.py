@@ -0,0 +1,96 @@
+from io import StringIO
+
+import requests
+from django.core.management import call_command
+from django.test import TestCase
+
+from projects.models import ConnectorRequest, DataConnector, DataConnectorType, Project, connector_config, \
+    connector_name, connector_url
+from projects.reconcile import reconcile_all
+from projects.tests.test_outbox import CONFIG
+from utils.testing import KafkaConnectTestMixin, create_user, http_response
+
+
+class ReconcileTest(KafkaConnectTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('reconcile')
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        integration = self.create_integration(self.user)
+        data_connector_type = DataConnectorType.objects.create(label='Debezium', integration=integration)
+        self.in_sync, self.drifted, self.missing = [
+            DataConnector.objects.create(user=self.user, project=project, label=label,
+                                         data_connector_type=data_connector_type, config=CONFIG)
+            for label in ('in sync', 'drifted', 'missing')
+        ]
+        # recorded when the data connector of the orphaned connector was deleted
+        ConnectorRequest.objects.create(connector='0.0', method='DELETE', url=connector_url(integration, '0.0'),
+                                        payload={})
+        ConnectorRequest.objects.update(status=ConnectorRequest.DELIVERED)
+
+        self.connectors = {
+            connector_name(self.in_sync): connector_config(self.in_sync),
+            connector_name(self.drifted): dict(connector_config(self.drifted), **{'tasks.max': '2'}),
+            # a data connector deleted while kafka connect was unreachable
+            '0.0': {'connector.class': 'io.debezium.connector.mysql.MySqlConnector'},
+            # not managed by the backend
+            'external': {'connector.class': 'FileStreamSource'},
+            # managed by another deployment sharing the cluster
+            '999999.999999': {'connector.class': 'io.debezium.connector.mysql.MySqlConnector'},
+        }
+        self.failing = set()
+        self.calls = []
+        self.kafka_connect.side_effect = self.request
+
+    def request(self, method, url, **kwargs):
+        if method == 'GET':
+            return http_response(200, {
+                name: {'info': {'name': name, 'config': dict(config, name=name)}, 'status': {}}
+                for name, config in self.connectors.items()
+            })
+
+        name = url.split('/connectors/')[1].split('/')[0]
+        self.calls.append((method, name))
+        return http_response(500 if name in self.failing else 201)
+
+    def provisioning_statuses(self):
+        return [data_connector.provisioning_status
+                for data_connector in DataConnector.objects.order_by('pk')]
+
+    def test_issues_only_the_needed_calls(self):
+        result, = reconcile_all(max_workers=4)
+
+        self.assertEqual(sorted(self.calls), sorted([
+            ('PUT', connector_name(self.drifted)), ('PUT', connector_name(self.missing)), ('DELETE', '0.0'),
+        ]))
+        self.assertEqual(result.unchanged, [connector_name(self.in_sync)])
+        self.assertEqual(self.provisioning_statuses(), [DataConnector.PROVISIONED] * 3)
+
+    def test_reports_failed_calls(self):
+        self.failing.add(connector_name(self.missing))
+
+        reconcile_all(max_workers=4)
+
+        self.assertEqual(self.provisioning_statuses(), [DataConnector.PROVISIONED, DataConnector.PROVISIONED,
+                                                        DataConnector.PROVISIONING_FAILED])
+
+    def test_leaves_connectors_with_pending_requests_to_the_outbox(self):
+        ConnectorRequest.objects.filter(data_connector=self.missing).update(status=ConnectorRequest.PENDING)
+        ConnectorRequest.objects.filter(connector='0.0').update(status=ConnectorRequest.PENDING)
+
+        reconcile_all(max_workers=4)
+
+        self.assertEqual(self.calls, [('PUT', connector_name(self.drifted))])
+
+    def test_skips_clusters_that_cannot_be_listed(self):
+        self.kafka_connect.side_effect = requests.ConnectionError()
+
+        self.assertEqual(reconcile_all(max_workers=4), [])
+
+    def test_dry_run_only_lists_the_connectors(self):
+        stdout = StringIO()
+
+        call_command('reconcile_connectors', '--dry-run', stdout=stdout)
+
+        self.assertEqual(self.calls, [])
+        self.assertIn('1 to create, 1 to update, 1 to delete, 1 unchanged', stdout.getvalue())
@@ -0,0 +1,110 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from eddy_backend.cache import model_tag, response_cache
+from eddy_backend.views import count_queries
+from projects.models import ConnectorStatus, DataConnector, DataConnectorType, Project, connector_name
+from projects.status import parse_status, poll_all
+from projects.tests.test_outbox import CONFIG
+from utils.testing import GraphQLTestMixin, KafkaConnectTestMixin, create_user, http_response, \
+    response_cache_enabled
+
+RUNNING = {
+    'connector': {'state': 'RUNNING', 'worker_id': 'worker:8083'},
+    'tasks': [{'id': 0, 'state': 'RUNNING', 'worker_id': 'worker:8083'},
+              {'id': 1, 'state': 'FAILED', 'worker_id': 'worker:8083', 'trace': 'task failed'}],
+}
+
+
+class ParseStatusTest(TestCase):
+    def test_counts_the_tasks_per_state(self):
+        self.assertEqual(parse_status(RUNNING), {
+            'state': 'RUNNING',
+            'worker_id': 'worker:8083',
+            'tasks': [{'id': 0, 'state': 'RUNNING', 'worker_id': 'worker:8083'},
+                      {'id': 1, 'state': 'FAILED', 'worker_id': 'worker:8083'}],
+            'tasks_running': 1,
+            'tasks_failed': 1,
+            'last_error': 'task failed',
+        })
+
+    def test_prefers_the_trace_of_the_connector(self):
+        status = dict(RUNNING, connector={'state': 'FAILED', 'trace': 'connector failed'})
+
+        self.assertEqual(parse_status(status)['last_error'], 'connector failed')
+
+    def test_reports_missing_connectors(self):
+        self.assertEqual(parse_status(None)['state'], ConnectorStatus.MISSING)
+
+
+@response_cache_enabled(False)
+class PollTest(KafkaConnectTestMixin, GraphQLTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('status')
+        project = Project.objects.create(user=self.user, workspace=self.user.workspace, label='project')
+        integration = self.create_integration(self.user)
+        data_connector_type = DataConnectorType.objects.create(label='Debezium', integration=integration)
+        self.data_connectors = [
+            DataConnector.objects.create(user=self.user, project=project, label=str(i),
+                                         data_connector_type=data_connector_type, config=CONFIG)
+            for i in range(3)
+        ]
+        self.statuses = {connector_name(self.data_connectors[0]): RUNNING}
+        self.kafka_connect.side_effect = lambda method, url, **kwargs: http_response(
+            200, {name: {'status': status} for name, status in self.statuses.items()})
+        self.kafka_connect.reset_mock()
+
+        patcher = mock.patch.object(response_cache, 'invalidate')
+        self.invalidate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def states(self):
+        return [data_connector.connector_status.state
+                for data_connector in DataConnector.objects.select_related('connector_status').order_by('pk')]
+
+    def test_stores_the_status_of_every_data_connector(self):
+        self.assertEqual(poll_all(), 3)
+
+        self.assertEqual(self.states(), ['RUNNING', ConnectorStatus.MISSING, ConnectorStatus.MISSING])
+        self.assertEqual(self.kafka_connect.call_count, 1)
+        self.invalidate.assert_called_once()
+
+    def test_refreshes_unchanged_statuses(self):
+        poll_all()
+        polled_at = ConnectorStatus.objects.get(data_connector=self.data_connectors[0]).polled_at
+        self.invalidate.reset_mock()
+
+        self.assertEqual(poll_all(), 0)
+        self.assertGreater(ConnectorStatus.objects.get(data_connector=self.data_connectors[0]).polled_at, polled_at)
+        # updated without the signals, the cached responses holding the previous time are invalidated anyway
+        self.invalidate.assert_called_once_with([model_tag(ConnectorStatus)])
+
+        self.statuses[connector_name(self.data_connectors[1])] = RUNNING
+        self.assertEqual(poll_all(), 1)
+
+    def test_skips_clusters_that_cannot_be_polled(self):
+        self.kafka_connect.side_effect = None
+        self.kafka_connect.return_value = http_response(500)
+
+        call_command('poll_connector_statuses', '--once', stdout=StringIO())
+
+        self.assertFalse(ConnectorStatus.objects.exists())
+
+    def test_resolves_the_stored_statuses(self):
+        poll_all()
+        self.kafka_connect.reset_mock()
+        query = '{ allDataConnectors { label connectorStatus { state tasksRunning tasksFailed lastError } } }'
+        self.execute(query, user=self.user)
+
+        with count_queries() as queries:
+            content = self.execute(query, user=self.user)
+
+        self.assertEqual(content['data']['allDataConnectors'][0]['connectorStatus'],
+                         {'state': 'RUNNING', 'tasksRunning': 1, 'tasksFailed': 1, 'lastError': 'task failed'})
+        # the statuses are joined to the data connectors
+        self.assertEqual(queries.count, 1)
+        self.kafka_connect.assert_not_called()
@@ -3,10 +3,12 @@ import graphql_jwt
 
 import authentication.schema
 import dashboards.schema
+import eddy_backend.schema
 import integrations.schema
 import pipelines.schema
 import projects.schema
 import workspaces.schema
+from eddy_backend.metrics import instrument_resolvers
 
 RootQuery = type(
     'RootQuery',
@@ -14,6 +16,7 @@ RootQuery = type(
         authentication.schema.query_list + 
         integrations.schema.query_list + 
         dashboards.schema.query_list +
+        eddy_backend.schema.query_list +
         pipelines.schema.query_list + 
         projects.schema.query_list + 
         workspaces.schema.query_list
@@ -26,6 +29,7 @@ RootMutation = type(
     tuple(
         authentication.schema.mutation_list + 
         dashboards.schema.mutation_list +
+        eddy_backend.schema.mutation_list +
         integrations.schema.mutation_list + 
         pipelines.schema.mutation_list + 
         projects.schema.mutation_list + 
@@ -51,3 +55,5 @@ class Mutation(RootMutation, graphene.ObjectType):
 
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
+
+instrument_resolvers(schema)
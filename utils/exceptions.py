@@ -16,3 +16,8 @@ class ConflictException(Exception):
 class NotFoundException(Exception):
     def __init__(self):
         super(NotFoundException, self).__init__('Request requires a resource which can not be found.')
+
+
+class BadRequestException(Exception):
+    def __init__(self):
+        super(BadRequestException, self).__init__('Request is malformed.')
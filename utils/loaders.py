@@ -0,0 +1,77 @@
+from django.db.models import Count
+from promise import Promise
+from promise.dataloader import DataLoader
+
+
+class ModelLoader(DataLoader):
+    """
+    Batches lookups of a model by a unique field into a single IN (...) query.
+    """
+
+    def __init__(self, model, field='pk'):
+        super(ModelLoader, self).__init__()
+        self.model = model
+        self.field = field
+
+    def batch_load_fn(self, keys):
+        lookup = self.field + '__in'
+        objects = {getattr(obj, self.field): obj for obj in self.model.objects.filter(**{lookup: keys})}
+        return Promise.resolve([objects.get(key) for key in keys])
+
+
+class CountLoader(DataLoader):
+    """
+    Batches counting the objects of a model per value of a foreign key into a single GROUP BY query.
+    """
+
+    def __init__(self, model, field):
+        super(CountLoader, self).__init__()
+        self.model = model
+        self.field = field
+
+    def batch_load_fn(self, keys):
+        counts = dict(self.model.objects.filter(**{self.field + '__in': keys}).order_by()
+                      .values_list(self.field).annotate(count=Count('pk')))
+        return Promise.resolve([counts.get(key, 0) for key in keys])
+
+
+def get_request_loader(info, key, create):
+    # loaders live on the request so they are shared by every resolver of a request and discarded afterwards
+    context = info.context
+    if not hasattr(context, 'loaders'):
+        context.loaders = dict()
+
+    if key not in context.loaders:
+        context.loaders[key] = create()
+
+    return context.loaders[key]
+
+
+def get_loader(info, model, field='pk'):
+    return get_request_loader(info, (model, field), lambda: ModelLoader(model, field))
+
+
+def clear_loaders(context):
+    context.loaders = dict()
+
+
+def load(info, model, key, field='pk'):
+    # nullable foreign keys resolve to None without scheduling a lookup
+    if key is None:
+        return None
+
+    return get_loader(info, model, field).load(key)
+
+
+def load_related(info, root, name):
+    field = root._meta.get_field(name)
+
+    # relations already joined by the query planner do not need a lookup
+    if field.is_cached(root):
+        return getattr(root, name)
+
+    if field.concrete:
+        return load(info, field.related_model, getattr(root, field.attname))
+
+    # reverse one to one relations are looked up by the foreign key on the related model
+    return load(info, field.related_model, root.pk, field=field.remote_field.attname)
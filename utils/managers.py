@@ -0,0 +1,31 @@
+from django.db import models
+
+from utils.exceptions import ForbiddenException, NotFoundException
+
+
+class OwnedQuerySet(models.QuerySet):
+    """
+    A queryset of rows owned by a user, fetching and authorizing a row in a single indexed query.
+    """
+
+    owner_lookup = 'user_id'
+
+    def owned_by(self, user):
+        return self.filter(**{self.owner_lookup: user.pk})
+
+    def get_owned(self, user, pk):
+        try:
+            return self.owned_by(user).get(pk=pk)
+        except self.model.DoesNotExist:
+            pass
+
+        # telling rows of other users from missing rows costs a second query on misses only
+        if self.filter(pk=pk).exists():
+            raise ForbiddenException()
+
+        raise NotFoundException()
+
+
+class WorkspaceQuerySet(OwnedQuerySet):
+    # workspaces are owned through the one to one relation of their user
+    owner_lookup = 'user'
@@ -0,0 +1,84 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import ast
+
+
+def collect_fields(selection_sets, fragments):
+    """
+    Maps the snake case name of every field selected in the given selection sets to its own selection sets.
+    Fragments are expanded and repeated selections of the same field are merged.
+    """
+    fields = dict()
+    for selection_set in selection_sets:
+        if selection_set is None:
+            continue
+
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                sub_selection_sets = fields.setdefault(to_snake_case(selection.name.value), [])
+                if selection.selection_set is not None:
+                    sub_selection_sets.append(selection.selection_set)
+            else:
+                if isinstance(selection, ast.FragmentSpread):
+                    fragment_selection_set = fragments[selection.name.value].selection_set
+                else:
+                    fragment_selection_set = selection.selection_set
+
+                for name, sub_selection_sets in collect_fields([fragment_selection_set], fragments).items():
+                    fields.setdefault(name, []).extend(sub_selection_sets)
+
+    return fields
+
+
+def plan(model, selection_sets, fragments, prefix, select_related, prefetch_related, deferred):
+    fields = collect_fields(selection_sets, fragments)
+
+    for field in model._meta.get_fields():
+        # primary and foreign keys are always loaded, they are needed to resolve relations
+        if field.concrete and not field.is_relation and not field.primary_key and field.name not in fields:
+            deferred.append(prefix + field.name)
+
+    for name, sub_selection_sets in fields.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # fields defined on the graphql type only
+            continue
+
+        if not field.is_relation:
+            continue
+
+        if field.many_to_one or field.one_to_one:
+            select_related.append(prefix + name)
+            plan(field.related_model, sub_selection_sets, fragments, prefix + name + '__', select_related,
+                 prefetch_related, deferred)
+        else:
+            queryset = optimize(field.related_model.objects.all(), sub_selection_sets, fragments)
+            prefetch_related.append(Prefetch(prefix + name, queryset=queryset))
+
+
+def optimize(queryset, selection_sets, fragments):
+    select_related = list()
+    prefetch_related = list()
+    deferred = list()
+
+    plan(queryset.model, selection_sets, fragments, '', select_related, prefetch_related, deferred)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if deferred:
+        queryset = queryset.defer(*deferred)
+
+    return queryset
+
+
+def optimize_queryset(queryset, info):
+    """
+    Joins, prefetches and defers columns of a queryset according to the selection set of the resolved field,
+    so nested relations are fetched up front and heavy columns such as config are only loaded when requested.
+    """
+    selection_sets = [field_ast.selection_set for field_ast in info.field_asts]
+    return optimize(queryset, selection_sets, info.fragments)
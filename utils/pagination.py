@@ -0,0 +1,231 @@
+from functools import partial
+
+import graphene
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from graphene.relay import ConnectionField, PageInfo
+from graphene.types import NonNull
+from graphene_django.settings import graphene_settings
+from graphene_django.utils import maybe_queryset
+from graphql_relay.utils import base64, unbase64
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from utils.exceptions import BadRequestException
+from utils.loaders import CountLoader, get_request_loader
+from utils.optimizer import collect_fields, optimize
+
+CURSOR_PREFIX = 'id:'
+
+
+def id_to_cursor(pk):
+    return base64(CURSOR_PREFIX + str(pk))
+
+
+def cursor_to_id(cursor):
+    try:
+        value = unbase64(cursor)
+    except Exception:
+        raise BadRequestException()
+
+    if not value.startswith(CURSOR_PREFIX) or not value[len(CURSOR_PREFIX):].isdigit():
+        raise BadRequestException()
+
+    return int(value[len(CURSOR_PREFIX):])
+
+
+def get_limits(first, last):
+    """
+    Validates the page sizes of a connection, a connection without either returns the first page of the maximal size.
+    """
+    max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+
+    for limit in (first, last):
+        if limit is not None and limit < 0:
+            raise BadRequestException()
+
+    if first is None and last is None:
+        first = max_limit
+    if first is not None:
+        first = min(first, max_limit)
+    if last is not None:
+        last = min(last, max_limit)
+
+    return first, last
+
+
+def filter_page(queryset, after, before):
+    if after is not None:
+        queryset = queryset.filter(pk__gt=cursor_to_id(after))
+    if before is not None:
+        queryset = queryset.filter(pk__lt=cursor_to_id(before))
+    return queryset
+
+
+def page_order(first):
+    # pages are read forward from their first row, or backward from their last row
+    return 'pk' if first is not None else '-pk'
+
+
+def page_limit(first, last):
+    # one extra row tells whether there is a next or a previous page
+    return (first if first is not None else last) + 1
+
+
+def make_connection(connection_type, rows, first, last, queryset):
+    """
+    Builds a connection from the rows read in page order, up to the page limit.
+    """
+    has_next_page = False
+    has_previous_page = False
+
+    if first is not None:
+        has_next_page = len(rows) > first
+        nodes = rows[:first]
+        if last is not None:
+            has_previous_page = len(nodes) > last
+            nodes = nodes[max(len(nodes) - last, 0):]
+    else:
+        has_previous_page = len(rows) > last
+        nodes = list(reversed(rows[:last]))
+
+    edges = [connection_type.Edge(node=node, cursor=id_to_cursor(node.pk)) for node in nodes]
+
+    connection = connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=has_previous_page,
+            has_next_page=has_next_page,
+        )
+    )
+    connection.iterable = queryset
+    return connection
+
+
+def optimize_nodes(queryset, info):
+    # plan the queryset from the selection set of the nodes, not from the connection itself
+    selection_sets = [field_ast.selection_set for field_ast in info.field_asts]
+    edges = collect_fields(selection_sets, info.fragments).get('edges', [])
+    nodes = collect_fields(edges, info.fragments).get('node', [])
+    return optimize(queryset, nodes, info.fragments)
+
+
+class CountableConnection(graphene.relay.Connection):
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    @classmethod
+    def resolve_total_count(cls, root, info, **kwargs):
+        # counted only when requested, over the whole set regardless of the page boundaries
+        if getattr(root, 'load_count', None) is not None:
+            return root.load_count()
+        return root.iterable.count()
+
+
+class KeysetConnectionField(ConnectionField):
+    """
+    A connection field paginating a queryset by primary key instead of by offset,
+    so every page costs a single indexed range scan however deep it is.
+    """
+
+    @classmethod
+    def paginate(cls, connection_type, queryset, first=None, after=None, last=None, before=None):
+        first, last = get_limits(first, last)
+        page = filter_page(queryset, after, before)
+        rows = list(page.order_by(page_order(first))[:page_limit(first, last)])
+        return make_connection(connection_type, rows, first, last, queryset)
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection_type, root, info, **args):
+        queryset = maybe_queryset(resolver(root, info, **args))
+
+        if isinstance(connection_type, NonNull):
+            connection_type = connection_type.of_type
+
+        return cls.paginate(connection_type, optimize_nodes(queryset, info), first=args.get('first'),
+                            after=args.get('after'), last=args.get('last'), before=args.get('before'))
+
+
+class PageLoader(DataLoader):
+    """
+    Batches the pages of a connection over a foreign key for many parents, the rows of every parent are numbered
+    by a window function so the ids of all the pages are read by one query and their nodes by another.
+    """
+
+    def __init__(self, queryset, field, first, last, after, before):
+        super(PageLoader, self).__init__()
+        self.queryset = queryset
+        self.field = field
+        self.first = first
+        self.last = last
+        self.after = after
+        self.before = before
+
+    def batch_load_fn(self, keys):
+        model = self.queryset.model
+        order = page_order(self.first)
+        position = Window(RowNumber(), partition_by=[F(self.field)],
+                          order_by=F('pk').asc() if self.first is not None else F('pk').desc())
+        ranked = filter_page(model.objects.filter(**{self.field + '__in': keys}), self.after, self.before) \
+            .annotate(page_position=position).values('pk', 'page_position')
+        sql, params = ranked.query.sql_with_params()
+        quote_name = connection.ops.quote_name
+        # window functions can not be filtered on by the orm, the rows of the pages are selected around them
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT ranked.%s FROM (%s) ranked WHERE ranked.%s <= %%s' % (
+                quote_name(model._meta.pk.column), sql, quote_name('page_position')),
+                params + (page_limit(self.first, self.last),))
+            ids = [row[0] for row in cursor.fetchall()]
+
+        pages = {key: [] for key in keys}
+        for node in self.queryset.filter(pk__in=ids).order_by(order):
+            pages[getattr(node, self.field)].append(node)
+        return Promise.resolve([pages[key] for key in keys])
+
+
+class RelatedConnectionField(KeysetConnectionField):
+    """
+    A keyset connection over the objects referencing its parent by a foreign key, the pages of all the parents
+    of a selection are loaded together instead of by a query per parent.
+    """
+
+    def __init__(self, type, related_name, *args, **kwargs):
+        self.related_name = related_name
+        super(RelatedConnectionField, self).__init__(type, *args, **kwargs)
+
+    @classmethod
+    def related_connection_resolver(cls, related_name, connection_type, root, info, **args):
+        if isinstance(connection_type, NonNull):
+            connection_type = connection_type.of_type
+
+        relation = root._meta.get_field(related_name)
+        model = relation.related_model
+        field = relation.remote_field.attname
+        first, last = get_limits(args.get('first'), args.get('last'))
+        after, before = args.get('after'), args.get('before')
+        # validated before the page is loaded, invalid cursors fail the field of every parent alike
+        filter_page(model.objects.none(), after, before)
+
+        # the parents of a selection share their loaders, the nodes of the selection are planned once
+        key = (PageLoader,) + tuple(id(field_ast) for field_ast in info.field_asts)
+        loader = get_request_loader(info, key, lambda: PageLoader(
+            optimize_nodes(model.objects.all(), info), field, first, last, after, before))
+        queryset = model.objects.filter(**{field: root.pk})
+
+        def build(rows):
+            page = make_connection(connection_type, rows, first, last, queryset)
+            # the counts of all the parents are loaded together as well
+            page.load_count = lambda: get_request_loader(
+                info, (CountLoader, model, field), lambda: CountLoader(model, field)).load(root.pk)
+            return page
+
+        return loader.load(root.pk).then(build)
+
+    def get_resolver(self, parent_resolver):
+        # the objects are loaded from the relation of the parent, resolvers of the parent type are not used
+        return partial(self.related_connection_resolver, self.related_name, self.type)
@@ -0,0 +1,83 @@
+import json
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.test import Client, override_settings
+from graphql_jwt.shortcuts import get_token
+
+from authentication.models import User
+from integrations import connect
+from integrations.models import Integration
+
+
+def create_user(username, **kwargs):
+    # the workspace of the user is created when it is saved
+    return User.objects.create(username=username, **kwargs)
+
+
+def http_response(status_code, content=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(content).encode('utf-8') if content is not None else b''
+    return response
+
+
+def response_cache_enabled(enabled):
+    # the response cache is configured by the environment, tests decide whether their operations go through it
+    return override_settings(GRAPHQL_RESPONSE_CACHE=dict(settings.GRAPHQL_RESPONSE_CACHE, ENABLED=enabled))
+
+
+class GraphQLTestMixin(object):
+    """
+    Posts operations to the graphql endpoint of the tested application, authenticated as a user when one is given.
+    """
+
+    def post_graphql(self, data, user=None, **extra):
+        if user is not None:
+            extra.setdefault('HTTP_AUTHORIZATION', 'Bearer ' + get_token(user))
+
+        return Client().post('/graphql', json.dumps(data), content_type='application/json', **extra)
+
+    def execute(self, query, variables=None, user=None, status=200, **extra):
+        """
+        Returns the decoded response of an operation, after checking its status code.
+        """
+        data = {'query': query}
+        if variables is not None:
+            data['variables'] = variables
+
+        response = self.post_graphql(data, user=user, **extra)
+        self.assertEqual(response.status_code, status, response.content)
+        return json.loads(response.content)
+
+
+class KafkaConnectTestMixin(object):
+    """
+    Answers the calls to kafka connect of the test, every cluster gets a new client so no circuit is left open.
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(connect.clients, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.kafka_connect = self.answer_kafka_connect(http_response(200, []))
+
+    def answer_kafka_connect(self, *responses):
+        """
+        Answers with the given responses in turn and the last one from then on, returns the mocked request.
+        """
+        responses = list(responses)
+
+        def request(method, url, **kwargs):
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+        patcher = mock.patch.object(requests.Session, 'request', side_effect=request)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def create_integration(self, user, **kwargs):
+        # the cluster of a debezium integration is checked when it is saved
+        kwargs.setdefault('integration_type', 'debezium')
+        return Integration.objects.create(user=user, workspace=user.workspace, **kwargs)
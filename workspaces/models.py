@@ -1,4 +1,6 @@
 from django.db import models
+from eddy_backend.cache import invalidate_on_change
+from utils.managers import WorkspaceQuerySet
 
 
 class Workspace(models.Model):
@@ -7,5 +9,10 @@ class Workspace(models.Model):
     # user is a one to one relation defined in the user model
     # label can be inferred from user label
 
+    objects = WorkspaceQuerySet.as_manager()
+
     def __str__(self):
         return 'Workspace' + ' ' + self.user.username
+
+
+invalidate_on_change(Workspace)
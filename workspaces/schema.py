@@ -3,7 +3,12 @@ from graphene_django import DjangoObjectType
 
 from authentication.models import User
 from authentication.schema import UserType
-from utils.exceptions import UnauthorizedException, ForbiddenException, NotFoundException
+from pipelines import jobs
+from pipelines.schema import JobQueueType
+from utils.exceptions import UnauthorizedException
+from utils.loaders import load_related
+from utils.optimizer import optimize_queryset
+from utils.pagination import CountableConnection, KeysetConnectionField
 from utils.utils import IntID
 from workspaces.models import Workspace
 
@@ -16,6 +21,20 @@ class WorkspaceType(DjangoObjectType):
 
     id = graphene.Field(IntID, required=True)
     user = graphene.Field(UserType, required=True)
+    job_queues = graphene.List(graphene.NonNull(JobQueueType), required=True)
+
+    @classmethod
+    def resolve_user(cls, root, info, **kwargs):
+        return load_related(info, root, 'user')
+
+    @classmethod
+    def resolve_job_queues(cls, root, info, **kwargs):
+        return jobs.get_queue_depths(root)
+
+
+class WorkspaceConnection(CountableConnection):
+    class Meta:
+        node = WorkspaceType
 
 
 class WorkspaceQuery(graphene.ObjectType):
@@ -27,15 +46,8 @@ class WorkspaceQuery(graphene.ObjectType):
             # any user needs to be authenticated
             raise UnauthorizedException()
 
-        try:
-            workspace = Workspace.objects.get(pk=kwargs.get('id'))
-        except Workspace.DoesNotExist:
-            # any user can only request workspaces that exist
-            raise NotFoundException()
-
         # any user can only request workspaces associated to itself
-        if workspace.user != info.context.user:
-            raise ForbiddenException()
+        workspace = Workspace.objects.get_owned(info.context.user, kwargs.get('id'))
 
         return workspace
 
@@ -48,10 +60,21 @@ class WorkspaceQuery(graphene.ObjectType):
             raise UnauthorizedException()
 
         # any user can only request workspaces associated to itself
-        all_workspaces = Workspace.objects.filter(user=info.context.user)
+        all_workspaces = optimize_queryset(Workspace.objects.owned_by(info.context.user), info)
 
         return all_workspaces
 
+    all_workspaces_connection = KeysetConnectionField(WorkspaceConnection)
+
+    @classmethod
+    def resolve_all_workspaces_connection(cls, root, info, **kwargs):
+        if not isinstance(info.context.user, User):
+            # any user needs to be authenticated
+            raise UnauthorizedException()
+
+        # any user can only request workspaces associated to itself
+        return Workspace.objects.owned_by(info.context.user)
+
 
 class WorkspaceMutation(object):
     pass